@@ -1,8 +1,365 @@
-import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
+import sys
+import os
+import shutil
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import scipy.io
-import os
+import nist_extraction
+
+try:
+    import tkinter as tk
+    from tkinter import filedialog, messagebox, ttk
+except ImportError:
+    # Headless installs can still use the command line batch mode
+    tk = None
+
+# Array elements formatted and written per step, which bounds memory use for very large arrays
+WRITE_CHUNK_ELEMENTS = 1 << 24
+
+# Output formats: the byte written after each ASCII bit, or None for 8 bits per byte
+OUTPUT_FORMATS = {"binary": b"", "01-ascii": b"\n", "no-whitespace": b"", "packed": None}
+
+# Lookup table from bit value to its ASCII character
+_ASCII_DIGITS = np.frombuffer(b"01", dtype=np.uint8)
+
+# Signature MATLAB v7.3 files carry after their 512-byte header (they are HDF5 files)
+_HDF5_SIGNATURE = b"\x89HDF\r\n\x1a\n"
+
+# HDF5 groups MATLAB uses for its own bookkeeping rather than user variables
+_HDF5_INTERNAL_NAMES = ("#refs#", "#subsystem#")
+
+class HDF5Matrix:
+    """
+    MATLAB-oriented view of a v7.3 (HDF5) dataset that reads slabs on demand
+    
+    MATLAB stores arrays column-major, so the HDF5 dataset holds the
+    transpose of the MATLAB matrix; indexing this view swaps the axes back.
+    """
+    
+    def __init__(self, h5file, dataset):
+        if len(dataset.shape) != 2:
+            raise ValueError(f"Expected a 2-D variable, found shape {dataset.shape}")
+        self._file = h5file
+        self.dataset = dataset
+        self.shape = tuple(reversed(dataset.shape))
+        self.ndim = 2
+        self.size = int(dataset.size)
+        self.dtype = dataset.dtype
+    
+    def __getitem__(self, key):
+        rows, cols = key
+        return np.asarray(self.dataset[cols, rows]).T
+    
+    def close(self):
+        self._file.close()
+
+def _is_hdf5(filename):
+    with open(filename, 'rb') as f:
+        f.seek(512)
+        return f.read(len(_HDF5_SIGNATURE)) == _HDF5_SIGNATURE
+
+def load_mat_variable(filename, variable=None):
+    """
+    Open one variable of a MATLAB file
+    
+    v7.3 files are opened with h5py (optional, only needed for them) and
+    read lazily; older files are read with scipy.io.loadmat, loading only the
+    selected variable.
+    
+    Args:
+        filename (str): Path to the .mat file
+        variable (str): Variable name (default: the first variable in the file,
+            in name order for v7.3 files)
+    
+    Returns:
+        tuple: (name, numpy.ndarray or HDF5Matrix)
+    """
+    if _is_hdf5(filename):
+        try:
+            import h5py
+        except ImportError:
+            raise ImportError(f"{filename} is a MATLAB v7.3 (HDF5) file; install h5py to read it")
+        
+        h5file = h5py.File(filename, 'r')
+        try:
+            names = [name for name in h5file if name not in _HDF5_INTERNAL_NAMES]
+            name = variable if variable is not None else (names[0] if names else None)
+            if name is None or name not in h5file:
+                raise ValueError(f"Variable {variable!r} not found in {filename}" if variable
+                                 else "No valid array found in the MATLAB file")
+            if not isinstance(h5file[name], h5py.Dataset):
+                raise ValueError(f"Variable {name!r} is not a numeric array")
+            return name, HDF5Matrix(h5file, h5file[name])
+        except Exception:
+            h5file.close()
+            raise
+    
+    if variable is None:
+        names = [name for name, shape, mat_class in scipy.io.whosmat(filename)]
+        if not names:
+            raise ValueError("No valid array found in the MATLAB file")
+        variable = names[0]
+    
+    mat_data = scipy.io.loadmat(filename, variable_names=[variable])
+    if variable not in mat_data:
+        raise ValueError(f"Variable {variable!r} not found in {filename}")
+    return variable, mat_data[variable]
+
+def close_matrix(matrix):
+    """Release the file held open by an HDF5Matrix (no-op for arrays)"""
+    if isinstance(matrix, HDF5Matrix):
+        matrix.close()
+
+def _iter_blocks(matrix, order="row-major", chunk_elements=WRITE_CHUNK_ELEMENTS):
+    """Yield the raw values of a matrix as 1-D blocks in traversal order"""
+    if isinstance(matrix, np.ndarray):
+        matrix = np.atleast_2d(matrix)
+    rows, cols = matrix.shape
+    
+    if order == "column-major":
+        outer, inner = cols, rows
+        def block(o0, o1, i0, i1):
+            return matrix[i0:i1, o0:o1].ravel(order='F')
+    else:
+        outer, inner = rows, cols
+        def block(o0, o1, i0, i1):
+            return matrix[o0:o1, i0:i1].ravel()
+    if outer == 0 or inner == 0:
+        return
+    
+    if inner >= chunk_elements:
+        # Rows (or columns) longer than a chunk are split along their length
+        for o in range(outer):
+            for i in range(0, inner, chunk_elements):
+                yield block(o, o + 1, i, i + chunk_elements)
+    else:
+        step = chunk_elements // inner
+        for o in range(0, outer, step):
+            yield block(o, o + step, 0, inner)
+
+def iter_bit_chunks(matrix, order="row-major", chunk_elements=WRITE_CHUNK_ELEMENTS, extract=None):
+    """
+    Yield the elements of a matrix as 0/1 chunks in the given traversal order
+    
+    Only one chunk is expanded at a time, so the flattened array is never
+    built, and an HDF5Matrix is read one slab per chunk. Without a pipeline
+    any non-zero element is a 1, as in nist_tests_wrapper2.py. A pipeline is
+    fed the same fixed-size sample chunks as in nist_tests_wrapper2.py, so
+    per-chunk stages such as median give the same bits whatever the shape
+    of the matrix.
+    
+    Args:
+        matrix (numpy.ndarray or HDF5Matrix): 2-D array (1-D arrays are treated as a single row)
+        order (str): "row-major" or "column-major"
+        chunk_elements (int): Approximate number of elements per chunk
+        extract (str): nist_extraction pipeline for sample data, e.g. "lsb:2,vonneumann"
+    
+    Yields:
+        numpy.ndarray: uint8 arrays of 0/1 values
+    """
+    if not extract:
+        pipeline = nist_extraction.parse_pipeline("nonzero")
+        for values in _iter_blocks(matrix, order, chunk_elements):
+            yield pipeline(values)
+        return
+    
+    # Extraction can turn each sample into many bits, so read smaller blocks,
+    # regrouped into the pipeline's fixed sample chunks
+    chunk_elements = min(chunk_elements, nist_extraction.EXTRACTION_CHUNK_SAMPLES)
+    pipeline = nist_extraction.parse_pipeline(extract)
+    yield from pipeline.iter_block_bits(_iter_blocks(matrix, order, chunk_elements))
+
+def count_values(matrix, chunk_elements=WRITE_CHUNK_ELEMENTS):
+    """
+    Count the zeros and ones of a matrix, slab by slab
+    
+    Returns:
+        tuple: (zeros, ones, total elements)
+    """
+    zeros = ones = 0
+    for values in _iter_blocks(matrix, "row-major", chunk_elements):
+        zeros += int(np.count_nonzero(values == 0))
+        ones += int(np.count_nonzero(values == 1))
+    return zeros, ones, matrix.size
+
+def element_range(matrix, start, count):
+    """Elements [start, start + count) of a matrix in row-major order, as a 1-D array"""
+    if isinstance(matrix, np.ndarray):
+        return matrix.flat[start:start + count]
+    # Partial rows at either end and whole rows in between, so a long single row is not read in full
+    rows, cols = matrix.shape
+    end = min(start + count, matrix.size)
+    parts = []
+    while start < end:
+        row, col = divmod(start, cols)
+        if col or end - start < cols:
+            stop = min(cols, col + end - start)
+            parts.append(matrix[row:row + 1, col:stop].ravel())
+            start += stop - col
+        else:
+            full = (end - start) // cols
+            parts.append(matrix[row:row + full, 0:cols].ravel())
+            start += full * cols
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=matrix.dtype)
+
+def leading_elements(matrix, count):
+    """First `count` elements of a matrix in row-major order, as a 1-D array"""
+    return element_range(matrix, 0, count)
+
+def subset_matrix(matrix, size):
+    """
+    Take the first `size` elements (row-major) as a square matrix if size is a
+    perfect square and as a single row otherwise, like the GUI's "Extract Subset"
+    """
+    flattened = leading_elements(matrix, min(size, matrix.size))
+    sqrt_size = int(np.sqrt(flattened.size))
+    if sqrt_size ** 2 == flattened.size:
+        return flattened.reshape(sqrt_size, sqrt_size)
+    return flattened.reshape(1, -1)
+
+def write_bits(f, chunks, format_type="binary"):
+    """
+    Write bit chunks to a file opened in binary mode
+    
+    ASCII formats go through a lookup table straight into bytes; "packed"
+    writes 8 bits per byte, MSB first, with the last byte zero-padded.
+    
+    Args:
+        f: Writable binary file object
+        chunks (iterable): uint8 0/1 arrays, e.g. from iter_bit_chunks()
+        format_type (str): One of OUTPUT_FORMATS
+    
+    Returns:
+        int: Number of bits written
+    """
+    separator = OUTPUT_FORMATS[format_type]
+    total = 0
+    carry = np.zeros(0, dtype=np.uint8)
+    
+    for bits in chunks:
+        if bits.size == 0:
+            continue
+        size = bits.size
+        
+        if separator is None:
+            # Keep the bits that do not fill a whole byte for the next chunk
+            bits = np.concatenate([carry, bits])
+            whole = bits.size - bits.size % 8
+            f.write(np.packbits(bits[:whole]))
+            carry = bits[whole:]
+        elif separator:
+            # One bit per line, without a separator after the very last bit
+            if total:
+                f.write(separator)
+            lines = np.empty((bits.size, 2), dtype=np.uint8)
+            lines[:, 0] = _ASCII_DIGITS[bits]
+            lines[:, 1] = separator[0]
+            f.write(lines.reshape(-1)[:-1])
+        else:
+            f.write(_ASCII_DIGITS[bits])
+        total += size
+    
+    if carry.size:
+        f.write(np.packbits(carry))
+    return total
+
+def output_path_for(input_path, output_dir, format_type="binary"):
+    """Output file for an input .mat file: same base name, .bin for packed output and .txt otherwise"""
+    base = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_dir, base + (".bin" if format_type == "packed" else ".txt"))
+
+def convert_file(input_path, output_path, variable=None, order="row-major", format_type="binary", subset=None,
+                 chunk_elements=WRITE_CHUNK_ELEMENTS, extract=None):
+    """
+    Convert one variable of a MATLAB file into a bit file for the NIST tests
+    
+    Args:
+        input_path (str): Path to the .mat file
+        output_path (str): File to write
+        variable (str): Variable name (default: the first one, see load_mat_variable())
+        order (str): "row-major" or "column-major" traversal
+        format_type (str): One of OUTPUT_FORMATS
+        subset (int): Only convert this many leading elements, see subset_matrix()
+        chunk_elements (int): Elements formatted per step
+        extract (str): Bit extraction pipeline for sample data, see iter_bit_chunks()
+    
+    Returns:
+        dict: "input", "output", "variable", "shape", "bits", "zeros" and "ones"
+    """
+    if format_type not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {format_type} (expected one of {list(OUTPUT_FORMATS)})")
+    
+    nist_extraction.parse_pipeline(extract or "nonzero")  # reject a bad pipeline before opening the file
+    name, matrix = load_mat_variable(input_path, variable)
+    try:
+        shape = matrix.shape
+        if subset is not None:
+            matrix = subset_matrix(matrix, subset)
+        
+        ones = 0
+        def counted(chunks):
+            nonlocal ones
+            for bits in chunks:
+                ones += int(np.count_nonzero(bits))
+                yield bits
+        
+        with open(output_path, 'wb') as f:
+            count = write_bits(f, counted(iter_bit_chunks(matrix, order, chunk_elements, extract)), format_type)
+    finally:
+        close_matrix(matrix)
+    
+    return {"input": input_path, "output": output_path, "variable": name, "shape": tuple(shape),
+            "bits": count, "zeros": count - ones, "ones": ones}
+
+def _convert_job(job):
+    """Pool entry point: convert_file() with the error returned instead of raised"""
+    try:
+        return convert_file(**job)
+    except Exception as e:
+        return {"input": job["input_path"], "output": job["output_path"], "error": str(e)}
+
+def find_mat_files(paths):
+    """Expand files and directories (non-recursive) into a sorted list of .mat files"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                         if name.lower().endswith(".mat"))
+        else:
+            files.append(path)
+    return files
+
+def batch_convert(paths, output_dir=None, variable=None, order="row-major", format_type="binary", subset=None,
+                  workers=1, extract=None):
+    """
+    Convert many MATLAB files, spread over a process pool
+    
+    Args:
+        paths (list): .mat files and/or directories holding them
+        output_dir (str): Directory for the outputs (default: next to each input)
+        variable, order, format_type, subset, extract: See convert_file()
+        workers (int): Worker processes (0 for one per CPU, 1 to convert in this process)
+    
+    Returns:
+        list: One convert_file() summary per input, in input order; failed
+        conversions have an "error" instead of the counts
+    """
+    jobs = []
+    for input_path in find_mat_files(paths):
+        target_dir = output_dir if output_dir is not None else os.path.dirname(os.path.abspath(input_path))
+        jobs.append(dict(input_path=input_path, output_path=output_path_for(input_path, target_dir, format_type),
+                         variable=variable, order=order, format_type=format_type, subset=subset,
+                         extract=extract))
+    
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        return [_convert_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return list(pool.map(_convert_job, jobs))
 
 class NISTFormatter:
     def __init__(self, root):
@@ -13,6 +370,9 @@ class NISTFormatter:
         
         self.array_data = None
         self.filename = None
+        self.processed_array = None
+        self.order = "row-major"
+        self.extract = None
         
         # Create main frame
         self.main_frame = tk.Frame(root, padx=20, pady=20)
@@ -41,7 +401,7 @@ class NISTFormatter:
         
         self.format_var = tk.StringVar(value="binary")
         self.format_combobox = ttk.Combobox(self.format_frame, textvariable=self.format_var, 
-                                           values=["binary", "01-ascii", "no-whitespace"])
+                                           values=list(OUTPUT_FORMATS))
         self.format_combobox.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
         
         # Traversal order
@@ -70,6 +430,26 @@ class NISTFormatter:
         self.subset_size_entry = tk.Entry(self.subset_frame, textvariable=self.subset_size_var, width=10)
         self.subset_size_entry.pack(side=tk.LEFT, padx=5)
         
+        # Bit extraction from sample data
+        self.extract_frame = tk.Frame(self.options_frame)
+        self.extract_frame.pack(fill=tk.X, pady=5)
+        
+        tk.Label(self.extract_frame, text="Bit Extraction:").pack(side=tk.LEFT, padx=5)
+        
+        self.extract_var = tk.StringVar(value="")
+        self.extract_entry = tk.Entry(self.extract_frame, textvariable=self.extract_var, width=30)
+        self.extract_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        tk.Label(self.extract_frame, text="(e.g. lsb:2,vonneumann; empty for 0/1 data)").pack(side=tk.LEFT, padx=5)
+        
+        # Copy for the stevenang test suite
+        self.data_txt_frame = tk.Frame(self.options_frame)
+        self.data_txt_frame.pack(fill=tk.X, pady=5)
+        
+        self.write_data_txt_var = tk.BooleanVar(value=False)
+        self.data_txt_check = tk.Checkbutton(self.data_txt_frame, text="Also write data.txt for the NIST suite",
+                                            variable=self.write_data_txt_var)
+        self.data_txt_check.pack(side=tk.LEFT, padx=5)
+        
         # Status display
         self.status_frame = tk.LabelFrame(self.main_frame, text="Status", padx=10, pady=10)
         self.status_frame.pack(fill=tk.BOTH, expand=True, pady=10)
@@ -91,9 +471,6 @@ class NISTFormatter:
         
         self.clear_button = tk.Button(self.button_frame, text="Clear", command=self.clear_all)
         self.clear_button.pack(side=tk.RIGHT, padx=5)
-        
-        # Store formatted output
-        self.formatted_output = None
     
     def update_status(self, message):
         """Update the status text widget with a message"""
@@ -114,43 +491,16 @@ class NISTFormatter:
             self.filename = filename
             self.update_status(f"Selected file: {os.path.basename(filename)}")
     
-    def traverse_matrix(self, matrix, order):
-        """Traverse the matrix in specified order and return flattened array"""
-        rows, cols = matrix.shape
-        result = []
-        
-        if order == "row-major":
-            # Row by row (left to right, top to bottom)
-            result = matrix.flatten()
-        
-        elif order == "column-major":
-            # Column by column (top to bottom, left to right)
-            result = matrix.T.flatten()
-        
-        return np.array(result)
-    
     def process_array(self):
         """Load the MATLAB array and process it"""
         if not self.filename:
             messagebox.showerror("Error", "Please select a MATLAB file first")
             return
-            
+        
         try:
-            # Load MATLAB file
-            mat_data = scipy.io.loadmat(self.filename)
-            
-            # Find the array in the loaded data
-            array_found = False
-            for key in mat_data.keys():
-                # Skip metadata variables that start with '__'
-                if not key.startswith('__'):
-                    self.array_data = mat_data[key]
-                    array_name = key
-                    array_found = True
-                    break
-                    
-            if not array_found:
-                raise ValueError("No valid array found in the MATLAB file")
+            # Load the first variable of the MATLAB file (v7.3 files are read lazily)
+            close_matrix(self.array_data)
+            array_name, self.array_data = load_mat_variable(self.filename)
             
             # Display information about the array
             self.update_status(f"Found array '{array_name}' with shape: {self.array_data.shape}")
@@ -161,26 +511,19 @@ class NISTFormatter:
                     subset_size = int(self.subset_size_var.get())
                     if subset_size <= 0:
                         raise ValueError("Subset size must be positive")
-                        
+                    
                     # Determine how many elements to take from the array
                     total_elements = self.array_data.size
                     if subset_size > total_elements:
                         self.update_status(f"Warning: Requested subset size ({subset_size}) larger than array size ({total_elements}). Using full array.")
                         subset_size = total_elements
                     
-                    # Flatten array and take first 'subset_size' elements
+                    # Take the first 'subset_size' elements, as a square matrix if possible
                     self.update_status(f"Extracting subset of {subset_size} elements")
-                    flattened = self.array_data.flatten()[:subset_size]
-                    
-                    # Reshape to square if possible, otherwise keep as 1D
-                    sqrt_size = int(np.sqrt(subset_size))
-                    if sqrt_size**2 == subset_size:
-                        # Perfect square, reshape to 2D
-                        processed_array = flattened.reshape(sqrt_size, sqrt_size)
-                        self.update_status(f"Reshaped to {sqrt_size}x{sqrt_size} matrix")
+                    processed_array = subset_matrix(self.array_data, subset_size)
+                    if processed_array.shape[0] > 1:
+                        self.update_status(f"Reshaped to {processed_array.shape[0]}x{processed_array.shape[1]} matrix")
                     else:
-                        # Not a perfect square, keep as 1D
-                        processed_array = flattened.reshape(1, -1)
                         self.update_status(f"Using 1D array of length {subset_size}")
                 
                 except ValueError as e:
@@ -193,66 +536,77 @@ class NISTFormatter:
             order = self.order_var.get()
             self.update_status(f"Using traversal order: {order}")
             
-            # Traverse the matrix in the specified order
-            flattened_array = self.traverse_matrix(processed_array, order)
-            
-            # Format output based on selection
-            format_type = self.format_var.get()
-            
-            if format_type == "binary":
-                # Simple binary string, all together
-                self.formatted_output = ''.join(map(str, flattened_array.astype(int)))
-                self.update_status(f"Generated binary string of length {len(self.formatted_output)}")
-            
-            elif format_type == "01-ascii":
-                # Each bit as ASCII '0' or '1' character, one per line
-                self.formatted_output = '\n'.join(map(str, flattened_array.astype(int)))
-                self.update_status(f"Generated ASCII 0/1 sequence with {len(flattened_array)} lines")
-            
-            elif format_type == "no-whitespace":
-                # Just the bits concatenated with no whitespace
-                self.formatted_output = ''.join(map(str, flattened_array.astype(int)))
-                self.update_status(f"Generated compact binary string of length {len(self.formatted_output)}")
+            # The output is formatted chunk by chunk when it is saved
+            self.processed_array = processed_array
+            self.order = order
+            self.extract = self.extract_var.get().strip() or None
             
             # Count zeros and ones for verification
-            num_zeros = np.sum(flattened_array == 0)
-            num_ones = np.sum(flattened_array == 1)
+            if self.extract:
+                self.update_status(f"Using bit extraction: {self.extract}")
+                total = num_ones = 0
+                for bits in iter_bit_chunks(processed_array, order, extract=self.extract):
+                    total += bits.size
+                    num_ones += int(np.count_nonzero(bits))
+                num_zeros = total - num_ones
+            else:
+                num_zeros, num_ones, total = count_values(processed_array)
+            self.update_status(f"Prepared {total} bits for output as {self.format_var.get()}")
             self.update_status(f"Processed binary sequence has {num_zeros} zeros and {num_ones} ones")
-            proportion = num_ones / len(flattened_array)
+            if num_zeros + num_ones < total:
+                self.update_status(f"Warning: {total - num_zeros - num_ones} elements are not 0 or 1 and are written as 1")
+            proportion = num_ones / total if total else 0.0
             self.update_status(f"Proportion of ones: {proportion:.6f}")
             
             # Enable save button
             self.save_button.config(state=tk.NORMAL)
-            
+        
         except Exception as e:
             messagebox.showerror("Error", f"Failed to process file: {str(e)}")
             self.update_status(f"Error: {str(e)}")
     
     def save_to_file(self):
-        """Save the formatted output to a text file"""
-        if not self.formatted_output:
+        """Write the processed bits to the chosen file, and to data.txt if selected"""
+        if self.processed_array is None:
             messagebox.showerror("Error", "No processed data to save")
             return
-            
+        
+        format_type = self.format_var.get()
+        if format_type not in OUTPUT_FORMATS:
+            messagebox.showerror("Error", f"Unknown output format: {format_type}")
+            return
+        
         # Open save file dialog
         save_filename = filedialog.asksaveasfilename(
             title="Save For NIST Tests",
-            defaultextension=".txt",
+            defaultextension=".bin" if format_type == "packed" else ".txt",
             filetypes=[("Text files", "*.txt"), ("Binary files", "*.bin"), ("All files", "*.*")]
         )
         
         if save_filename:
             try:
-                with open(save_filename, 'w') as f:
-                    f.write(self.formatted_output)
-                self.update_status(f"Successfully saved to: {os.path.basename(save_filename)}")
+                with open(save_filename, 'wb') as f:
+                    count = write_bits(f, iter_bit_chunks(self.processed_array, self.order, extract=self.extract),
+                                       format_type)
+                self.update_status(f"Successfully saved {count} bits to: {os.path.basename(save_filename)}")
+                if format_type == "packed" and count % 8:
+                    self.update_status(f"Note: the last byte is padded with {8 - count % 8} zero bits")
+                
+                if not self.write_data_txt_var.get():
+                    messagebox.showinfo("Success", "File saved successfully.")
+                    return
                 
-                # Also create a data.txt file for NIST testing if in same directory
+                # Also create a data.txt file for NIST testing in the same directory
                 dir_path = os.path.dirname(save_filename)
                 nist_data_path = os.path.join(dir_path, "data.txt")
                 
-                with open(nist_data_path, 'w') as f_nist:
-                    f_nist.write(self.formatted_output)
+                if format_type == "packed":
+                    # The stevenang suite reads ASCII bits
+                    with open(nist_data_path, 'wb') as f_nist:
+                        write_bits(f_nist, iter_bit_chunks(self.processed_array, self.order, extract=self.extract),
+                                   "binary")
+                elif os.path.abspath(nist_data_path) != os.path.abspath(save_filename):
+                    shutil.copyfile(save_filename, nist_data_path)
                 
                 self.update_status(f"NIST test data saved to: data.txt in same directory")
                 self.update_status("\nTo run NIST tests:")
@@ -268,8 +622,9 @@ class NISTFormatter:
         """Clear all data and reset the form"""
         self.file_path_var.set("")
         self.filename = None
+        close_matrix(self.array_data)
         self.array_data = None
-        self.formatted_output = None
+        self.processed_array = None
         
         # Reset status
         self.status_text.config(state=tk.NORMAL)
@@ -282,7 +637,41 @@ class NISTFormatter:
         self.update_status("All data cleared")
 
 
+def main(argv=None):
+    """Command line batch mode; prints one line per converted file"""
+    parser = argparse.ArgumentParser(description='Convert MATLAB arrays into bit files for the NIST test suite')
+    parser.add_argument('inputs', nargs='+', help='.mat files or directories of .mat files')
+    parser.add_argument('-o', '--output-dir', default=None, help='Output directory (default: next to each input)')
+    parser.add_argument('--variable', default=None, help='Variable to convert (default: the first one)')
+    parser.add_argument('--order', choices=["row-major", "column-major"], default="row-major",
+                        help='Matrix traversal order')
+    parser.add_argument('--format', dest='format_type', choices=list(OUTPUT_FORMATS), default="binary",
+                        help='Output format ("packed" writes 8 bits per byte, MSB first)')
+    parser.add_argument('--subset', type=int, default=None, help='Only convert this many leading elements')
+    parser.add_argument('--extract', default=None, metavar='PIPELINE',
+                        help='Bit extraction from sample data, e.g. "lsb:2", "word:16:little", "median,vonneumann"')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes (0 for one per CPU)')
+    args = parser.parse_args(argv)
+    
+    results = batch_convert(args.inputs, args.output_dir, args.variable, args.order, args.format_type,
+                            args.subset, args.workers, args.extract)
+    failed = 0
+    for result in results:
+        if "error" in result:
+            failed += 1
+            print(f"FAILED {result['input']}: {result['error']}")
+        else:
+            proportion = result["ones"] / result["bits"] if result["bits"] else 0.0
+            print(f"{result['input']} [{result['variable']} {result['shape']}] -> {result['output']}: "
+                  f"{result['bits']} bits, proportion of ones {proportion:.6f}")
+    print(f"Converted {len(results) - failed} of {len(results)} files")
+    return 1 if failed else 0
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main())
+    if tk is None:
+        sys.exit("tkinter is not available; use the command line mode (python converter.py --help)")
     root = tk.Tk()
     app = NISTFormatter(root)
     root.mainloop()
\ No newline at end of file
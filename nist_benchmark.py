@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the NIST test wrapper, the fast engine and the converter.
+
+"run" times loading, every test of the test map, the converter's output path
+and a multi-segment run on deterministic synthetic bitstreams of several
+sizes, and writes the timings and peak memory as JSON. "compare" checks a
+new result file against a stored baseline and flags regressions.
+    
+    python nist_benchmark.py run --sizes 1e5,1e6 --output current.json
+    python nist_benchmark.py compare baseline.json current.json
+"""
+
+import sys
+import os
+import json
+import time
+import shutil
+import platform
+import tempfile
+import tracemalloc
+import argparse
+from io import StringIO
+from contextlib import redirect_stdout
+import numpy as np
+
+import nist_tests_wrapper2 as wrapper
+import converter
+
+# Bitstream lengths benchmarked by default
+BENCH_SIZES = [10**5, 10**6, 10**7, 10**8]
+
+# Seed of the synthetic bitstreams, so every run tests the same bits
+BENCH_SEED = 20250101
+
+# Tests whose estimated run time (see estimate_test_cost()) exceeds this are skipped
+BENCH_MAX_SECONDS = 60.0
+
+# Segment length of the end-to-end multi-segment run
+BENCH_SEGMENT_BITS = 10**6
+
+# A benchmark is a regression when it is this much slower (or bigger) than the baseline...
+REGRESSION_THRESHOLD = 0.20
+# ...and slower by at least this many seconds, to ignore timer noise on tiny benchmarks
+REGRESSION_MIN_SECONDS = 0.005
+
+BENCH_FORMAT_VERSION = 1
+
+def make_bitstream(n, seed=BENCH_SEED):
+    """Deterministic pseudo-random bits (PCG64, stable across NumPy versions) as a uint8 0/1 array"""
+    return np.random.default_rng(seed).integers(0, 2, n, dtype=np.uint8)
+
+class BenchmarkSkipped(Exception):
+    """Raised by a benchmark body that cannot give a meaningful timing on its input"""
+
+def measure(func, repeat=3):
+    """
+    Time a benchmark and measure its peak traced memory
+    
+    The timed calls run without tracemalloc, which slows allocation-heavy
+    code down; one extra call under tracemalloc gives the peak memory.
+    
+    Args:
+        func (callable): Benchmark body, called without arguments
+        repeat (int): Timed calls
+    
+    Returns:
+        dict: "seconds" (fastest call), "mean_seconds", "repeat" and "peak_bytes"
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    
+    return {"seconds": min(times), "mean_seconds": sum(times) / len(times), "repeat": repeat, "peak_bytes": peak}
+
+def _bench_cases(n, bits, work_dir, engine, max_seconds):
+    """
+    Benchmarks for one input size, as (name, func or None, skip reason, repeat) tuples
+    
+    The input files are written to work_dir before any case runs.
+    """
+    ascii_path = os.path.join(work_dir, f"bits_{n}.txt")
+    bin_path = os.path.join(work_dir, f"bits_{n}.bin")
+    with open(ascii_path, 'wb') as f:
+        converter.write_bits(f, converter.iter_bit_chunks(bits.reshape(1, -1)), "binary")
+    with open(bin_path, 'wb') as f:
+        f.write(np.packbits(bits))
+    
+    def quiet(func, *args, **kwargs):
+        # The loaders print their segment diagnostics
+        def call():
+            with redirect_stdout(StringIO()):
+                func(*args, **kwargs)
+        return call
+    
+    cases = [
+        ("load_data/ascii", quiet(wrapper.load_data, ascii_path, n, fmt="ascii"), None, 3),
+        ("load_data/bin", quiet(wrapper.load_data, bin_path, n, fmt="bin"), None, 3),
+        ("load_bits/bin", quiet(wrapper.load_bits, bin_path, n, fmt="bin"), None, 3),
+    ]
+    
+    for test_name in wrapper.TEST_FUNCTION_MAP:
+        estimate = wrapper.estimate_test_cost(test_name, n, engine)
+        skip = f"estimated {estimate:.0f} s > {max_seconds:.0f} s" if estimate > max_seconds else None
+        
+        def run_test(test_name=test_name):
+            # A fresh Segment each call, so no test reuses features computed by an earlier one
+            record = wrapper.run_single_test(test_name, wrapper.Segment(bits), params=None, engine=engine)
+            if record["status"] == "unknown" or record["error"] == "Test function could not be resolved":
+                raise RuntimeError(record["error"])
+            if record["status"] != "ok":
+                # Tests that reject the sequence (e.g. too few excursion cycles) stop early, so their
+                # time says nothing about the test and would hide regressions
+                raise BenchmarkSkipped(record["error"])
+        
+        cases.append((f"test/{test_name}", run_test, skip, 1 if estimate > 1.0 else 3))
+    
+    matrix = bits.reshape(1, -1)
+    for format_type in ("binary", "packed"):
+        def convert(format_type=format_type):
+            with open(os.path.join(work_dir, "converted.out"), 'wb') as f:
+                converter.write_bits(f, converter.iter_bit_chunks(matrix), format_type)
+        cases.append((f"converter/{format_type}", convert, None, 3))
+    
+    segment_bits = min(n, BENCH_SEGMENT_BITS)
+    segments = max(1, n // segment_bits)
+    estimate = segments * sum(wrapper.estimate_test_cost(t, segment_bits, engine) for t in wrapper.ALL_TESTS)
+    skip = f"estimated {estimate:.0f} s > {max_seconds:.0f} s" if estimate > max_seconds else None
+    
+    def run_segments():
+        with redirect_stdout(StringIO()):
+            wrapper.run_segments(bin_path, segment_bits, num_segments=segments, fmt="bin", engine=engine)
+    cases.append((f"end_to_end/{segments}x{segment_bits}", run_segments, skip, 1))
+    return cases
+
+def run_benchmarks(sizes=BENCH_SIZES, engine="auto", max_seconds=BENCH_MAX_SECONDS, only=None, work_dir=None,
+                   log=sys.stderr):
+    """
+    Run the benchmark suite
+    
+    Args:
+        sizes (list): Bitstream lengths
+        engine (str): Engine for the tests, see resolve_engine()
+        max_seconds (float): Skip benchmarks estimated to take longer than this
+        only (list): Run only benchmarks whose name starts with one of these prefixes
+        work_dir (str): Directory for the input files (default: a temporary one, removed afterwards)
+        log: Stream for progress lines (None for silence)
+    
+    Returns:
+        dict: Environment details and one entry per benchmark and size in "results"
+    """
+    # Cached results would turn every repeat after the first into a lookup
+    wrapper.configure_result_cache(False)
+    
+    owned = work_dir is None
+    work_dir = tempfile.mkdtemp(prefix="nist_bench_") if owned else work_dir
+    os.makedirs(work_dir, exist_ok=True)
+    
+    results = []
+    try:
+        for n in sizes:
+            bits = make_bitstream(n)
+            for name, func, skip, repeat in _bench_cases(n, bits, work_dir, engine, max_seconds):
+                if only and not any(name.startswith(prefix) for prefix in only):
+                    continue
+                
+                result = {"name": name, "bits": n}
+                if skip is not None:
+                    result.update(status="skipped", error=skip)
+                else:
+                    try:
+                        result.update(measure(func, repeat), status="ok")
+                    except BenchmarkSkipped as e:
+                        result.update(status="skipped", error=str(e))
+                    except Exception as e:
+                        result.update(status="error", error=str(e))
+                results.append(result)
+                
+                if log is not None:
+                    if result["status"] == "ok":
+                        print(f"{name:42s} {n:>11d} bits {result['seconds']:10.4f} s "
+                              f"{result['peak_bytes'] / 2**20:9.1f} MiB", file=log)
+                    else:
+                        print(f"{name:42s} {n:>11d} bits {result['status']}: {result['error']}", file=log)
+    finally:
+        if owned:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    return {
+        "version": BENCH_FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "engine": engine,
+        "max_rss_bytes": wrapper.peak_rss_bytes(),
+        "results": results,
+    }
+
+def compare_results(baseline, current, threshold=REGRESSION_THRESHOLD, min_seconds=REGRESSION_MIN_SECONDS):
+    """
+    Compare two benchmark result sets
+    
+    Args:
+        baseline (dict): Stored run_benchmarks() output
+        current (dict): New run_benchmarks() output
+        threshold (float): Relative slowdown (or memory growth) that counts as a regression
+        min_seconds (float): Smallest absolute slowdown that counts as a regression
+    
+    Returns:
+        list: One dict per benchmark present in both with "name", "bits",
+        "baseline" and "current" seconds, "ratio", memory "peak_ratio" and a
+        "regression" flag (time or memory)
+    """
+    previous = {(r["name"], r["bits"]): r for r in baseline["results"] if r["status"] == "ok"}
+    rows = []
+    for result in current["results"]:
+        old = previous.get((result["name"], result["bits"]))
+        if old is None or result["status"] != "ok":
+            continue
+        
+        ratio = result["seconds"] / old["seconds"] if old["seconds"] > 0 else float("inf")
+        peak_ratio = result["peak_bytes"] / old["peak_bytes"] if old["peak_bytes"] > 0 else 1.0
+        slower = ratio > 1 + threshold and result["seconds"] - old["seconds"] >= min_seconds
+        bigger = peak_ratio > 1 + threshold and result["peak_bytes"] - old["peak_bytes"] >= 2**20
+        rows.append({
+            "name": result["name"],
+            "bits": result["bits"],
+            "baseline": old["seconds"],
+            "current": result["seconds"],
+            "ratio": ratio,
+            "peak_ratio": peak_ratio,
+            "regression": slower or bigger,
+        })
+    return rows
+
+def format_comparison(rows):
+    """Render compare_results() as a text table ending with the regression count"""
+    out = StringIO()
+    print(f"{'Benchmark':42s} {'Bits':>11s} {'Baseline s':>11s} {'Current s':>11s} {'Time':>7s} {'Memory':>7s}",
+          file=out)
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['name']:42s} {row['bits']:>11d} {row['baseline']:11.4f} {row['current']:11.4f} "
+              f"{row['ratio']:6.2f}x {row['peak_ratio']:6.2f}x{flag}", file=out)
+    regressions = sum(1 for row in rows if row["regression"])
+    print(f"{regressions} regression(s) in {len(rows)} benchmarks", file=out)
+    return out.getvalue()
+
+def _parse_sizes(text):
+    return [int(float(size)) for size in text.split(',')]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmarks for the NIST test wrapper')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    run_parser = commands.add_parser('run', help='Run the benchmarks and write JSON results')
+    run_parser.add_argument('--sizes', type=_parse_sizes, default=BENCH_SIZES,
+                            help='Comma-separated bitstream lengths (default: 1e5,1e6,1e7,1e8)')
+    run_parser.add_argument('--engine', default='auto', help='Test engine (default: auto)')
+    run_parser.add_argument('--only', default=None,
+                            help='Comma-separated name prefixes to run, e.g. "test/,load_data"')
+    run_parser.add_argument('--max-seconds', type=float, default=BENCH_MAX_SECONDS,
+                            help='Skip benchmarks estimated to take longer than this')
+    run_parser.add_argument('--work-dir', default=None, help='Directory for the input files (kept afterwards)')
+    run_parser.add_argument('--output', '-o', default=None, help='JSON result file (default: stdout)')
+    
+    compare_parser = commands.add_parser('compare', help='Compare results against a baseline')
+    compare_parser.add_argument('baseline', help='Baseline JSON result file')
+    compare_parser.add_argument('current', help='New JSON result file')
+    compare_parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                                help='Relative slowdown counted as a regression (default: 0.2)')
+    compare_parser.add_argument('--min-seconds', type=float, default=REGRESSION_MIN_SECONDS,
+                                help='Smallest absolute slowdown counted as a regression')
+    
+    args = parser.parse_args()
+    
+    if args.command == 'run':
+        only = args.only.split(',') if args.only else None
+        results = run_benchmarks(args.sizes, args.engine, args.max_seconds, only, args.work_dir)
+        text = json.dumps(results, indent=1)
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        sys.exit(0)
+    
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare_results(baseline, current, args.threshold, args.min_seconds)
+    print(format_comparison(rows), end='')
+    sys.exit(1 if any(row["regression"] for row in rows) else 0)
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Bit extraction from non-binary sample arrays (ADC samples, integer words).
+
+A pipeline is written as comma-separated stages, e.g. "lsb:2,vonneumann":
+one extractor that turns each sample into bits, optionally followed by
+filters on the resulting bit stream. Every stage works on one chunk at a
+time and carries what it needs across chunk boundaries, so captures of any
+size can be fed through with bounded memory. The median stage is the
+exception: it compares each sample with the median of its own chunk, so its
+output depends on where the chunks start. Readers therefore always feed
+pipelines chunks of exactly EXTRACTION_CHUNK_SAMPLES samples counted from the
+first sample (see ExtractionPipeline.iter_block_bits()), whatever blocks they
+read the samples in, and every reader produces the same bits.
+
+Stages:
+    nonzero: any non-zero sample is a 1 (the behaviour without extraction)
+    lsb:K: the K least significant bits of each integer sample, most significant first
+    word[:BITS][:big|little]: every byte of each integer sample, in big- or
+        little-endian byte order, each byte MSB first (BITS defaults to the
+        sample type's width and must be a multiple of 8)
+    threshold:X: 1 where the sample is greater than X
+    median: 1 where the sample is greater than the median of its chunk
+    vonneumann: von Neumann debiasing of the bit stream (01 -> 0, 10 -> 1, 00/11 dropped)
+"""
+
+import numpy as np
+
+# Samples passed through the pipeline per step by extract_bits()
+EXTRACTION_CHUNK_SAMPLES = 1 << 20
+
+class ExtractionStage:
+    """One pipeline stage; calling it with the next chunk returns the bits it produces"""
+    
+    # Extractors read samples, filters read the bits of the previous stage
+    takes_samples = False
+    
+    def __call__(self, chunk):
+        raise NotImplementedError
+
+def _as_integers(samples):
+    """Samples as int64, accepting floats only when they hold whole numbers (as MATLAB doubles often do)"""
+    if samples.dtype.kind in "iub":
+        return samples.astype(np.int64, copy=False)
+    if samples.dtype.kind == "f":
+        integers = samples.astype(np.int64)
+        if not np.array_equal(integers, samples):
+            raise ValueError("lsb and word extraction need integer samples")
+        return integers
+    raise ValueError(f"Cannot extract bits from samples of type {samples.dtype}")
+
+class NonZeroStage(ExtractionStage):
+    """Any non-zero sample is a 1"""
+    
+    takes_samples = True
+    
+    def __call__(self, samples):
+        return np.not_equal(samples, 0).view(np.uint8)
+
+class LsbStage(ExtractionStage):
+    """The k least significant bits of each sample, most significant of them first"""
+    
+    takes_samples = True
+    
+    def __init__(self, k=1):
+        k = int(k)
+        if not 1 <= k <= 64:
+            raise ValueError("lsb needs between 1 and 64 bits per sample")
+        self.k = k
+    
+    def __call__(self, samples):
+        integers = _as_integers(samples)
+        bits = np.empty((integers.size, self.k), dtype=np.uint8)
+        for column in range(self.k):
+            bits[:, column] = (integers >> (self.k - 1 - column)) & 1
+        return bits.reshape(-1)
+
+class WordStage(ExtractionStage):
+    """Every byte of each sample in the given byte order, each byte MSB first"""
+    
+    takes_samples = True
+    
+    def __init__(self, *options):
+        self.bits = None
+        self.endian = "big"
+        for option in options:
+            if option in ("big", "little"):
+                self.endian = option
+            else:
+                self.bits = int(option)
+        if self.bits is not None and (self.bits % 8 or not 8 <= self.bits <= 64):
+            raise ValueError("word needs a width of 8 to 64 bits in whole bytes")
+    
+    def __call__(self, samples):
+        bits = self.bits
+        if bits is None:
+            if samples.dtype.kind not in "iu":
+                raise ValueError(f"word needs an explicit width for {samples.dtype} samples, e.g. word:16")
+            bits = samples.dtype.itemsize * 8
+        
+        nbytes = bits // 8
+        big = self.endian == "big"
+        words = _as_integers(samples).astype('>u8' if big else '<u8')
+        raw = words.view(np.uint8).reshape(-1, 8)
+        raw = raw[:, 8 - nbytes:] if big else raw[:, :nbytes]
+        return np.unpackbits(np.ascontiguousarray(raw).reshape(-1))
+
+class ThresholdStage(ExtractionStage):
+    """1 where the sample is greater than a fixed threshold"""
+    
+    takes_samples = True
+    
+    def __init__(self, threshold=0.0):
+        self.threshold = float(threshold)
+    
+    def __call__(self, samples):
+        return np.greater(samples, self.threshold).view(np.uint8)
+
+class MedianStage(ExtractionStage):
+    """
+    1 where the sample is greater than the median of its chunk
+    
+    The median follows slow drifts of the signal: it is the median of each
+    run of EXTRACTION_CHUNK_SAMPLES samples (about a million) from the first
+    sample on, and of the shorter remainder at the end.
+    """
+    
+    takes_samples = True
+    
+    def __call__(self, samples):
+        if samples.size == 0:
+            return np.zeros(0, dtype=np.uint8)
+        return np.greater(samples, np.median(samples)).view(np.uint8)
+
+class VonNeumannStage(ExtractionStage):
+    """Von Neumann debiasing of non-overlapping bit pairs, carrying an odd bit to the next chunk"""
+    
+    def __init__(self):
+        self._carry = np.zeros(0, dtype=np.uint8)
+    
+    def __call__(self, bits):
+        bits = np.concatenate([self._carry, bits])
+        whole = bits.size - bits.size % 2
+        self._carry = bits[whole:].copy()
+        pairs = bits[:whole].reshape(-1, 2)
+        return pairs[pairs[:, 0] != pairs[:, 1], 0]
+
+# Stage names accepted by parse_pipeline(), with their classes
+EXTRACTION_STAGES = {
+    "nonzero": NonZeroStage,
+    "lsb": LsbStage,
+    "word": WordStage,
+    "threshold": ThresholdStage,
+    "median": MedianStage,
+    "vonneumann": VonNeumannStage,
+}
+
+class ExtractionPipeline:
+    """
+    A chain of stages: one extractor (nonzero if none is given) then bit filters
+    
+    Pipelines keep state between chunks, so use a new one (see
+    parse_pipeline()) for every pass over the data.
+    """
+    
+    def __init__(self, stages, spec=None):
+        stages = list(stages)
+        if not stages or not stages[0].takes_samples:
+            stages.insert(0, NonZeroStage())
+        for stage in stages[1:]:
+            if stage.takes_samples:
+                raise ValueError("Only the first stage of a pipeline can extract bits from samples")
+        self.stages = stages
+        self.spec = spec
+    
+    def __call__(self, samples):
+        """Bits produced by the next chunk of samples"""
+        chunk = np.asarray(samples).reshape(-1)
+        for stage in self.stages:
+            chunk = stage(chunk)
+        return chunk
+    
+    def iter_bits(self, samples, chunk_samples=EXTRACTION_CHUNK_SAMPLES):
+        """
+        Feed a sample array through the pipeline chunk by chunk
+        
+        Args:
+            samples (numpy.ndarray): Samples, read in C order
+            chunk_samples (int): Samples per step
+        
+        Yields:
+            numpy.ndarray: uint8 0/1 arrays (possibly empty after debiasing)
+        """
+        samples = samples.reshape(-1)
+        for start in range(0, samples.size, chunk_samples):
+            yield self(samples[start:start + chunk_samples])
+    
+    def iter_block_bits(self, blocks, chunk_samples=EXTRACTION_CHUNK_SAMPLES):
+        """
+        Feed samples read in blocks of any size through the pipeline
+        
+        The blocks are regrouped into the same chunks iter_bits() would use
+        on the concatenated samples, so the bits do not depend on how the
+        samples were read (slabs of a matrix, pieces of a file).
+        
+        Args:
+            blocks (iterable): 1-D sample arrays in order
+            chunk_samples (int): Samples per step
+        
+        Yields:
+            numpy.ndarray: uint8 0/1 arrays (possibly empty after debiasing)
+        """
+        pending, size = [], 0
+        for block in blocks:
+            block = np.asarray(block).reshape(-1)
+            while block.size:
+                take = min(chunk_samples - size, block.size)
+                pending.append(block[:take])
+                size += take
+                block = block[take:]
+                if size == chunk_samples:
+                    yield self(np.concatenate(pending))
+                    pending, size = [], 0
+        if size:
+            yield self(np.concatenate(pending))
+
+def parse_pipeline(text):
+    """
+    Build a pipeline from its text form, e.g. "word:16:little" or "median,vonneumann"
+    
+    Args:
+        text (str): Comma-separated stages, each "name" or "name:arg[:arg]"
+    
+    Returns:
+        ExtractionPipeline: A fresh pipeline
+    """
+    stages = []
+    for item in text.split(','):
+        name, *args = item.strip().split(':')
+        stage_class = EXTRACTION_STAGES.get(name)
+        if stage_class is None:
+            raise ValueError(f"Unknown extraction stage: {name} (expected one of {list(EXTRACTION_STAGES)})")
+        try:
+            stages.append(stage_class(*args))
+        except TypeError:
+            raise ValueError(f"Wrong number of arguments for extraction stage {item.strip()!r}")
+    return ExtractionPipeline(stages, text)
+
+def extract_bits(samples, pipeline, chunk_samples=EXTRACTION_CHUNK_SAMPLES):
+    """
+    Run a whole sample array through a pipeline
+    
+    Args:
+        samples (numpy.ndarray): Samples, read in C order
+        pipeline (str or ExtractionPipeline): Pipeline or its text form
+        chunk_samples (int): Samples per step
+    
+    Returns:
+        numpy.ndarray: uint8 array of 0/1 values
+    """
+    if isinstance(pipeline, str):
+        pipeline = parse_pipeline(pipeline)
+    chunks = list(pipeline.iter_bits(samples, chunk_samples))
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.uint8)
@@ -0,0 +1,953 @@
+#!/usr/bin/env python3
+"""
+Vectorized NumPy implementations of the NIST SP 800-22 randomness tests.
+
+Every test takes the uint8 0/1 array produced by the wrapper's loaders and
+returns the list of p-values the test produces. They follow the formulas of
+NIST SP 800-22 Rev. 1a and can be cross-checked against the reference
+modules through the wrapper's "crosscheck" engine.
+"""
+
+import math
+import numpy as np
+from scipy.special import erfc, gammaincc, ndtr
+
+# Bumped whenever a change alters the p-values a test returns, invalidating cached results
+ENGINE_VERSION = 1
+
+def _as_bits(bits):
+    """Return bits as a 1-D uint8 array"""
+    return np.asarray(bits, dtype=np.uint8).reshape(-1)
+
+# States tracked by the random excursions tests
+EXCURSION_STATES = [-4, -3, -2, -1, 1, 2, 3, 4]
+VARIANT_STATES = list(range(-9, 0)) + list(range(1, 10))
+
+class SegmentFeatures:
+    """
+    Per-segment cache of the data several tests derive from the same bits
+    
+    Each feature is computed on first use and then shared by every test run
+    on the same segment, so e.g. the cumulative sums and both random
+    excursions tests build the +/-1 random walk only once.
+    """
+    
+    def __init__(self, bits):
+        self.bits = _as_bits(bits)
+        self._cache = {}
+    
+    def __len__(self):
+        return self.bits.size
+    
+    def _memo(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+    
+    def walk(self):
+        """Partial sums S_1 .. S_n of the +/-1 sequence (int64)"""
+        return self._memo("walk", lambda: np.cumsum(2 * self.bits.astype(np.int64) - 1))
+    
+    def excursion_cycles(self):
+        """
+        Visits to each excursion state within each zero-to-zero cycle of the walk
+        
+        Returns:
+            numpy.ndarray: (cycles, len(EXCURSION_STATES)) visit counts
+        """
+        return self._memo("excursion_cycles", self._compute_excursion_cycles)
+    
+    def _compute_excursion_cycles(self):
+        walk = self.walk()
+        zeros = walk == 0
+        
+        # A position belongs to the cycle numbered by the zeros before it;
+        # the walk is closed with a final zero unless it already ends on one
+        cycle_count = int(np.count_nonzero(zeros)) + int(walk.size > 0 and walk[-1] != 0)
+        cycle_ids = np.cumsum(zeros) - zeros
+        
+        in_range = (np.abs(walk) <= 4) & ~zeros
+        columns = walk[in_range] + 4
+        columns -= columns > 4  # state 0 has no column
+        counts = np.bincount(cycle_ids[in_range] * len(EXCURSION_STATES) + columns,
+                             minlength=cycle_count * len(EXCURSION_STATES))
+        return counts.reshape(cycle_count, len(EXCURSION_STATES))
+    
+    def state_visits(self):
+        """Total visits of the walk to each of VARIANT_STATES"""
+        return self._memo("state_visits", self._compute_state_visits)
+    
+    def _compute_state_visits(self):
+        walk = self.walk()
+        counts = np.bincount(walk[np.abs(walk) <= 9] + 9, minlength=19)
+        return np.delete(counts, 9)
+    
+    def pattern_counts(self, m):
+        """
+        Counts of the overlapping m-bit patterns, wrapping around the end
+        
+        Counts for a smaller m are folded from any larger m already counted
+        (an m-bit pattern at position i extends exactly one (m-1)-bit pattern
+        there), so the serial and approximate entropy tests and sweeps over m
+        share one pass over the bits.
+        
+        Args:
+            m (int): Pattern length (0 gives [n])
+        
+        Returns:
+            numpy.ndarray: 2**m counts indexed by the pattern's value, first bit most significant
+        """
+        counted = [key[1] for key in self._cache if isinstance(key, tuple) and key[0] == "pattern_counts"]
+        larger = [length for length in counted if length >= m]
+        if not larger:
+            return self._memo(("pattern_counts", m), lambda: self._compute_pattern_counts(m))
+        
+        return fold_pattern_counts(self._cache[("pattern_counts", min(larger))], m)
+    
+    def _compute_pattern_counts(self, m):
+        if m == 0:
+            return np.array([self.bits.size], dtype=np.int64)
+        return np.bincount(self.window_codes(m).astype(np.int64), minlength=1 << m)
+    
+    def window_codes(self, m):
+        """
+        Integer code of the m-bit window starting at every position, wrapping around the end
+        
+        The first n - m + 1 codes are the windows that lie wholly inside the
+        segment; the template tests cut their blocks from those.
+        
+        Args:
+            m (int): Window length
+        
+        Returns:
+            numpy.ndarray: n codes, first bit most significant
+        """
+        return self._memo(("window_codes", m), lambda: self._compute_window_codes(m))
+    
+    def _compute_window_codes(self, m):
+        n = self.bits.size
+        if not 0 < m <= n:
+            raise ValueError(f"Pattern length {m} does not fit the {n}-bit segment")
+        
+        dtype = np.uint16 if m <= 16 else np.uint32 if m <= 32 else np.uint64
+        extended = np.concatenate([self.bits, self.bits[:m - 1]]).astype(dtype)
+        codes = np.zeros(n, dtype=dtype)
+        for j in range(m):
+            codes <<= dtype(1)
+            codes |= extended[j:j + n]
+        return codes
+
+def fold_pattern_counts(counts, m):
+    """Fold counts of longer cyclic patterns down to the m-bit pattern counts"""
+    while counts.size > (1 << m):
+        counts = counts.reshape(-1, 2).sum(axis=1)
+    return counts
+
+def as_features(data):
+    """Wrap a bit array in SegmentFeatures (features are passed through unchanged)"""
+    if isinstance(data, SegmentFeatures):
+        return data
+    return SegmentFeatures(data)
+
+def frequency_test(data):
+    """
+    Frequency (monobit) test
+    
+    Args:
+        data (numpy.ndarray or SegmentFeatures): The segment's bits
+    
+    Returns:
+        list: [p_value]
+    """
+    bits = as_features(data).bits
+    n = bits.size
+    if n == 0:
+        raise ValueError("Frequency test needs at least one bit")
+    
+    return [frequency_p_value(n, int(np.count_nonzero(bits)))]
+
+def frequency_p_value(n, ones):
+    """Frequency test p-value for n bits of which `ones` are 1"""
+    s_obs = abs(2 * ones - n) / math.sqrt(n)
+    return math.erfc(s_obs / math.sqrt(2))
+
+def block_frequency_test(data, block_size=128):
+    """
+    Frequency test within a block
+    
+    Args:
+        data (numpy.ndarray or SegmentFeatures): The segment's bits
+        block_size (int): Length M of each block
+    
+    Returns:
+        list: [p_value]
+    """
+    bits = as_features(data).bits
+    block_count = bits.size // block_size
+    if block_count == 0:
+        raise ValueError(f"Block frequency test needs at least {block_size} bits")
+    
+    blocks = bits[:block_count * block_size].reshape(block_count, block_size)
+    excess = 2 * np.count_nonzero(blocks, axis=1).astype(np.int64) - block_size
+    return [block_frequency_p_value(block_size, block_count, int(np.sum(excess ** 2)))]
+
+def block_frequency_p_value(block_size, block_count, squared_excess):
+    """
+    Block frequency test p-value
+    
+    Args:
+        block_size (int): Block length M
+        block_count (int): Number of blocks N
+        squared_excess (int): Sum over the blocks of (2 * ones - M)**2, which
+            is 4 * M**2 times the sum of (pi_i - 1/2)**2
+    
+    Returns:
+        float: p_value
+    """
+    chi_squared = squared_excess / block_size
+    return float(gammaincc(block_count / 2.0, chi_squared / 2.0))
+
+def runs_test(data):
+    """
+    Runs test
+    
+    Args:
+        data (numpy.ndarray or SegmentFeatures): The segment's bits
+    
+    Returns:
+        list: [p_value] (0.0 when the frequency pre-test fails)
+    """
+    bits = as_features(data).bits
+    n = bits.size
+    if n < 2:
+        raise ValueError("Runs test needs at least two bits")
+    
+    v_obs = 1 + int(np.count_nonzero(bits[1:] != bits[:-1]))
+    return [runs_p_value(n, int(np.count_nonzero(bits)), v_obs)]
+
+def runs_p_value(n, ones, v_obs):
+    """Runs test p-value for n bits with `ones` ones and v_obs runs (0.0 when the frequency pre-test fails)"""
+    pi = ones / n
+    if abs(pi - 0.5) >= 2.0 / math.sqrt(n):
+        return 0.0
+    
+    numerator = abs(v_obs - 2.0 * n * pi * (1.0 - pi))
+    denominator = 2.0 * math.sqrt(2.0 * n) * pi * (1.0 - pi)
+    return math.erfc(numerator / denominator)
+
+# Longest-run-of-ones parameters by minimum sequence length:
+# (block size M, upper edge of the first bin, probabilities of each bin)
+_LONGEST_RUN_TABLE = [
+    (750000, 10000, 10, [0.0882, 0.2092, 0.2483, 0.1933, 0.1208, 0.0675, 0.0727]),
+    (6272, 128, 4, [0.1174, 0.2430, 0.2493, 0.1752, 0.1027, 0.1124]),
+    (128, 8, 1, [0.2148, 0.3672, 0.2305, 0.1875]),
+]
+
+def longest_runs_per_block(bits, block_size):
+    """
+    Length of the longest run of ones in each consecutive block
+    
+    Args:
+        bits (numpy.ndarray): uint8 0/1 array
+        block_size (int): Block length
+    
+    Returns:
+        numpy.ndarray: Longest run of each full block
+    """
+    bits = _as_bits(bits)
+    block_count = bits.size // block_size
+    
+    # A zero column after every block keeps runs from spilling into the next one
+    padded = np.zeros((block_count, block_size + 1), dtype=np.int8)
+    padded[:, :block_size] = bits[:block_count * block_size].reshape(block_count, block_size)
+    edges = np.diff(padded.reshape(-1), prepend=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    
+    longest = np.zeros(block_count, dtype=np.int64)
+    np.maximum.at(longest, starts // (block_size + 1), ends - starts)
+    return longest
+
+def longest_run_test(data):
+    """
+    Test for the longest run of ones in a block
+    
+    Args:
+        data (numpy.ndarray or SegmentFeatures): The segment's bits (at least 128 bits)
+    
+    Returns:
+        list: [p_value]
+    """
+    bits = as_features(data).bits
+    n = bits.size
+    
+    for min_length, block_size, first_bin, probabilities in _LONGEST_RUN_TABLE:
+        if n >= min_length:
+            break
+    else:
+        raise ValueError("Longest run test needs at least 128 bits")
+    
+    longest = longest_runs_per_block(bits, block_size)
+    bins = np.clip(longest - first_bin, 0, len(probabilities) - 1)
+    observed = np.bincount(bins, minlength=len(probabilities))
+    
+    expected = longest.size * np.asarray(probabilities)
+    chi_squared = float(np.sum((observed - expected) ** 2 / expected))
+    return [float(gammaincc((len(probabilities) - 1) / 2.0, chi_squared / 2.0))]
+
+def cumulative_sums_p_value(n, z):
+    """P-value of the cumulative sums test for a maximum excursion z"""
+    if z == 0:
+        return 1.0
+    
+    sqrt_n = math.sqrt(n)
+    k = np.arange(int((-n / z + 1) / 4), math.floor((n / z - 1) / 4) + 1)
+    sum1 = np.sum(ndtr((4 * k + 1) * z / sqrt_n) - ndtr((4 * k - 1) * z / sqrt_n))
+    
+    k = np.arange(int((-n / z - 3) / 4), math.floor((n / z - 1) / 4) + 1)
+    sum2 = np.sum(ndtr((4 * k + 3) * z / sqrt_n) - ndtr((4 * k + 1) * z / sqrt_n))
+    
+    return float(1.0 - sum1 + sum2)
+
+def cumulative_sums_test(data):
+    """
+    Cumulative sums (cusum) test, forward and backward
+    
+    Args:
+        data (numpy.ndarray or SegmentFeatures): The segment's bits
+    
+    Returns:
+        list: [forward p_value, backward p_value]
+    """
+    features = as_features(data)
+    n = len(features)
+    if n == 0:
+        raise ValueError("Cumulative sums test needs at least one bit")
+    
+    walk = features.walk()
+    forward = int(np.max(np.abs(walk)))
+    
+    # Partial sums taken from the end are S_n - S_k for k = 0 .. n-1 (with S_0 = 0)
+    backward = int(max(abs(walk[-1]), np.max(np.abs(walk[-1] - walk[:-1]), initial=0)))
+    
+    return [cumulative_sums_p_value(n, forward), cumulative_sums_p_value(n, backward)]
+
+# Memory budget for one rfft batch when spectral_test_batch() picks the batch size itself
+SPECTRAL_BATCH_BYTES = 256 * 1024 * 1024
+
+def spectral_test_batch(segments, batch_size=None):
+    """
+    Discrete Fourier transform (spectral) test on many equal-length segments
+    
+    Segments are stacked into 2-D blocks and each block is transformed with a
+    single numpy.fft.rfft call over its rows.
+    
+    Args:
+        segments (list or numpy.ndarray): Equal-length uint8 0/1 arrays, or a
+            2-D array with one segment per row
+        batch_size (int): Most segments transformed at once (default: as many
+            as fit in SPECTRAL_BATCH_BYTES)
+    
+    Returns:
+        numpy.ndarray: One p_value per segment
+    """
+    segments = [as_features(segment).bits for segment in segments]
+    if not segments:
+        return np.zeros(0)
+    
+    n = segments[0].size
+    if any(segment.size != n for segment in segments):
+        raise ValueError("Batched spectral test needs segments of equal length")
+    if n < 2:
+        raise ValueError("Spectral test needs at least two bits")
+    
+    if batch_size is None:
+        # Input row (float64) plus rfft output row (complex128) per segment
+        bytes_per_row = 8 * n + 16 * (n // 2 + 1)
+        batch_size = max(1, SPECTRAL_BATCH_BYTES // bytes_per_row)
+    
+    threshold = math.sqrt(math.log(1.0 / 0.05) * n)
+    expected_peaks = 0.95 * n / 2.0
+    
+    p_values = np.empty(len(segments))
+    for start in range(0, len(segments), batch_size):
+        block = np.stack(segments[start:start + batch_size]).astype(np.float64)
+        block *= 2.0
+        block -= 1.0
+        
+        modulus = np.abs(np.fft.rfft(block, axis=1)[:, :n // 2])
+        peaks_below = np.count_nonzero(modulus < threshold, axis=1)
+        d = (peaks_below - expected_peaks) / math.sqrt(n * 0.95 * 0.05 / 4.0)
+        p_values[start:start + len(block)] = erfc(np.abs(d) / math.sqrt(2.0))
+    
+    return p_values
+
+def spectral_test(data, batch_size=None):
+    """
+    Discrete Fourier transform (spectral) test
+    
+    Args:
+        data (numpy.ndarray or SegmentFeatures): The segment's bits
+        batch_size (int): Unused for a single segment; accepted so the
+            wrapper can pass the same parameters as to spectral_test_segments()
+    
+    Returns:
+        list: [p_value]
+    """
+    return [float(spectral_test_batch([data])[0])]
+
+def spectral_test_segments(segments, batch_size=None):
+    """
+    Spectral test on many segments, in the per-segment form of BATCH_TESTS
+    
+    Args:
+        segments (list): Equal-length segments (bit arrays or SegmentFeatures)
+        batch_size (int): Most segments transformed at once, see spectral_test_batch()
+    
+    Returns:
+        list: [p_value] for each segment
+    """
+    return [[float(p)] for p in spectral_test_batch(segments, batch_size)]
+
+def _pack_rows(bits, cols):
+    """
+    Pack consecutive runs of cols bits into unsigned integers, first bit most significant
+    
+    Args:
+        bits (numpy.ndarray): uint8 0/1 array whose length is a multiple of cols
+        cols (int): Bits per row, at most 64
+    
+    Returns:
+        numpy.ndarray: One uint64 word per row
+    """
+    packed = np.packbits(bits.reshape(-1, cols), axis=1)
+    words = np.zeros(packed.shape[0], dtype=np.uint64)
+    for column in range(packed.shape[1]):
+        words = (words << np.uint64(8)) | packed[:, column].astype(np.uint64)
+    return words >> np.uint64(8 * packed.shape[1] - cols)
+
+def gf2_ranks(bits, rows=32, cols=32):
+    """
+    Rank over GF(2) of every rows x cols matrix cut from the bits
+    
+    Each matrix row is packed into one machine word and Gauss-Jordan
+    elimination runs on all matrices at once: for each column a pivot row is
+    picked per matrix and XORed into every other row with that bit set.
+    
+    Args:
+        bits (numpy.ndarray): uint8 0/1 array, filled into matrices row by row;
+            bits past the last whole matrix are ignored
+        rows (int): Rows M of each matrix
+        cols (int): Columns Q of each matrix, at most 64
+    
+    Returns:
+        numpy.ndarray: Rank of each matrix
+    """
+    if not 0 < cols <= 64 or rows <= 0:
+        raise ValueError("Matrix rank needs 1-64 columns and at least one row")
+    
+    bits = _as_bits(bits)
+    matrix_count = bits.size // (rows * cols)
+    words = _pack_rows(bits[:matrix_count * rows * cols], cols).reshape(matrix_count, rows)
+    
+    ranks = np.zeros(matrix_count, dtype=np.int64)
+    used = np.zeros(words.shape, dtype=bool)
+    matrices = np.arange(matrix_count)
+    for column in range(cols):
+        bit = np.uint64(1 << (cols - 1 - column))
+        has_bit = (words & bit) != 0
+        candidates = has_bit & ~used
+        found = candidates.any(axis=1)
+        pivots = candidates.argmax(axis=1)
+        
+        pivot_rows = words[matrices, pivots]
+        has_bit[matrices, pivots] = False
+        has_bit &= found[:, None]
+        words ^= np.where(has_bit, pivot_rows[:, None], np.uint64(0))
+        
+        used[matrices[found], pivots[found]] = True
+        ranks += found
+    
+    return ranks
+
+def rank_probabilities(rows=32, cols=32):
+    """
+    Probabilities that a random rows x cols binary matrix has full rank,
+    full rank minus one, or lower rank
+    
+    Returns:
+        list: [p_full, p_full_minus_one, p_lower]
+    """
+    def probability(rank):
+        product = 1.0
+        for i in range(rank):
+            product *= (1.0 - 2.0 ** (i - cols)) * (1.0 - 2.0 ** (i - rows)) / (1.0 - 2.0 ** (i - rank))
+        return 2.0 ** (rank * (cols + rows - rank) - rows * cols) * product
+    
+    full_rank = min(rows, cols)
+    p_full = probability(full_rank)
+    p_minus_one = probability(full_rank - 1) if full_rank > 1 else 0.0
+    return [p_full, p_minus_one, 1.0 - p_full - p_minus_one]
+
+def binary_matrix_rank_test(data, rows=32, cols=32):
+    """
+    Binary matrix rank test
+    
+    Args:
+        data (numpy.ndarray or SegmentFeatures): The segment's bits
+        rows (int): Rows M of each matrix
+        cols (int): Columns Q of each matrix, at most 64
+    
+    Returns:
+        list: [p_value]
+    """
+    features = as_features(data)
+    ranks = features._memo(("gf2_ranks", rows, cols), lambda: gf2_ranks(features.bits, rows, cols))
+    matrix_count = ranks.size
+    if matrix_count == 0:
+        raise ValueError(f"Binary matrix rank test needs at least {rows * cols} bits")
+    
+    full_rank = min(rows, cols)
+    observed = [np.count_nonzero(ranks == full_rank), np.count_nonzero(ranks == full_rank - 1)]
+    observed.append(matrix_count - sum(observed))
+    
+    chi_squared = sum((count - p * matrix_count) ** 2 / (p * matrix_count)
+                      for count, p in zip(observed, rank_probabilities(rows, cols)) if p > 0)
+    return [math.exp(-chi_squared / 2.0)]
+
+def _shift_left_one(words):
+    """Shift multi-word bit rows (bit i of the row is bit i % 64 of word i // 64) up by one bit"""
+    shifted = words << np.uint64(1)
+    shifted[:, 1:] |= words[:, :-1] >> np.uint64(63)
+    return shifted
+
+def _row_parity(words):
+    """Parity (0 or 1) of the set bits in each multi-word row"""
+    folded = np.bitwise_xor.reduce(words, axis=1)
+    for shift in (32, 16, 8, 4, 2, 1):
+        folded ^= folded >> np.uint64(shift)
+    return (folded & np.uint64(1)).astype(bool)
+
+def linear_complexities(bits, block_size=500):
+    """
+    Linear complexity of every block, by Berlekamp-Massey on all blocks at once
+    
+    The connection polynomial C(x), the shifted previous polynomial x^(n-m) B(x)
+    and the last bits of the sequence (most recent first) are kept as packed
+    64-bit words per block, so each step's discrepancy is the parity of
+    C AND window and each update is a masked XOR over all blocks.
+    
+    Args:
+        bits (numpy.ndarray): uint8 0/1 array; bits past the last whole block are ignored
+        block_size (int): Length M of each block
+    
+    Returns:
+        numpy.ndarray: Linear complexity L of each block
+    """
+    bits = _as_bits(bits)
+    block_count = bits.size // block_size
+    blocks = bits[:block_count * block_size].reshape(block_count, block_size).astype(bool)
+    
+    # Polynomials have degree at most block_size, so block_size + 1 bits per row
+    word_count = block_size // 64 + 1
+    connection = np.zeros((block_count, word_count), dtype=np.uint64)
+    connection[:, 0] = 1
+    previous = connection.copy()
+    window = np.zeros_like(connection)
+    complexity = np.zeros(block_count, dtype=np.int64)
+    
+    for n in range(block_size):
+        window = _shift_left_one(window)
+        window[:, 0] |= blocks[:, n]
+        
+        discrepancy = _row_parity(connection & window)
+        previous = _shift_left_one(previous)
+        
+        updated = connection ^ previous
+        grow = discrepancy & (2 * complexity <= n)
+        previous[grow] = connection[grow]
+        complexity[grow] = n + 1 - complexity[grow]
+        connection[discrepancy] = updated[discrepancy]
+    
+    return complexity
+
+# Probabilities of the seven T classes of the linear complexity test
+LINEAR_COMPLEXITY_PROBABILITIES = [0.010417, 0.03125, 0.125, 0.5, 0.25, 0.0625, 0.020833]
+
+def linear_complexity_test(data, block_size=500):
+    """
+    Linear complexity test
+    
+    Args:
+        data (numpy.ndarray or SegmentFeatures): The segment's bits
+        block_size (int): Length M of each block
+    
+    Returns:
+        list: [p_value]
+    """
+    features = as_features(data)
+    complexity = features._memo(("linear_complexities", block_size),
+                                lambda: linear_complexities(features.bits, block_size))
+    block_count = complexity.size
+    if block_count == 0:
+        raise ValueError(f"Linear complexity test needs at least {block_size} bits")
+    
+    mean = (block_size / 2.0 + (9.0 + (-1) ** (block_size + 1)) / 36.0
+            - (block_size / 3.0 + 2.0 / 9.0) / 2.0 ** block_size)
+    t = (-1) ** block_size * (complexity - mean) + 2.0 / 9.0
+    
+    # Classes T <= -2.5, (-2.5, -1.5], ..., (1.5, 2.5], T > 2.5
+    observed = np.bincount(np.searchsorted([-2.5, -1.5, -0.5, 0.5, 1.5, 2.5], t, side="left"),
+                           minlength=7)
+    expected = block_count * np.array(LINEAR_COMPLEXITY_PROBABILITIES)
+    chi_squared = float(np.sum((observed - expected) ** 2 / expected))
+    return [float(gammaincc(3.0, chi_squared / 2.0))]
+
+def _psi_squared(n, counts, m):
+    """Serial test statistic psi^2_m from longer cyclic pattern counts (0 for m <= 0)"""
+    if m <= 0:
+        return 0.0
+    folded = fold_pattern_counts(counts, m).astype(np.float64)
+    return float((1 << m) / n * np.sum(folded ** 2) - n)
+
+def serial_p_values(n, counts, m):
+    """
+    Serial test p-values from the cyclic m-bit pattern counts of n bits
+    
+    Returns:
+        list: [p_value1, p_value2]
+    """
+    psi = [_psi_squared(n, counts, m - k) for k in range(3)]
+    del_psi = psi[0] - psi[1]
+    del2_psi = psi[0] - 2 * psi[1] + psi[2]
+    return [float(gammaincc(2.0 ** (m - 2), del_psi / 2.0)),
+            float(gammaincc(2.0 ** (m - 3), del2_psi / 2.0))]
+
+def serial_test(data, pattern_length=16):
+    """
+    Serial test
+    
+    Args:
+        data (numpy.ndarray or SegmentFeatures): The segment's bits
+        pattern_length (int): Pattern length m
+    
+    Returns:
+        list: [p_value1, p_value2]
+    """
+    features = as_features(data)
+    m = pattern_length
+    if m < 2:
+        raise ValueError("Serial test needs a pattern length of at least 2")
+    
+    return serial_p_values(len(features), features.pattern_counts(m), m)
+
+def _phi(n, counts, m):
+    """Approximate entropy statistic phi^(m) = sum of pi_i log pi_i over the m-bit patterns"""
+    proportions = fold_pattern_counts(counts, m) / float(n)
+    proportions = proportions[proportions > 0]
+    return float(np.sum(proportions * np.log(proportions)))
+
+def approximate_entropy_p_value(n, counts, m):
+    """Approximate entropy test p-value from the cyclic (m+1)-bit (or longer) pattern counts of n bits"""
+    ap_en = _phi(n, counts, m) - _phi(n, counts, m + 1)
+    chi_squared = 2.0 * n * (math.log(2) - ap_en)
+    return float(gammaincc(2.0 ** (m - 1), chi_squared / 2.0))
+
+def approximate_entropy_test(data, pattern_length=10):
+    """
+    Approximate entropy test
+    
+    Args:
+        data (numpy.ndarray or SegmentFeatures): The segment's bits
+        pattern_length (int): Block length m
+    
+    Returns:
+        list: [p_value]
+    """
+    features = as_features(data)
+    m = pattern_length
+    if m < 1:
+        raise ValueError("Approximate entropy test needs a pattern length of at least 1")
+    
+    return [approximate_entropy_p_value(len(features), features.pattern_counts(m + 1), m)]
+
+def aperiodic_templates(m=9):
+    """
+    Every m-bit template that cannot overlap a shifted copy of itself
+    
+    These are the templates of the non-overlapping template matching test
+    (148 of them for m = 9).
+    
+    Returns:
+        list: Template codes in increasing order, first bit most significant
+    """
+    templates = []
+    for code in range(1 << m):
+        bits = [(code >> (m - 1 - i)) & 1 for i in range(m)]
+        if all(bits[shift:] != bits[:m - shift] for shift in range(1, m)):
+            templates.append(code)
+    return templates
+
+def _template_block_codes(features, m, block_size, block_count):
+    """Codes of the m-bit windows lying wholly inside each block, one row per block"""
+    codes = features.window_codes(m)
+    starts = np.arange(block_count) * block_size
+    return codes[starts[:, None] + np.arange(block_size - m + 1)]
+
+def non_overlapping_template_test(data, template_length=9, block_count=8, templates=None):
+    """
+    Non-overlapping template matching test for a whole set of templates
+    
+    A template that cannot overlap itself never matches twice within m bits,
+    so its non-overlapping count in a block is its plain window count, and
+    all templates are counted from one bincount of the block's window codes.
+    
+    Args:
+        data (numpy.ndarray or SegmentFeatures): The segment's bits
+        template_length (int): Template length m
+        block_count (int): Number of blocks N
+        templates (list): Template codes or "0"/"1" strings (default: every
+            aperiodic template of length m)
+    
+    Returns:
+        list: One p_value per template
+    """
+    features = as_features(data)
+    m = template_length
+    if templates is None:
+        templates = aperiodic_templates(m)
+    templates = [int(t, 2) if isinstance(t, str) else int(t) for t in templates]
+    
+    for template in templates:
+        bits = [(template >> (m - 1 - i)) & 1 for i in range(m)]
+        if not all(bits[shift:] != bits[:m - shift] for shift in range(1, m)):
+            raise ValueError(f"Template {template:0{m}b} is periodic; its matches can overlap")
+    
+    block_size = len(features) // block_count
+    if block_size < m:
+        raise ValueError(f"Non-overlapping template test needs at least {block_count * m} bits")
+    
+    block_codes = _template_block_codes(features, m, block_size, block_count).astype(np.int64)
+    offsets = (np.arange(block_count) << m)[:, None]
+    counts = np.bincount((block_codes + offsets).ravel(), minlength=block_count << m)
+    matches = counts.reshape(block_count, 1 << m)[:, templates]
+    
+    mean = (block_size - m + 1) / 2.0 ** m
+    variance = block_size * (1.0 / 2.0 ** m - (2.0 * m - 1.0) / 2.0 ** (2 * m))
+    chi_squared = np.sum((matches - mean) ** 2, axis=0) / variance
+    return [float(p) for p in gammaincc(block_count / 2.0, chi_squared / 2.0)]
+
+# SP 800-22 Rev. 1a class probabilities for m = 9, M = 1032, K = 5
+_OVERLAPPING_PROBABILITIES = [0.364091, 0.185659, 0.139381, 0.100571, 0.0704323, 0.139865]
+
+def overlapping_probabilities(template_length=9, block_size=1032, classes=5):
+    """
+    Probabilities of 0, 1, ..., classes - 1 and at least `classes` overlapping
+    matches of the all-ones template in a block
+    
+    The published exact values are used for the standard parameters and the
+    SP 800-22 approximation otherwise.
+    """
+    if (template_length, block_size, classes) == (9, 1032, 5):
+        return list(_OVERLAPPING_PROBABILITIES)
+    
+    eta = (block_size - template_length + 1) / 2.0 ** template_length / 2.0
+    probabilities = [math.exp(-eta)]
+    for u in range(1, classes):
+        total = sum(math.comb(u - 1, l - 1) * eta ** l / math.factorial(l) for l in range(1, u + 1))
+        probabilities.append(math.exp(-eta) / 2.0 ** u * total)
+    probabilities.append(1.0 - sum(probabilities))
+    return probabilities
+
+def overlapping_template_test(data, template_length=9, block_size=1032, classes=5):
+    """
+    Overlapping template matching test (all-ones template)
+    
+    Args:
+        data (numpy.ndarray or SegmentFeatures): The segment's bits
+        template_length (int): Template length m
+        block_size (int): Block length M
+        classes (int): Number of degrees of freedom K
+    
+    Returns:
+        list: [p_value]
+    """
+    features = as_features(data)
+    m = template_length
+    block_count = len(features) // block_size
+    if block_count == 0 or block_size < m:
+        raise ValueError(f"Overlapping template test needs at least {block_size} bits")
+    
+    block_codes = _template_block_codes(features, m, block_size, block_count)
+    matches = np.count_nonzero(block_codes == (1 << m) - 1, axis=1)
+    observed = np.bincount(np.minimum(matches, classes), minlength=classes + 1)
+    
+    expected = block_count * np.array(overlapping_probabilities(m, block_size, classes))
+    chi_squared = float(np.sum((observed - expected) ** 2 / expected))
+    return [float(gammaincc(classes / 2.0, chi_squared / 2.0))]
+
+# Expected value and variance of the universal test statistic for L = 1 .. 16
+_UNIVERSAL_TABLE = {
+    1: (0.7326495, 0.690), 2: (1.5374383, 1.338), 3: (2.4016068, 1.901),
+    4: (3.3112247, 2.358), 5: (4.2534266, 2.705), 6: (5.2177052, 2.954),
+    7: (6.1962507, 3.125), 8: (7.1836656, 3.238), 9: (8.1764248, 3.311),
+    10: (9.1723243, 3.356), 11: (10.170032, 3.384), 12: (11.168765, 3.401),
+    13: (12.168070, 3.410), 14: (13.167693, 3.416), 15: (14.167488, 3.419),
+    16: (15.167379, 3.421),
+}
+
+def universal_block_length(n):
+    """
+    Block length L for an n-bit sequence: the largest L with n >= 1010 * 2**L * L
+    
+    This reproduces the SP 800-22 table (L = 6 from 387,840 bits up to L = 16
+    from 1,059,061,760 bits) and extends it down to L = 2 for short sequences,
+    keeping Q = 10 * 2**L initialisation blocks and K >= 1000 * 2**L test blocks.
+    (At L = 1 the variance correction factor c is negative.)
+    """
+    lengths = [L for L in _UNIVERSAL_TABLE if L >= 2 and n >= 1010 * 2 ** L * L]
+    if not lengths:
+        raise ValueError(f"Universal test needs at least {1010 * 4 * 2} bits")
+    return max(lengths)
+
+def universal_statistic(bits, L, Q):
+    """
+    Universal test statistic f_n: mean log2 distance of each test block to
+    the previous occurrence of its code
+    
+    Args:
+        bits (numpy.ndarray): uint8 0/1 array
+        L (int): Block length
+        Q (int): Initialisation blocks
+    
+    Returns:
+        float: f_n
+    """
+    block_total = bits.size // L
+    blocks = bits[:block_total * L].reshape(block_total, L)
+    codes = blocks.astype(np.int64) @ (1 << np.arange(L - 1, -1, -1))
+    
+    # 1-based block positions; a code not seen before counts from position 0
+    order = np.argsort(codes, kind="stable")
+    previous = np.zeros(block_total, dtype=np.int64)
+    same_code = codes[order[1:]] == codes[order[:-1]]
+    previous[order[1:][same_code]] = order[:-1][same_code] + 1
+    distances = np.arange(Q + 1, block_total + 1) - previous[Q:]
+    return float(np.sum(np.log2(distances))) / (block_total - Q)
+
+def universal_test(data, pattern_length=None, init_blocks=None):
+    """
+    Maurer's "universal statistical" test
+    
+    The sequence is cut into L-bit blocks whose codes come from one matrix
+    product; sorting the codes (stably) puts each block next to the previous
+    occurrence of the same code, which gives the distance since the last
+    occurrence for every test block at once.
+    
+    Args:
+        data (numpy.ndarray or SegmentFeatures): The segment's bits
+        pattern_length (int): Block length L (default: universal_block_length(n))
+        init_blocks (int): Initialisation blocks Q (default: 10 * 2**L)
+    
+    Returns:
+        list: [p_value]
+    """
+    bits = as_features(data).bits
+    L = pattern_length or universal_block_length(bits.size)
+    if L not in _UNIVERSAL_TABLE or L < 2:
+        raise ValueError(f"Universal test block length must be 2-16, not {L}")
+    Q = init_blocks or 10 * 2 ** L
+    
+    block_total = bits.size // L
+    K = block_total - Q
+    if K <= 0:
+        raise ValueError(f"Universal test needs more than {Q * L} bits for L = {L}")
+    
+    fn = universal_statistic(bits, L, Q)
+    expected, variance = _UNIVERSAL_TABLE[L]
+    c = 0.7 - 0.8 / L + (4.0 + 32.0 / L) * K ** (-3.0 / L) / 15.0
+    sigma = c * math.sqrt(variance / K)
+    return [math.erfc(abs(fn - expected) / (math.sqrt(2.0) * sigma))]
+
+# Smallest number of zero-to-zero cycles for which the excursion tests are valid
+MIN_EXCURSION_CYCLES = 500
+
+def _excursion_cycle_count(features):
+    """Number of cycles J of the walk, checked against MIN_EXCURSION_CYCLES"""
+    cycle_count = features.excursion_cycles().shape[0]
+    if cycle_count < MIN_EXCURSION_CYCLES:
+        raise ValueError(f"Random excursions tests need at least {MIN_EXCURSION_CYCLES} cycles "
+                         f"(found {cycle_count}); use a longer sequence")
+    return cycle_count
+
+def random_excursions_test(data):
+    """
+    Random excursions test
+    
+    Args:
+        data (numpy.ndarray or SegmentFeatures): The segment's bits
+    
+    Returns:
+        list: One p_value per state in EXCURSION_STATES
+    """
+    features = as_features(data)
+    cycle_count = _excursion_cycle_count(features)
+    visits = features.excursion_cycles()
+    
+    # nu[k, x]: number of cycles visiting state x exactly k times (k = 5 means 5 or more)
+    nu = np.stack([np.count_nonzero(np.minimum(visits, 5) == k, axis=0) for k in range(6)])
+    
+    x = np.abs(np.asarray(EXCURSION_STATES, dtype=np.float64))
+    k = np.arange(1, 5)[:, None]
+    pi = np.vstack([
+        1.0 - 1.0 / (2.0 * x),
+        (1.0 / (4.0 * x * x)) * (1.0 - 1.0 / (2.0 * x)) ** (k - 1),
+        (1.0 / (2.0 * x)) * (1.0 - 1.0 / (2.0 * x)) ** 4,
+    ])
+    
+    expected = cycle_count * pi
+    chi_squared = np.sum((nu - expected) ** 2 / expected, axis=0)
+    return [float(p) for p in gammaincc(2.5, chi_squared / 2.0)]
+
+def random_excursions_variant_test(data):
+    """
+    Random excursions variant test
+    
+    Args:
+        data (numpy.ndarray or SegmentFeatures): The segment's bits
+    
+    Returns:
+        list: One p_value per state in VARIANT_STATES
+    """
+    features = as_features(data)
+    cycle_count = _excursion_cycle_count(features)
+    visits = features.state_visits()
+    
+    x = np.abs(np.asarray(VARIANT_STATES, dtype=np.float64))
+    p_values = erfc(np.abs(visits - cycle_count) / np.sqrt(2.0 * cycle_count * (4.0 * x - 2.0)))
+    return [float(p) for p in p_values]
+
+# Fast implementation of each wrapper test name
+FAST_TESTS = {
+    "frequency": frequency_test,
+    "block_frequency": block_frequency_test,
+    "runs": runs_test,
+    "longest_run": longest_run_test,
+    "fft": spectral_test,
+    "non_overlapping_template": non_overlapping_template_test,
+    "overlapping_template": overlapping_template_test,
+    "universal": universal_test,
+    "rank": binary_matrix_rank_test,
+    "linear_complexity": linear_complexity_test,
+    "serial": serial_test,
+    "approximate_entropy": approximate_entropy_test,
+    "cumulative_sums": cumulative_sums_test,
+    "random_excursions": random_excursions_test,
+    "random_excursions_variant": random_excursions_variant_test,
+}
+
+# Tests that can evaluate many equal-length segments in one call; each takes a list of
+# segments (plus the test's parameters) and returns the p-value list of every segment
+BATCH_TESTS = {
+    "fft": spectral_test_segments,
+}
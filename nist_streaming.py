@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Streaming evaluation of the NIST SP 800-22 tests that only need running statistics.
+
+Each accumulator is fed the sequence chunk by chunk and keeps the sufficient
+statistics of its test (bit counts, run transitions, random-walk extremes,
+cyclic pattern counts), so inputs far larger than memory can be tested. The
+final p-values are computed with the same formulas as nist_fast_tests.
+"""
+
+import time
+import numpy as np
+import nist_fast_tests
+
+class StreamAccumulator:
+    """Running statistics of one test; update() with each chunk, then result()"""
+    
+    def __init__(self):
+        self.n = 0
+    
+    def update(self, bits):
+        """Add the next chunk (uint8 0/1 array) of the sequence"""
+        self.n += bits.size
+    
+    def result(self):
+        """Return the test's p-value list for everything seen so far"""
+        raise NotImplementedError
+
+class FrequencyAccumulator(StreamAccumulator):
+    """Frequency (monobit) test: count of ones"""
+    
+    def __init__(self):
+        super().__init__()
+        self.ones = 0
+    
+    def update(self, bits):
+        super().update(bits)
+        self.ones += int(np.count_nonzero(bits))
+    
+    def result(self):
+        if self.n == 0:
+            raise ValueError("Frequency test needs at least one bit")
+        return [nist_fast_tests.frequency_p_value(self.n, self.ones)]
+
+class BlockFrequencyAccumulator(StreamAccumulator):
+    """Block frequency test: sum of squared block excesses, carrying the partial block"""
+    
+    def __init__(self, block_size=128):
+        super().__init__()
+        self.block_size = block_size
+        self.block_count = 0
+        self.squared_excess = 0
+        self._partial = np.zeros(0, dtype=np.uint8)
+    
+    def update(self, bits):
+        super().update(bits)
+        bits = np.concatenate([self._partial, bits])
+        block_count = bits.size // self.block_size
+        blocks = bits[:block_count * self.block_size].reshape(block_count, self.block_size)
+        excess = 2 * np.count_nonzero(blocks, axis=1).astype(np.int64) - self.block_size
+        
+        self.block_count += block_count
+        self.squared_excess += int(np.sum(excess ** 2))
+        self._partial = bits[block_count * self.block_size:].copy()
+    
+    def result(self):
+        if self.block_count == 0:
+            raise ValueError(f"Block frequency test needs at least {self.block_size} bits")
+        return [nist_fast_tests.block_frequency_p_value(self.block_size, self.block_count,
+                                                        self.squared_excess)]
+
+class RunsAccumulator(StreamAccumulator):
+    """Runs test: ones and bit transitions, carrying the last bit across chunks"""
+    
+    def __init__(self):
+        super().__init__()
+        self.ones = 0
+        self.transitions = 0
+        self._last = None
+    
+    def update(self, bits):
+        if bits.size == 0:
+            return
+        super().update(bits)
+        self.ones += int(np.count_nonzero(bits))
+        self.transitions += int(np.count_nonzero(bits[1:] != bits[:-1]))
+        if self._last is not None and self._last != bits[0]:
+            self.transitions += 1
+        self._last = bits[-1]
+    
+    def result(self):
+        if self.n < 2:
+            raise ValueError("Runs test needs at least two bits")
+        return [nist_fast_tests.runs_p_value(self.n, self.ones, 1 + self.transitions)]
+
+class CumulativeSumsAccumulator(StreamAccumulator):
+    """
+    Cumulative sums test: the walk's final value, its largest |S_k| and the
+    range of S_0 .. S_(n-1), which bounds the backward partial sums S_n - S_k
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.total = 0
+        self.forward = 0
+        self.lowest = 0
+        self.highest = 0
+    
+    def update(self, bits):
+        if bits.size == 0:
+            return
+        super().update(bits)
+        walk = self.total + np.cumsum(2 * bits.astype(np.int64) - 1)
+        self.forward = max(self.forward, int(np.max(np.abs(walk))))
+        
+        # Partial sums before each position of the chunk: S_k for k = start .. end-1
+        before = walk[:-1]
+        self.lowest = min(self.lowest, int(np.min(before, initial=self.total)))
+        self.highest = max(self.highest, int(np.max(before, initial=self.total)))
+        self.total = int(walk[-1])
+    
+    def result(self):
+        if self.n == 0:
+            raise ValueError("Cumulative sums test needs at least one bit")
+        backward = max(abs(self.total - self.lowest), abs(self.total - self.highest))
+        return [nist_fast_tests.cumulative_sums_p_value(self.n, self.forward),
+                nist_fast_tests.cumulative_sums_p_value(self.n, backward)]
+
+class PatternCountAccumulator(StreamAccumulator):
+    """
+    Cyclic counts of the overlapping m-bit patterns
+    
+    The last m - 1 bits of each chunk are carried into the next one, and the
+    first m - 1 bits of the sequence are kept to close the wraparound windows
+    when the counts are read.
+    """
+    
+    def __init__(self, m):
+        super().__init__()
+        self.m = m
+        self.counts = np.zeros(1 << m, dtype=np.int64)
+        self._head = np.zeros(0, dtype=np.uint8)
+        self._tail = np.zeros(0, dtype=np.uint8)
+    
+    def _count_windows(self, bits):
+        windows = bits.size - self.m + 1
+        if windows <= 0:
+            return
+        codes = np.zeros(windows, dtype=np.int64)
+        for j in range(self.m):
+            codes <<= 1
+            codes |= bits[j:j + windows]
+        self.counts += np.bincount(codes, minlength=1 << self.m)
+    
+    def update(self, bits):
+        super().update(bits)
+        if self._head.size < self.m - 1:
+            self._head = np.concatenate([self._head, bits[:self.m - 1 - self._head.size]])
+        
+        bits = np.concatenate([self._tail, bits])
+        self._count_windows(bits)
+        self._tail = bits[bits.size - min(bits.size, self.m - 1):].copy()
+    
+    def pattern_counts(self, m):
+        """Cyclic m-bit pattern counts of the sequence so far (m <= self.m)"""
+        if self.n < self.m:
+            raise ValueError(f"Pattern length {self.m} is longer than the {self.n}-bit sequence")
+        
+        closing = PatternCountAccumulator(self.m)
+        closing._count_windows(np.concatenate([self._tail, self._head]))
+        return nist_fast_tests.fold_pattern_counts(self.counts + closing.counts, m)
+
+class SerialAccumulator(StreamAccumulator):
+    """Serial test, reading a PatternCountAccumulator shared with other tests"""
+    
+    def __init__(self, patterns, pattern_length=16):
+        super().__init__()
+        if pattern_length < 2:
+            raise ValueError("Serial test needs a pattern length of at least 2")
+        self.patterns = patterns
+        self.pattern_length = pattern_length
+    
+    def update(self, bits):
+        pass  # the shared pattern counter is fed by StreamingRun
+    
+    def result(self):
+        m = self.pattern_length
+        return nist_fast_tests.serial_p_values(self.patterns.n, self.patterns.pattern_counts(m), m)
+
+class ApproximateEntropyAccumulator(StreamAccumulator):
+    """Approximate entropy test, reading a PatternCountAccumulator shared with other tests"""
+    
+    def __init__(self, patterns, pattern_length=10):
+        super().__init__()
+        if pattern_length < 1:
+            raise ValueError("Approximate entropy test needs a pattern length of at least 1")
+        self.patterns = patterns
+        self.pattern_length = pattern_length
+    
+    def update(self, bits):
+        pass  # the shared pattern counter is fed by StreamingRun
+    
+    def result(self):
+        m = self.pattern_length
+        return [nist_fast_tests.approximate_entropy_p_value(self.patterns.n,
+                                                            self.patterns.pattern_counts(m + 1), m)]
+
+# Tests that can be evaluated in streaming mode, with their accumulator classes
+STREAMING_TESTS = {
+    "frequency": FrequencyAccumulator,
+    "block_frequency": BlockFrequencyAccumulator,
+    "runs": RunsAccumulator,
+    "serial": SerialAccumulator,
+    "approximate_entropy": ApproximateEntropyAccumulator,
+    "cumulative_sums": CumulativeSumsAccumulator,
+}
+
+# Longest pattern the shared counter may need (2**m int64 counts)
+MAX_STREAM_PATTERN_LENGTH = 24
+
+class StreamingRun:
+    """
+    Accumulators for a list of (test name, parameters) runs fed from one stream
+    
+    The serial and approximate entropy runs share a single pattern counter
+    sized for the longest pattern any of them needs. A run whose test is not
+    in STREAMING_TESTS, or whose parameters are rejected, gets no accumulator
+    and an entry in errors instead.
+    """
+    
+    def __init__(self, runs):
+        self.runs = list(runs)
+        self.accumulators = []
+        self.errors = []
+        self.elapsed = [0.0] * len(self.runs)
+        self.patterns = None
+        self._pattern_elapsed = 0.0
+        
+        longest = max([self._pattern_length_needed(name, params) for name, params in self.runs], default=0)
+        if 0 < longest <= MAX_STREAM_PATTERN_LENGTH:
+            self.patterns = PatternCountAccumulator(longest)
+        
+        for test_name, params in self.runs:
+            accumulator, error = None, None
+            try:
+                accumulator_class = STREAMING_TESTS.get(test_name)
+                if accumulator_class is None:
+                    error = f"{test_name} needs the whole sequence and is not available in streaming mode"
+                elif self._pattern_length_needed(test_name, params):
+                    if self.patterns is None:
+                        raise ValueError(f"Streaming pattern length is limited to {MAX_STREAM_PATTERN_LENGTH} bits")
+                    accumulator = accumulator_class(self.patterns, **params)
+                else:
+                    accumulator = accumulator_class(**params)
+            except Exception as e:
+                error = str(e)
+            self.accumulators.append(accumulator)
+            self.errors.append(error)
+    
+    @staticmethod
+    def _pattern_length_needed(test_name, params):
+        if test_name == "serial":
+            return params.get("pattern_length", 16)
+        if test_name == "approximate_entropy":
+            return params.get("pattern_length", 10) + 1
+        return 0
+    
+    def update(self, bits):
+        """Feed the next chunk to every accumulator"""
+        bits = np.asarray(bits, dtype=np.uint8)
+        if self.patterns is not None:
+            start = time.perf_counter()
+            self.patterns.update(bits)
+            self._pattern_elapsed += time.perf_counter() - start
+        for i, accumulator in enumerate(self.accumulators):
+            if accumulator is not None:
+                start = time.perf_counter()
+                accumulator.update(bits)
+                self.elapsed[i] += time.perf_counter() - start
+    
+    def results(self):
+        """
+        Final p-values of every run
+        
+        Returns:
+            list: (p_values, error, elapsed) per run; p_values is None on error.
+            The shared pattern counting time is charged to each run using it.
+        """
+        results = []
+        for accumulator, error, elapsed in zip(self.accumulators, self.errors, self.elapsed):
+            if accumulator is None:
+                results.append((None, error, elapsed))
+                continue
+            if isinstance(accumulator, (SerialAccumulator, ApproximateEntropyAccumulator)):
+                elapsed += self._pattern_elapsed
+            
+            start = time.perf_counter()
+            try:
+                p_values, error = accumulator.result(), None
+            except Exception as e:
+                p_values, error = None, str(e)
+            results.append((p_values, error, elapsed + time.perf_counter() - start))
+        return results
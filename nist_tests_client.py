@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Thin client for a nist_tests_wrapper2.py --serve daemon.
+
+Takes the same main arguments as nist_tests_wrapper2.py and prints the same
+report, but sends the run to a warm server process over its Unix socket, so
+numpy, scipy and the test modules are not imported again for every run. The
+server is started in the background when none is listening, and the run
+falls back to a direct nist_tests_wrapper2.py call if it cannot be reached.
+Only the standard library is imported here to keep start-up fast.
+"""
+
+import sys
+import os
+import json
+import socket
+import subprocess
+import tempfile
+import time
+import argparse
+
+# Must match DEFAULT_SERVE_SOCKET in nist_tests_wrapper2.py (the server creates the directory with mode 0700)
+DEFAULT_SERVE_SOCKET = os.path.join(tempfile.gettempdir(), f"nist_tests_{getattr(os, 'getuid', lambda: 0)()}",
+                                    "server.sock")
+
+# Seconds to wait for a freshly started server to accept connections
+SERVER_START_TIMEOUT = 30.0
+
+# Seconds without requests after which a server started by this client exits
+SERVER_IDLE_TIMEOUT = 900.0
+
+# Must match SERVE_CODE_FILES in nist_tests_wrapper2.py
+SERVE_CODE_FILES = ("nist_tests_wrapper2.py", "nist_fast_tests.py", "nist_streaming.py", "nist_extraction.py",
+                    "converter.py")
+
+WRAPPER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nist_tests_wrapper2.py")
+
+def code_version(directory=os.path.dirname(WRAPPER_SCRIPT)):
+    """Fingerprint of the wrapper code on disk, as code_version() in nist_tests_wrapper2.py computes it"""
+    parts = []
+    for name in SERVE_CODE_FILES:
+        try:
+            stat = os.stat(os.path.join(directory, name))
+            parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+        except OSError:
+            parts.append(f"{name}:missing")
+    return ";".join(parts)
+
+def send_request(request, socket_path=DEFAULT_SERVE_SOCKET):
+    """
+    Send one request to the server and return its decoded reply
+    
+    Args:
+        request (dict): Request, see handle_request() in nist_tests_wrapper2.py
+        socket_path (str): Server socket
+    
+    Returns:
+        dict: Reply with "ok" and "result" or "error"
+    
+    Raises:
+        PermissionError: If the socket belongs to another user
+    """
+    if hasattr(os, "getuid") and os.lstat(socket_path).st_uid != os.getuid():
+        raise PermissionError(f"{socket_path} is owned by another user")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall((json.dumps(request) + "\n").encode('utf-8'))
+        connection.shutdown(socket.SHUT_WR)
+        with connection.makefile('r', encoding='utf-8') as reply:
+            return json.loads(reply.readline())
+
+def start_server(socket_path=DEFAULT_SERVE_SOCKET, timeout=SERVER_START_TIMEOUT):
+    """
+    Start a detached server on socket_path and wait until it answers a ping
+    
+    Returns:
+        bool: Whether the server is reachable
+    """
+    process = subprocess.Popen([sys.executable, WRAPPER_SCRIPT, "--serve", socket_path,
+                                "--idle-timeout", str(SERVER_IDLE_TIMEOUT)],
+                               stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               cwd=os.path.dirname(WRAPPER_SCRIPT), start_new_session=True)
+    
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and process.poll() is None:
+        try:
+            return send_request({"op": "ping"}, socket_path)["ok"]
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+def stop_stale_server(socket_path=DEFAULT_SERVE_SOCKET, timeout=SERVER_START_TIMEOUT):
+    """
+    Shut down a server running older code than is on disk and wait until its socket is gone
+    
+    Returns:
+        bool: Whether a stale server was stopped
+    """
+    reply = send_request({"op": "ping"}, socket_path)
+    if reply.get("ok") and reply["result"].get("version") == code_version():
+        return False
+    
+    send_request({"op": "shutdown"}, socket_path)
+    deadline = time.monotonic() + timeout
+    while os.path.exists(socket_path) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return True
+
+def call_server(request, socket_path=DEFAULT_SERVE_SOCKET, spawn=True):
+    """
+    Send a request, starting the server first if none is listening
+    
+    A server whose code is older than the files on disk is shut down first
+    (and replaced if spawn is set), so runs never use stale code.
+    
+    Returns:
+        dict: The server's reply, or None if no server could be reached
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        if request.get("op") == "shutdown" or not stop_stale_server(socket_path):
+            return send_request(request, socket_path)
+    except OSError:
+        pass
+    if not spawn or not start_server(socket_path):
+        return None
+    try:
+        return send_request(request, socket_path)
+    except OSError:
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Client for the NIST test wrapper daemon')
+    parser.add_argument('input_file', nargs='?', help='Path to the input binary file')
+    parser.add_argument('bit_length', type=int, nargs='?', help='Number of bits to process')
+    parser.add_argument('tests', nargs='?', default='all', help='Comma-separated list of tests to run')
+    parser.add_argument('--offset', type=int, default=0, help='Bit offset from start of file')
+    parser.add_argument('--format', dest='input_format', default='auto', help='Input file format')
+    parser.add_argument('--bit-order', default='msb', help='Bit order within each byte of a raw binary file')
+    parser.add_argument('--extract', default=None, help='Bit extraction pipeline, as for nist_tests_wrapper2.py')
+    parser.add_argument('--engine', default='auto', help='Test engine, as for nist_tests_wrapper2.py')
+    parser.add_argument('--stream', action='store_true', help='Read the input in chunks with bounded memory')
+    parser.add_argument('--json', action='store_true', help='Print the structured records as JSON')
+    parser.add_argument('--cache', action='store_true', help='Use the result cache, as for nist_tests_wrapper2.py')
+    parser.add_argument('--socket', default=DEFAULT_SERVE_SOCKET, help='Server socket path')
+    parser.add_argument('--no-spawn', action='store_true', help='Do not start a server if none is running')
+    parser.add_argument('--shutdown', action='store_true', help='Stop the running server and exit')
+    
+    args = parser.parse_args()
+    
+    if args.shutdown:
+        reply = call_server({"op": "shutdown"}, args.socket, spawn=False)
+        sys.exit(0 if reply and reply["ok"] else 1)
+    
+    if args.input_file is None or args.bit_length is None:
+        parser.error("input_file and bit_length are required")
+    
+    request = {
+        "op": "run",
+        "input_file": os.path.abspath(args.input_file),
+        "bit_length": args.bit_length,
+        "tests": args.tests,
+        "offset": args.offset,
+        "format": args.input_format,
+        "bit_order": args.bit_order,
+        "extract": args.extract,
+        "engine": args.engine,
+        "stream": args.stream,
+        "cache": True if args.cache else None,
+        "text": not args.json,
+    }
+    reply = call_server(request, args.socket, spawn=not args.no_spawn)
+    
+    if reply is None:
+        # No server: run the wrapper directly with the same arguments
+        command = [sys.executable, WRAPPER_SCRIPT, args.input_file, str(args.bit_length), args.tests,
+                   '--offset', str(args.offset), '--format', args.input_format,
+                   '--bit-order', args.bit_order, '--engine', args.engine]
+        command += ['--extract', args.extract] * bool(args.extract)
+        command += ['--stream'] * args.stream + ['--json'] * args.json + ['--cache'] * args.cache
+        sys.exit(subprocess.call(command))
+    
+    if not reply["ok"]:
+        print(f"Error: {reply['error']}")
+        sys.exit(1)
+    
+    print(reply["result"] if isinstance(reply["result"], str) else json.dumps(reply["result"]))
@@ -8,9 +8,22 @@ import os
 import io
 from io import StringIO
 import importlib.util
+import hashlib
+import json
+import math
+import tempfile
+import time
+import traceback
+import cProfile
+import tracemalloc
+from contextlib import redirect_stdout, contextmanager
 import numpy as np
 import argparse
 
+import nist_fast_tests
+import nist_streaming
+import nist_extraction
+
 def import_module_from_file(file_path):
     """Import a module from file path"""
     try:
@@ -20,7 +33,7 @@ def import_module_from_file(file_path):
             print(f"Working directory: {os.getcwd()}")
             print(f"Files in directory: {[f for f in os.listdir('.') if f.endswith('.py')]}")
             return None
-            
+        
         # Get the module name from the file path
         module_name = os.path.splitext(os.path.basename(file_path))[0]
         
@@ -38,284 +51,2331 @@ def import_module_from_file(file_path):
         if spec is None:
             print(f"Could not create module spec for: {module_name} at {file_path}")
             return None
-            
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[module_name] = module
-        spec.loader.exec_module(module)
         
-        print(f"Successfully imported module: {module_name} from {file_path}")
-        return module
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+        
+        print(f"Successfully imported module: {module_name} from {file_path}")
+        return module
+    
+    except ImportError as ie:
+        print(f"Import error for {file_path}: {ie}")
+        print(f"This might indicate missing dependencies or Python version incompatibility")
+        return None
+    except SyntaxError as se:
+        print(f"Syntax error in {file_path}: {se}")
+        print(f"This might indicate Python 2 vs Python 3 compatibility issues")
+        return None
+    except Exception as e:
+        print(f"Error importing {file_path}: {e}")
+        print(f"Exception type: {type(e).__name__}")
+        return None
+
+# Test module file mapping - verified with the GUI list
+TEST_FILE_MAP = {
+    "frequency": "FrequencyTest.py",
+    "block_frequency": "FrequencyTest.py",
+    "runs": "RunTest.py",
+    "longest_run": "RunTest.py",
+    "rank": "Matrix.py",
+    "fft": "Spectral.py",
+    "non_overlapping_template": "TemplateMatching.py",
+    "overlapping_template": "TemplateMatching.py",
+    "universal": "Universal.py",
+    "linear_complexity": "Complexity.py",
+    "serial": "Serial.py",
+    "approximate_entropy": "ApproximateEntropy.py",
+    "cumulative_sums": "CumulativeSum.py",
+    "random_excursions": "RandomExcursions.py",
+    "random_excursions_variant": "RandomExcursions.py"
+}
+
+# Function name mapping - verified with the GUI list
+TEST_FUNCTION_MAP = {
+    "frequency": "FrequencyTest.monobit_test",
+    "block_frequency": "FrequencyTest.block_frequency",
+    "runs": "RunTest.run_test",
+    "longest_run": "RunTest.longest_one_block_test",
+    "rank": "Matrix.binary_matrix_rank_text",
+    "fft": "SpectralTest.spectral_test",
+    "non_overlapping_template": "TemplateMatching.non_overlapping_test",
+    "overlapping_template": "TemplateMatching.overlapping_patterns",
+    "universal": "Universal.statistical_test",
+    "linear_complexity": "ComplexityTest.linear_complexity_test",
+    "serial": "Serial.serial_test",
+    "approximate_entropy": "ApproximateEntropy.approximate_entropy_test",
+    "cumulative_sums": "CumulativeSums.cumulative_sums_test",
+    "random_excursions": "RandomExcursions.random_excursions_test",
+    "random_excursions_variant": "RandomExcursions.variant_test"
+}
+
+# Every test, in the order used by the GUI and the command line
+ALL_TESTS = list(TEST_FILE_MAP)
+
+# Test modules imported by load_test_module(), keyed by absolute path: (mtime, module)
+_MODULE_CACHE = {}
+
+# Resolved test callables, keyed by test name: (module path, mtime, function)
+_TEST_REGISTRY = {}
+
+def clear_test_registry():
+    """Forget every cached test module and callable so the next run re-imports them"""
+    _MODULE_CACHE.clear()
+    _TEST_REGISTRY.clear()
+
+def load_test_module(file_path, reload=False):
+    """
+    Import a test module once per process
+    
+    The module is re-imported when its file's modification time changes or
+    when reload is True; otherwise the cached module is returned.
+    
+    Args:
+        file_path (str): Path to the module file
+        reload (bool): Force a fresh import
+    
+    Returns:
+        module: The imported module, or None if the import failed
+    """
+    path = os.path.abspath(file_path)
+    mtime = os.path.getmtime(path)
+    
+    cached = _MODULE_CACHE.get(path)
+    if cached is not None and not reload and cached[0] == mtime:
+        return cached[1]
+    
+    module = import_module_from_file(path)
+    if module is not None:
+        _MODULE_CACHE[path] = (mtime, module)
+    return module
+
+def resolve_test(test_name, script_dir=None, reload=False):
+    """
+    Resolve a test name from TEST_FUNCTION_MAP into its callable
+    
+    Resolved callables are kept in a per-process registry and re-used until
+    the module file changes on disk, so repeated runs pay no import cost.
+    
+    Args:
+        test_name (str): Key of TEST_FILE_MAP / TEST_FUNCTION_MAP
+        script_dir (str): Directory holding the test modules (default: this script's directory)
+        reload (bool): Re-import the module even if it is cached
+    
+    Returns:
+        callable: The test function, or None if it could not be resolved
+    """
+    if script_dir is None:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+    module_path = os.path.join(script_dir, TEST_FILE_MAP[test_name])
+    
+    # Check if the file exists
+    if not os.path.isfile(module_path):
+        print(f"Error: Test module file {module_path} not found.")
+        return None
+    
+    mtime = os.path.getmtime(module_path)
+    entry = _TEST_REGISTRY.get(test_name)
+    if entry is not None and not reload and entry[0] == module_path and entry[1] == mtime:
+        return entry[2]
+    
+    # Import the module directly
+    module = load_test_module(module_path, reload)
+    if module is None:
+        print(f"Error: Failed to import module from {module_path}.")
+        return None
+    
+    # Get the test function using the correct format
+    function_name = TEST_FUNCTION_MAP[test_name]
+    
+    # Check if the function is a class method
+    if '.' in function_name:
+        # Handle class method format like "FrequencyTest.monobit_test"
+        class_name, method_name = function_name.split('.')
+        if hasattr(module, class_name) and hasattr(getattr(module, class_name), method_name):
+            test_class = getattr(module, class_name)
+            test_func = getattr(test_class, method_name)
+        else:
+            print(f"Error: Class {class_name} or method {method_name} not found in module {test_name}.")
+            print(f"Available classes: {[c for c in dir(module) if not c.startswith('_') and c[0].isupper()]}")
+            if hasattr(module, class_name):
+                print(f"Available methods in {class_name}: {[m for m in dir(getattr(module, class_name)) if not m.startswith('_')]}")
+            return None
+    else:
+        # Direct function call
+        if not hasattr(module, function_name):
+            print(f"Error: Function {function_name} not found in module {test_name}.")
+            # List available functions in the module
+            print(f"Available functions: {[f for f in dir(module) if not f.startswith('_')]}")
+            return None
+        
+        test_func = getattr(module, function_name)
+    
+    _TEST_REGISTRY[test_name] = (module_path, mtime, test_func)
+    return test_func
+
+# Number of input bytes decoded per step when reading ASCII bit files
+ASCII_CHUNK_BYTES = 1 << 24
+
+# Bits read per step in streaming mode (one uint8 per bit while a chunk is processed)
+STREAM_CHUNK_BITS = 1 << 24
+
+# ASCII codes for the characters '0' and '1'
+_ASCII_ZERO = 48
+_ASCII_ONE = 49
+
+def read_ascii_bits(filename, chunk_bytes=ASCII_CHUNK_BYTES):
+    """
+    Decode an ASCII '0'/'1' file into a NumPy bit array
+    
+    The file is memory-mapped and decoded in fixed-size chunks with vectorized
+    byte comparisons. Every character other than '0' or '1' (newlines, spaces,
+    carriage returns, ...) is skipped, matching the original string pipeline.
+    
+    Args:
+        filename (str): Path to the input file
+        chunk_bytes (int): Number of file bytes decoded per step
+    
+    Returns:
+        numpy.ndarray: uint8 array holding one 0/1 value per bit
+    """
+    if os.path.getsize(filename) == 0:
+        return np.zeros(0, dtype=np.uint8)
+    
+    raw = np.memmap(filename, dtype=np.uint8, mode='r')
+    bits = np.empty(raw.size, dtype=np.uint8)
+    count = 0
+    
+    for start in range(0, raw.size, chunk_bytes):
+        chunk = raw[start:start + chunk_bytes]
+        keep = (chunk == _ASCII_ZERO) | (chunk == _ASCII_ONE)
+        
+        if keep.all():
+            # Fast path for files without whitespace
+            np.subtract(chunk, _ASCII_ZERO, out=bits[count:count + chunk.size])
+            count += chunk.size
+        else:
+            decoded = chunk[keep]
+            np.subtract(decoded, _ASCII_ZERO, out=bits[count:count + decoded.size])
+            count += decoded.size
+    
+    del raw
+    return bits[:count]
+
+def iter_ascii_bits(filename, chunk_bytes=ASCII_CHUNK_BYTES):
+    """
+    Decode an ASCII '0'/'1' file chunk by chunk without holding all of its bits
+    
+    Args:
+        filename (str): Path to the input file
+        chunk_bytes (int): Number of file bytes decoded per step
+    
+    Yields:
+        numpy.ndarray: uint8 0/1 arrays, in file order
+    """
+    if os.path.getsize(filename) == 0:
+        return
+    
+    raw = np.memmap(filename, dtype=np.uint8, mode='r')
+    for start in range(0, raw.size, chunk_bytes):
+        chunk = raw[start:start + chunk_bytes]
+        keep = (chunk == _ASCII_ZERO) | (chunk == _ASCII_ONE)
+        yield np.subtract(chunk if keep.all() else chunk[keep], _ASCII_ZERO, dtype=np.uint8)
+
+def bits_to_string(bits):
+    """Convert a 0/1 NumPy array back into the '0'/'1' string used by the test modules"""
+    return np.add(bits, _ASCII_ZERO, dtype=np.uint8).tobytes().decode('ascii')
+
+# Input formats understood by open_bit_source()
+INPUT_FORMATS = ["auto", "ascii", "bin", "npy", "mat"]
+
+# Bit order used to expand each byte of a raw binary file
+BIT_ORDERS = {"msb": "big", "lsb": "little"}
+
+# Number of leading bytes inspected when guessing the input format
+_SNIFF_BYTES = 1 << 16
+
+# Share of printable characters above which a file counts as text
+_TEXT_MIN_PRINTABLE = 0.95
+
+_PRINTABLE_BYTES = bytes(range(0x20, 0x7f)) + b'\t\r\n'
+
+def detect_input_format(filename):
+    """
+    Guess the format of an input file from its header and contents
+    
+    .npy and .mat files are recognised by their magic headers. Text (mostly
+    printable characters, e.g. comma-separated bits or a header line) is
+    read as ASCII bits, skipping everything but '0' and '1' as load_data
+    always has. Raw bytes are only assumed for .bin files; for any other
+    binary file pass fmt="bin" (--format bin) explicitly.
+    
+    Args:
+        filename (str): Path to the input file
+    
+    Returns:
+        str: One of "ascii", "bin", "npy" or "mat"
+    """
+    with open(filename, 'rb') as f:
+        head = f.read(_SNIFF_BYTES)
+    
+    if head.startswith(b'\x93NUMPY'):
+        return "npy"
+    if head.startswith(b'MATLAB'):
+        return "mat"
+    if not head or not head.translate(None, b'01 \t\r\n'):
+        return "ascii"
+    if os.path.splitext(filename)[1].lower() == ".bin":
+        return "bin"
+    if len(head.translate(None, _PRINTABLE_BYTES)) <= (1 - _TEXT_MIN_PRINTABLE) * len(head):
+        return "ascii"
+    raise ValueError(f"Cannot tell the format of {filename}: it is neither text nor a .bin file; "
+                     "use --format bin (fmt=\"bin\") for raw bytes")
+
+class BitSource:
+    """
+    Random-access view of the bits stored in an input file
+    
+    Subclasses only expand the bits of the requested segment, so opening a
+    source is cheap and the file is read once no matter how many segments
+    are taken from it.
+    """
+    
+    format_name = None
+    
+    def __init__(self, filename):
+        self.filename = filename
+    
+    def __len__(self):
+        raise NotImplementedError
+    
+    def segment(self, offset, length):
+        """Return bits [offset, offset + length) as a uint8 0/1 array"""
+        raise NotImplementedError
+    
+    def iter_chunks(self, offset=0, length=None, chunk_bits=None):
+        """
+        Yield bits [offset, offset + length) as consecutive uint8 0/1 arrays
+        
+        Args:
+            offset (int): First bit
+            length (int): Number of bits (None reads to the end)
+            chunk_bits (int): Bits per chunk (default: STREAM_CHUNK_BITS)
+        """
+        chunk_bits = chunk_bits or STREAM_CHUNK_BITS
+        end = len(self) if length is None else min(len(self), offset + length)
+        for start in range(offset, end, chunk_bits):
+            yield self.segment(start, min(chunk_bits, end - start))
+
+class AsciiBitSource(BitSource):
+    """ASCII '0'/'1' text, decoded once into a uint8 array on first use"""
+    
+    format_name = "ascii"
+    
+    def __init__(self, filename):
+        super().__init__(filename)
+        self._bits = None
+    
+    @property
+    def bits(self):
+        if self._bits is None:
+            self._bits = read_ascii_bits(self.filename)
+        return self._bits
+    
+    def __len__(self):
+        return self.bits.size
+    
+    def segment(self, offset, length):
+        return self.bits[offset:offset + length]
+    
+    def iter_chunks(self, offset=0, length=None, chunk_bits=None):
+        # Decode the file as it is read unless it is already decoded; the file
+        # length in bits is unknown until the end, so chunks follow the file's
+        if self._bits is not None:
+            yield from super().iter_chunks(offset, length, chunk_bits)
+            return
+        
+        remaining = length
+        for chunk in iter_ascii_bits(self.filename, chunk_bits or ASCII_CHUNK_BYTES):
+            if offset >= chunk.size:
+                offset -= chunk.size
+                continue
+            chunk = chunk[offset:] if remaining is None else chunk[offset:offset + remaining]
+            offset = 0
+            yield chunk
+            if remaining is not None:
+                remaining -= chunk.size
+                if remaining == 0:
+                    return
+
+class PackedBitSource(BitSource):
+    """Raw bytes holding 8 bits each, expanded lazily with np.unpackbits"""
+    
+    format_name = "bin"
+    
+    def __init__(self, filename, bit_order="msb"):
+        super().__init__(filename)
+        if bit_order not in BIT_ORDERS:
+            raise ValueError(f"Unknown bit order: {bit_order} (expected one of {list(BIT_ORDERS)})")
+        self.bit_order = bit_order
+        if os.path.getsize(filename) == 0:
+            self._raw = np.zeros(0, dtype=np.uint8)
+        else:
+            self._raw = np.memmap(filename, dtype=np.uint8, mode='r')
+    
+    def __len__(self):
+        return self._raw.size * 8
+    
+    def segment(self, offset, length):
+        # Only the bytes overlapping the segment are read from disk
+        first_byte = offset // 8
+        last_byte = (offset + length + 7) // 8
+        bits = np.unpackbits(self._raw[first_byte:last_byte], bitorder=BIT_ORDERS[self.bit_order])
+        start = offset - first_byte * 8
+        return bits[start:start + length]
+
+class ArrayBitSource(BitSource):
+    """One bit per element of a NumPy array (any non-zero element is a 1)"""
+    
+    def __init__(self, filename, array, format_name):
+        super().__init__(filename)
+        self.format_name = format_name
+        self._array = array.reshape(-1) if array.ndim != 1 else array
+    
+    def __len__(self):
+        return self._array.size
+    
+    def segment(self, offset, length):
+        chunk = self._array[offset:offset + length]
+        if chunk.dtype == np.bool_:
+            return chunk.view(np.uint8)
+        return (chunk != 0).view(np.uint8)
+
+class MatrixBitSource(BitSource):
+    """
+    One bit per element of a MATLAB v7.3 matrix (any non-zero element is a 1)
+    
+    Elements are taken in row-major order like the arrays of older .mat
+    files, and only the slab holding the requested segment is read.
+    """
+    
+    format_name = "mat"
+    
+    def __init__(self, filename, matrix):
+        super().__init__(filename)
+        self._matrix = matrix
+    
+    def __len__(self):
+        return self._matrix.size
+    
+    def segment(self, offset, length):
+        import converter
+        return np.not_equal(converter.element_range(self._matrix, offset, length), 0).view(np.uint8)
+
+class ExtractedBitSource(BitSource):
+    """
+    Bits produced by a nist_extraction pipeline from the samples of an array or raw file
+    
+    The whole pipeline runs once, on first use, for random access; streaming
+    runs (iter_chunks) extract chunk by chunk instead, without holding the bits.
+    Samples may also be a MATLAB v7.3 matrix, read one slab at a time.
+    """
+    
+    def __init__(self, filename, samples, format_name, extract):
+        super().__init__(filename)
+        self.format_name = format_name
+        self.extract = extract
+        nist_extraction.parse_pipeline(extract)  # reject a bad pipeline before any test runs
+        self._samples = samples.reshape(-1) if isinstance(samples, np.ndarray) else samples
+        self._bits = None
+    
+    def _iter_extracted(self):
+        if isinstance(self._samples, np.ndarray):
+            return nist_extraction.parse_pipeline(self.extract).iter_bits(self._samples)
+        import converter
+        return converter.iter_bit_chunks(self._samples, "row-major", extract=self.extract)
+    
+    @property
+    def bits(self):
+        if self._bits is None:
+            chunks = list(self._iter_extracted())
+            self._bits = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.uint8)
+        return self._bits
+    
+    def __len__(self):
+        return self.bits.size
+    
+    def segment(self, offset, length):
+        return self.bits[offset:offset + length]
+    
+    def iter_chunks(self, offset=0, length=None, chunk_bits=None):
+        if self._bits is not None:
+            yield from super().iter_chunks(offset, length, chunk_bits)
+            return
+        
+        remaining = length
+        for chunk in self._iter_extracted():
+            if offset >= chunk.size:
+                offset -= chunk.size
+                continue
+            chunk = chunk[offset:] if remaining is None else chunk[offset:offset + remaining]
+            offset = 0
+            yield chunk
+            if remaining is not None:
+                remaining -= chunk.size
+                if remaining == 0:
+                    return
+
+def _load_mat_array(filename):
+    """
+    Open the first variable of a MATLAB file with converter.load_mat_variable()
+    
+    Returns:
+        numpy.ndarray or converter.HDF5Matrix: The array of an older .mat
+        file, loaded alone, or a lazy view of a v7.3 (HDF5) dataset
+    """
+    import converter
+    return converter.load_mat_variable(filename)[1]
+
+def open_bit_source(filename, fmt="auto", bit_order="msb", extract=None):
+    """
+    Open an input file as a BitSource
+    
+    Args:
+        filename (str): Path to the input file
+        fmt (str): One of INPUT_FORMATS; "auto" picks the decoder from the file contents
+        bit_order (str): "msb" or "lsb" first, for raw binary ("bin") files
+        extract (str): nist_extraction pipeline, e.g. "lsb:2,vonneumann", that
+            turns the samples of an npy/mat array (or the bytes of a bin file)
+            into bits; None takes any non-zero element as a 1
+    
+    Returns:
+        BitSource: Lazily decoded view of the file's bits
+    """
+    if _SOURCE_CACHE["limit"]:
+        return _open_cached_bit_source(filename, fmt, bit_order, extract)
+    return _open_new_bit_source(filename, fmt, bit_order, extract)
+
+def _open_new_bit_source(filename, fmt, bit_order, extract=None):
+    if fmt == "auto":
+        fmt = detect_input_format(filename)
+    
+    if extract:
+        if fmt == "npy":
+            samples = np.load(filename, mmap_mode='r')
+        elif fmt == "mat":
+            samples = _load_mat_array(filename)
+        elif fmt == "bin":
+            samples = np.memmap(filename, dtype=np.uint8, mode='r') if os.path.getsize(filename) else \
+                np.zeros(0, dtype=np.uint8)
+        else:
+            raise ValueError(f"Bit extraction needs sample data (npy, mat or bin), not {fmt}")
+        return ExtractedBitSource(filename, samples, fmt, extract)
+    
+    if fmt == "ascii":
+        return AsciiBitSource(filename)
+    if fmt == "bin":
+        return PackedBitSource(filename, bit_order)
+    if fmt == "npy":
+        return ArrayBitSource(filename, np.load(filename, mmap_mode='r'), "npy")
+    if fmt == "mat":
+        matrix = _load_mat_array(filename)
+        if isinstance(matrix, np.ndarray):
+            return ArrayBitSource(filename, matrix, "mat")
+        return MatrixBitSource(filename, matrix)
+    raise ValueError(f"Unknown input format: {fmt} (expected one of {INPUT_FORMATS})")
+
+# Sources kept open between runs by the --serve daemon: limit (0 disables) and key -> BitSource,
+# most recently used last. Keys include the file's size and mtime so a rewritten file is reopened.
+_SOURCE_CACHE = {"limit": 0, "sources": {}}
+
+def _open_cached_bit_source(filename, fmt, bit_order, extract=None):
+    """open_bit_source() through _SOURCE_CACHE, so decoded files stay in memory between runs"""
+    stat = os.stat(filename)
+    key = (os.path.abspath(filename), fmt, bit_order, extract, stat.st_size, stat.st_mtime_ns)
+    sources = _SOURCE_CACHE["sources"]
+    
+    source = sources.pop(key, None)
+    if source is None:
+        source = _open_new_bit_source(filename, fmt, bit_order, extract)
+    sources[key] = source
+    
+    while len(sources) > _SOURCE_CACHE["limit"]:
+        sources.pop(next(iter(sources)))
+    return source
+
+def load_bits(filename, bit_length=None, offset=0, packed=False, fmt="auto", bit_order="msb"):
+    """
+    Load binary data from a file as a NumPy array with optional offset
+    
+    Args:
+        filename (str): Path to the input file
+        bit_length (int): Number of bits to process (None for all remaining bits)
+        offset (int): Bit offset from the start of the file
+        packed (bool): Return the segment packed 8 bits per byte (MSB first)
+        fmt (str): Input format, see open_bit_source()
+        bit_order (str): Bit order for raw binary files, see open_bit_source()
+    
+    Returns:
+        numpy.ndarray: uint8 array of 0/1 values (a view into the decoded file
+        where possible), or the np.packbits form of it when packed is True
+    """
+    source = open_bit_source(filename, fmt, bit_order)
+    return load_segment(source, bit_length, offset, packed)
+
+def _clip_segment(total_length, bit_length, offset):
+    """Clamp a requested segment to the available data and report it, returning (offset, length)"""
+    if offset >= total_length:
+        print(f"Warning: Requested offset ({offset}) exceeds data length ({total_length})")
+        offset = 0
+    
+    if bit_length is None:
+        end_index = total_length
+    else:
+        end_index = min(offset + bit_length, total_length)
+    
+    print(f"Data segment: offset={offset}, length={end_index - offset}, requested={bit_length}")
+    return offset, end_index - offset
+
+def load_segment(source, bit_length=None, offset=0, packed=False):
+    """
+    Take one offset/bit_length segment out of an open BitSource
+    
+    Args:
+        source (BitSource): Source returned by open_bit_source()
+        bit_length (int): Number of bits to process (None for all remaining bits)
+        offset (int): Bit offset from the start of the source
+        packed (bool): Return the segment packed 8 bits per byte (MSB first)
+    
+    Returns:
+        numpy.ndarray: Same as load_bits()
+    """
+    offset, length = _clip_segment(len(source), bit_length, offset)
+    segment = source.segment(offset, length)
+    
+    if packed:
+        return np.packbits(segment)
+    return segment
+
+def load_data(filename, bit_length, offset=0, fmt="auto", bit_order="msb"):
+    """
+    Load binary data from a file with optional offset
+    
+    Compatibility adapter around load_bits() for the test modules, which
+    expect the data as a string.
+    
+    Args:
+        filename (str): Path to the input file
+        bit_length (int): Number of bits to process 
+        offset (int): Bit offset from the start of the file
+        fmt (str): Input format, see open_bit_source()
+        bit_order (str): Bit order for raw binary files, see open_bit_source()
+    
+    Returns:
+        str: Binary string containing the data
+    """
+    try:
+        return bits_to_string(load_bits(filename, bit_length, offset, fmt=fmt, bit_order=bit_order))
+    except Exception as e:
+        print(f"Error loading data: {e}")
+        return ""
+
+# Significance level used for the pass/fail decision
+ALPHA = 0.01
+
+# Parameters the wrapper passes to the test functions (unlisted tests use the module defaults)
+DEFAULT_TEST_PARAMS = {
+    "block_frequency": {"block_size": 128},
+    "rank": {"rows": 32, "cols": 32},
+    "linear_complexity": {"block_size": 500},
+    "serial": {"pattern_length": 16},
+    "approximate_entropy": {"pattern_length": 10},
+}
+
+# Test engines: "fast" uses the vectorized nist_fast_tests implementation, "reference"
+# the external test modules, "crosscheck" runs both and compares them, and "auto"
+# picks "fast" where it exists and "reference" otherwise
+ENGINES = ["auto", "fast", "reference", "crosscheck"]
+
+# Largest p-value difference accepted as a match in crosscheck mode
+CROSSCHECK_TOLERANCE = 1e-6
+
+def resolve_engine(test_name, engine="auto"):
+    """
+    Decide which engine runs a test
+    
+    Args:
+        test_name (str): Name of the test
+        engine (str or dict): One of ENGINES, or a dict of them keyed by test
+            name (tests missing from the dict use "auto")
+    
+    Returns:
+        str: "fast", "reference" or "crosscheck"
+    """
+    if isinstance(engine, dict):
+        engine = engine.get(test_name, "auto")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine} (expected one of {ENGINES})")
+    
+    has_fast = test_name in nist_fast_tests.FAST_TESTS
+    if engine == "auto":
+        return "fast" if has_fast else "reference"
+    if engine in ("fast", "crosscheck") and not has_fast:
+        # Only the reference module implements this test
+        return "reference"
+    return engine
+
+def parse_engine_option(text):
+    """Parse the --engine option: a single engine or comma-separated test=engine pairs"""
+    if '=' not in text:
+        return text
+    return dict(item.split('=', 1) for item in text.split(','))
+
+class Segment:
+    """
+    A loaded run of bits
+    
+    The '0'/'1' string form for the reference modules and the feature cache
+    shared by the fast tests are both built only when a test needs them.
+    """
+    
+    def __init__(self, bits, offset=0):
+        self.bits = bits
+        self.offset = offset
+        self._text = None
+        self._features = None
+        self._digest = None
+        # Results filled in ahead of time by batched tests: test name -> (p_values, elapsed)
+        self.precomputed = {}
+    
+    def __len__(self):
+        return self.bits.size
+    
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = bits_to_string(self.bits)
+        return self._text
+    
+    @property
+    def features(self):
+        if self._features is None:
+            self._features = nist_fast_tests.SegmentFeatures(self.bits)
+        return self._features
+    
+    @property
+    def digest(self):
+        """Content hash of the bits, used to key the result cache"""
+        if self._digest is None:
+            self._digest = hashlib.blake2b(np.ascontiguousarray(self.bits, dtype=np.uint8)).hexdigest()
+        return self._digest
+
+def extract_p_values(result):
+    """
+    Pull the p-values out of whatever a test function returned
+    
+    Handles a bare number, a (p_value, passed) tuple, tuples of those (serial)
+    and lists of per-state rows ending in (..., p_value, passed) (random
+    excursions).
+    
+    Args:
+        result: Raw return value of a test function
+    
+    Returns:
+        list: The p-values as floats (empty if none could be found)
+    """
+    if result is None or isinstance(result, (str, bool, np.bool_)):
+        return []
+    
+    if isinstance(result, (list, tuple, np.ndarray)):
+        items = list(result)
+        if any(isinstance(item, (list, tuple, np.ndarray)) for item in items):
+            p_values = []
+            for item in items:
+                p_values.extend(extract_p_values(item))
+            return p_values
+        
+        # A trailing pass flag follows the p-value it belongs to
+        if len(items) >= 2 and isinstance(items[-1], (bool, np.bool_)):
+            return extract_p_values(items[-2])
+        return [p for item in items for p in extract_p_values(item)]
+    
+    try:
+        return [float(result)]
+    except (TypeError, ValueError):
+        return []
+
+def new_record(test_name, params=None):
+    """
+    Create an empty result record
+    
+    Records are plain dicts so they convert directly to MATLAB structs and JSON:
+        test (str): Test name
+        params (dict): Parameters the test ran with
+        p_values (list): Every p-value the test produced, one per sub-test
+            (template, excursion state, serial statistic, ...)
+        sub_passed (list): Whether each p-value is above ALPHA
+        p_value (float): The p-value of a single-valued test, NaN if the
+            test has none or several (see p_values and sub_passed)
+        passed (bool): The test's verdict: every p-value above ALPHA, except
+            for template families (see template_test_passed())
+        status (str): "ok", "invalid" (ran but returned no p-value), "error",
+            "unknown" or "skipped" (not run, see run_tests_on_data())
+        error (str): Error message, the unparsable result for "invalid"
+            records or why a "skipped" test was not run
+        engine (str): Engine that produced the p-values
+        elapsed (float): Seconds spent in the test
+        log (str): Text the test printed
+        cached (bool): Whether the record came from the result cache
+        profile (dict): Phase times and memory of the test when profiling is
+            on (see configure_profiling()), otherwise None
+    
+    Crosscheck runs add a "crosscheck" dict with the reference p-values, their
+    largest difference from the fast ones and whether they match.
+    """
+    return {
+        "test": test_name,
+        "engine": None,
+        "params": dict(params or {}),
+        "p_values": [],
+        "sub_passed": [],
+        "p_value": float('nan'),
+        "passed": False,
+        "status": "error",
+        "error": None,
+        "elapsed": 0.0,
+        "log": "",
+        "cached": False,
+        "profile": None,
+    }
+
+# Tests whose p-values are one sub-test each of many independent templates; the
+# verdict allows the failures chance explains, see template_test_passed()
+TEMPLATE_FAMILY_TESTS = {"non_overlapping_template"}
+
+def subtest_failure_limit(count, alpha=ALPHA):
+    """
+    Most sub-tests that may fail at alpha while a template family still passes
+    
+    Each of the 148 templates of a random sequence fails with probability
+    alpha, so requiring all of them to pass would fail most random
+    sequences. The family fails instead when at least f templates fail and
+    that many failures would happen by chance with probability at most alpha
+    (binomial tail, treating the templates as independent).
+    
+    Args:
+        count (int): Number of sub-tests
+        alpha (float): Significance level of each sub-test and of the verdict
+    
+    Returns:
+        int: Largest number of failing sub-tests that still passes
+    """
+    for failures in range(1, count + 1):
+        tail = sum(math.comb(count, k) * alpha ** k * (1 - alpha) ** (count - k) for k in range(failures, count + 1))
+        if tail <= alpha:
+            return failures - 1
+    return count
+
+def subtest_labels(record):
+    """
+    Names of a record's sub-tests, in the order of its p-values
+    
+    Args:
+        record (dict): Result record
+    
+    Returns:
+        list: The template bit strings of a non-overlapping template record
+        run over several templates, otherwise None
+    """
+    if record["test"] != "non_overlapping_template" or len(record["p_values"]) < 2:
+        return None
+    m = record["params"].get("template_length", 9)
+    templates = record["params"].get("templates")
+    if templates is None:
+        templates = nist_fast_tests.aperiodic_templates(m)
+    labels = [t if isinstance(t, str) else f"{int(t):0{m}b}" for t in templates]
+    return labels if len(labels) == len(record["p_values"]) else None
+
+def template_test_passed(p_values, alpha=ALPHA):
+    """
+    Verdict of a non-overlapping template run over several templates
+    
+    Passes when no more templates fail than subtest_failure_limit() allows
+    and no p-value is extreme, i.e. at most alpha / (number of templates),
+    so one template matching far too often or too rarely still fails.
+    """
+    failures = sum(1 for p in p_values if p <= alpha)
+    return failures <= subtest_failure_limit(len(p_values), alpha) and min(p_values) > alpha / len(p_values)
+
+def set_record_p_values(record, p_values):
+    """
+    Store p-values in a record and derive its sub_passed, p_value, passed and status fields
+    
+    As in SP 800-22 every p-value is compared with ALPHA and the test fails
+    if any of them is at most ALPHA; only a template family run (see
+    TEMPLATE_FAMILY_TESTS) is judged by template_test_passed().
+    """
+    record["p_values"] = [float(p) for p in p_values]
+    record["sub_passed"] = [p > ALPHA for p in record["p_values"]]
+    if record["p_values"]:
+        record["p_value"] = record["p_values"][0] if len(record["p_values"]) == 1 else float('nan')
+        if record["test"] in TEMPLATE_FAMILY_TESTS and len(record["p_values"]) > 1:
+            record["passed"] = template_test_passed(record["p_values"])
+        else:
+            record["passed"] = all(record["sub_passed"])
+        record["status"] = "ok"
+        record["error"] = None
+    return record
+
+# Instrumentation settings and state, see configure_profiling(): phase totals of the current run in
+# seconds, the profile of the test running now and a counter numbering the cProfile dumps
+_PROFILE = {"enabled": False, "memory": True, "cprofile_dir": None, "phases": {}, "current": None, "dumps": 0}
+
+def configure_profiling(enabled=True, memory=True, cprofile_dir=None):
+    """
+    Turn the built-in instrumentation on or off
+    
+    When on, runs time their phases (load, import, convert, compute, format)
+    and every test record gets a "profile" with its own phase times, its
+    peak traced memory and the process's peak RSS. Tests then run one at a
+    time in this process, so the numbers are not mixed up between tests.
+    
+    Args:
+        enabled (bool): Collect profiles
+        memory (bool): Trace each test's allocations with tracemalloc (slows allocation-heavy tests)
+        cprofile_dir (str): Directory for a cProfile dump (.prof) of every test run, or None
+    """
+    _PROFILE.update(enabled=enabled, memory=memory, cprofile_dir=cprofile_dir, phases={}, current=None)
+    if enabled and cprofile_dir:
+        os.makedirs(cprofile_dir, exist_ok=True)
+
+def reset_profile():
+    """Start a new run: clear the phase totals"""
+    _PROFILE["phases"] = {}
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far, or None where the resource module is unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def get_profile():
+    """
+    Profile of the current run
+    
+    Returns:
+        dict: "phases" (seconds per phase) and "max_rss_bytes", or None when profiling is off
+    """
+    if not _PROFILE["enabled"]:
+        return None
+    return {"phases": dict(_PROFILE["phases"]), "max_rss_bytes": peak_rss_bytes()}
+
+@contextmanager
+def profile_phase(name):
+    """Add the time spent in the block to phase `name` of the run and of the running test"""
+    if not _PROFILE["enabled"]:
+        yield
+        return
+    
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        for phases in (_PROFILE["phases"], (_PROFILE["current"] or {}).get("phases")):
+            if phases is not None:
+                phases[name] = phases.get(name, 0.0) + elapsed
+
+@contextmanager
+def _profile_test(record, segment):
+    """Collect the profile of one test run into record["profile"]"""
+    if not _PROFILE["enabled"]:
+        yield
+        return
+    
+    profile = {"phases": {}, "peak_traced_bytes": None, "max_rss_bytes": None, "cprofile": None}
+    _PROFILE["current"] = profile
+    
+    trace = _PROFILE["memory"]
+    started_tracing = trace and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    elif trace:
+        tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0] if trace else 0
+    
+    profiler = cProfile.Profile() if _PROFILE["cprofile_dir"] else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            _PROFILE["dumps"] += 1
+            path = os.path.join(_PROFILE["cprofile_dir"], f"{record['test']}_{record['engine']}_{segment.offset}_"
+                                                          f"{os.getpid()}_{_PROFILE['dumps']}.prof")
+            profiler.dump_stats(path)
+            profile["cprofile"] = path
+        if trace:
+            profile["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1] - baseline
+            if started_tracing:
+                tracemalloc.stop()
+        profile["max_rss_bytes"] = peak_rss_bytes()
+        _PROFILE["current"] = None
+        record["profile"] = profile
+
+def format_profile(profile, records):
+    """
+    Render a run's profile and its records' per-test profiles as text
+    
+    Args:
+        profile (dict): Result of get_profile()
+        records (list): Records of the run
+    
+    Returns:
+        str: Profile report
+    """
+    out = StringIO()
+    print("\n" + "=" * 40, file=out)
+    print("PROFILE", file=out)
+    print("=" * 40, file=out)
+    
+    phases = ", ".join(f"{name} {seconds:.4f} s" for name, seconds in profile["phases"].items())
+    print(f"Phases: {phases or 'none'}", file=out)
+    
+    print(f"{'Test':28s} {'Engine':10s} {'Seconds':>9s} {'Peak MiB':>9s}  Phases", file=out)
+    for record, label in zip(records, record_labels(records)):
+        test_profile = record["profile"]
+        if test_profile is None:
+            status = "cached" if record["cached"] else record["status"]
+            print(f"{label:28s} {str(record['engine']):10s} {record['elapsed']:9.4f} {'-':>9s}  ({status})", file=out)
+            continue
+        peak = test_profile["peak_traced_bytes"]
+        peak_text = f"{peak / 2**20:9.1f}" if peak is not None else f"{'-':>9s}"
+        test_phases = ", ".join(f"{name} {seconds:.4f}" for name, seconds in test_profile["phases"].items())
+        print(f"{label:28s} {str(record['engine']):10s} {record['elapsed']:9.4f} {peak_text}  {test_phases}",
+              file=out)
+        if test_profile["cprofile"]:
+            print(f"{'':28s} cProfile: {test_profile['cprofile']}", file=out)
+    
+    if profile["max_rss_bytes"] is not None:
+        print(f"Peak RSS: {profile['max_rss_bytes'] / 2**20:.1f} MiB", file=out)
+    return out.getvalue()
+
+def _call_reference_test(test_name, test_func, binary_data, params):
+    """Call a reference test module function with the arguments it expects"""
+    if test_name == "block_frequency":
+        return test_func(binary_data, params["block_size"], True)  # Block size parameter
+    if test_name == "rank":
+        return test_func(binary_data, True, params["rows"], params["cols"])  # Matrix dimensions
+    if test_name == "linear_complexity":
+        return test_func(binary_data, True, params["block_size"])  # Block size parameter
+    if test_name in ("serial", "approximate_entropy"):
+        return test_func(binary_data, True, params["pattern_length"])  # Pattern length m
+    
+    # The other tests take (binary_data, True) and use their default parameters
+    return test_func(binary_data, True)
+
+def _run_reference_test(record, test_name, segment, script_dir, params):
+    """Run a test through its reference module, filling in the record"""
+    with profile_phase("import"):
+        test_func = resolve_test(test_name, script_dir)
+    if test_func is None:
+        record["error"] = "Test function could not be resolved"
+        return record
+    
+    with profile_phase("convert"):
+        text = segment.text
+    with profile_phase("compute"):
+        result = _call_reference_test(test_name, test_func, text, params)
+    set_record_p_values(record, extract_p_values(result))
+    if record["status"] != "ok":
+        record["status"] = "invalid"
+        record["error"] = str(result)
+    return record
+
+def _compare_p_values(fast, reference):
+    """Largest difference between reference p-values and the closest fast ones (NaN if either is empty)"""
+    if not fast or not reference:
+        return float('nan')
+    if len(fast) == len(reference):
+        return max(abs(f - r) for f, r in zip(fast, reference))
+    return max(min(abs(f - r) for f in fast) for r in reference)
+
+def run_single_test(test_name, segment, script_dir=None, params=None, engine="auto"):
+    """
+    Run one NIST randomness test on a loaded segment.
+    
+    Args:
+        test_name (str): Name of the test to run
+        segment (Segment): The loaded bits
+        script_dir (str): Directory holding the test modules (default: this script's directory)
+        params (dict): Overrides for DEFAULT_TEST_PARAMS[test_name]
+        engine (str or dict): Engine selection, see resolve_engine()
+    
+    Returns:
+        dict: Result record, see new_record()
+    """
+    params = dict(DEFAULT_TEST_PARAMS.get(test_name, {}), **(params or {}))
+    record = new_record(test_name, params)
+    
+    if test_name not in TEST_FILE_MAP:
+        record["status"] = "unknown"
+        record["error"] = f"Unknown test: {test_name}"
+        return record
+    
+    start = time.perf_counter()
+    with redirect_stdout(StringIO()) as log, _profile_test(record, segment):
+        try:
+            record["engine"] = resolve_engine(test_name, engine)
+            
+            if record["engine"] == "reference":
+                _run_reference_test(record, test_name, segment, script_dir, params)
+            elif record["engine"] == "fast" and test_name in segment.precomputed:
+                p_values, batch_elapsed = segment.precomputed[test_name]
+                set_record_p_values(record, p_values)
+            else:
+                fast_func = nist_fast_tests.FAST_TESTS[test_name]
+                with profile_phase("compute"):
+                    set_record_p_values(record, fast_func(segment.features, **params))
+                
+                if record["engine"] == "crosscheck":
+                    reference = _run_reference_test(new_record(test_name, params), test_name,
+                                                    segment, script_dir, params)
+                    difference = _compare_p_values(record["p_values"], reference["p_values"])
+                    record["crosscheck"] = {
+                        "reference_p_values": reference["p_values"],
+                        "reference_error": reference["error"],
+                        "max_difference": difference,
+                        "match": bool(difference <= CROSSCHECK_TOLERANCE),
+                    }
+                    print(f"Crosscheck against reference module: max difference {difference:.3g}")
+        except Exception as e:
+            record["error"] = str(e)
+            traceback.print_exc(file=log)
+    
+    record["elapsed"] = time.perf_counter() - start
+    if record["engine"] == "fast" and test_name in segment.precomputed:
+        record["elapsed"] = segment.precomputed[test_name][1]
+    record["log"] = log.getvalue()
+    return record
+
+# Rough cost of each test in nanoseconds per bit, used until the test has been timed in this process
+TEST_COST_ESTIMATES = {
+    "fast": {
+        "frequency": 0.5, "block_frequency": 2, "runs": 1, "longest_run": 15, "rank": 15, "fft": 40,
+        "non_overlapping_template": 20, "overlapping_template": 10, "universal": 20,
+        "linear_complexity": 200, "serial": 12, "approximate_entropy": 7, "cumulative_sums": 10,
+        "random_excursions": 20, "random_excursions_variant": 20,
+    },
+    "reference": {
+        "frequency": 100, "block_frequency": 200, "runs": 500, "longest_run": 1000, "rank": 5000,
+        "fft": 300, "non_overlapping_template": 2000, "overlapping_template": 2000, "universal": 1000,
+        "linear_complexity": 50000, "serial": 5000, "approximate_entropy": 5000, "cumulative_sums": 500,
+        "random_excursions": 2000, "random_excursions_variant": 2000,
+    },
+}
+
+# Measured nanoseconds per bit of past runs, keyed by (test, engine): moving average
+_TEST_TIMINGS = {}
+
+def estimate_test_cost(test_name, length, engine="auto"):
+    """
+    Expected seconds to run a test on `length` bits
+    
+    Uses the timings of earlier runs in this process when there are any and
+    TEST_COST_ESTIMATES otherwise (crosscheck costs both engines).
+    """
+    try:
+        resolved = resolve_engine(test_name, engine)
+    except Exception:
+        return 0.0
+    
+    rate = _TEST_TIMINGS.get((test_name, resolved))
+    if rate is None:
+        engines = ["fast", "reference"] if resolved == "crosscheck" else [resolved]
+        rate = sum(TEST_COST_ESTIMATES[e].get(test_name, 1000.0) for e in engines)
+    return rate * length * 1e-9
+
+def record_test_timing(record, length):
+    """Fold a finished record's run time into the estimates of estimate_test_cost()"""
+    if record["status"] != "ok" or record["cached"] or length == 0:
+        return
+    rate = record["elapsed"] * 1e9 / length
+    key = (record["test"], record["engine"])
+    previous = _TEST_TIMINGS.get(key)
+    _TEST_TIMINGS[key] = rate if previous is None else 0.7 * previous + 0.3 * rate
+
+def _skipped_record(test_name, params, reason):
+    record = new_record(test_name, dict(DEFAULT_TEST_PARAMS.get(test_name, {}), **(params or {})))
+    record["status"] = "skipped"
+    record["error"] = reason
+    return record
+
+def expand_test_runs(selected_tests, params=None):
+    """
+    List the (test name, parameter overrides) runs for the selected tests
+    
+    A list-valued parameter is a sweep: the test runs once per value, e.g.
+    {"serial": {"pattern_length": [4, 8, 16]}} gives three serial runs.
+    
+    Args:
+        selected_tests (list): List of test names
+        params (dict): Parameter overrides keyed by test name
+    
+    Returns:
+        list: (test_name, params) tuples in run order
+    """
+    params = params or {}
+    runs = []
+    for test_name in selected_tests:
+        sweeps = [{}]
+        for key, value in (params.get(test_name) or {}).items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            sweeps = [dict(sweep, **{key: item}) for sweep in sweeps for item in values]
+        runs.extend((test_name, sweep or None) for sweep in sweeps)
+    return runs
+
+def run_tests_on_data(segment, selected_tests, script_dir=None, params=None, engine="auto",
+                      fail_fast=False, deadline=None):
+    """
+    Run selected NIST randomness tests on an already loaded segment.
+    
+    Tests run cheapest first by estimate_test_cost(), so a failing sequence
+    is usually caught by the quick tests before the slow ones start.
+    
+    Args:
+        segment (Segment): The loaded bits
+        selected_tests (list): List of test names to run
+        script_dir (str): Directory holding the test modules (default: this script's directory)
+        params (dict): Parameter overrides keyed by test name
+        engine (str or dict): Engine selection, see resolve_engine()
+        fail_fast (bool): Skip the remaining tests once one has failed
+        deadline (float): time.perf_counter() value after which no test is
+            started; tests expected to overrun it are skipped as well
+    
+    Returns:
+        list: One result record per selected test (per swept value, see
+        expand_test_runs()), in selection order; results found in the result
+        cache are returned without running the test, and tests not run
+        because of fail_fast or the deadline have status "skipped"
+    """
+    runs = expand_test_runs(selected_tests, params)
+    cache = get_result_cache()
+    lookups = _cache_lookup(cache, segment, runs, script_dir, engine)
+    records = [record for key, record in lookups]
+    
+    stop_reason = None
+    if fail_fast:
+        failed = [r["test"] for r in records if r is not None and r["status"] == "ok" and not r["passed"]]
+        if failed:
+            stop_reason = f"fail_fast: {failed[0]} failed"
+    
+    costs = [estimate_test_cost(test_name, len(segment), engine) for test_name, _ in runs]
+    for i in sorted(range(len(runs)), key=lambda i: costs[i]):
+        if records[i] is not None:
+            continue
+        test_name, test_params = runs[i]
+        
+        if stop_reason is None and deadline is not None and time.perf_counter() + costs[i] > deadline:
+            records[i] = _skipped_record(test_name, test_params, "time budget exhausted")
+            continue
+        if stop_reason is not None:
+            records[i] = _skipped_record(test_name, test_params, stop_reason)
+            continue
+        
+        record = run_single_test(test_name, segment, script_dir, test_params, engine)
+        record_test_timing(record, len(segment))
+        _cache_store(cache, lookups[i][0], record)
+        records[i] = record
+        
+        if fail_fast and record["status"] == "ok" and not record["passed"]:
+            stop_reason = f"fail_fast: {test_name} failed"
+    return records
+
+def record_labels(records):
+    """Display names of records: the test name, plus the parameters for runs of a swept test"""
+    names = [record["test"] for record in records]
+    labels = []
+    for record in records:
+        label = record["test"]
+        if names.count(label) > 1 and record["params"]:
+            label += " (" + ", ".join(f"{key}={value}" for key, value in record["params"].items()) + ")"
+        labels.append(label)
+    return labels
+
+def format_records(records):
+    """
+    Render result records as the text report printed by run_selected_tests()
+    
+    Args:
+        records (list): Records returned by run_tests_on_data()
+    
+    Returns:
+        str: Per-test result lines followed by a pass/fail summary
+    """
+    out = StringIO()
+    
+    for record, test_name in zip(records, record_labels(records)):
+        if record["status"] == "unknown":
+            print(record["error"], file=out)
+            continue
+        if record["status"] == "skipped":
+            print(f"\nSkipped {test_name} test: {record['error']}", file=out)
+            continue
+        
+        print(f"\nRunning {test_name} test...", file=out)
+        out.write(record["log"])
+        
+        if record["status"] == "ok":
+            result_status = "PASS" if record["passed"] else "FAIL"
+            p_value_text = ", ".join(f"{p:.6f}" for p in record["p_values"])
+            if len(record["p_values"]) > 1:
+                result_status += f", {sum(record['sub_passed'])}/{len(record['p_values'])} sub-tests passed"
+            print(f"{test_name} test result: {p_value_text} ({result_status})", file=out)
+            labels = subtest_labels(record)
+            if labels is not None and not all(record["sub_passed"]):
+                failing = [label for label, ok in zip(labels, record["sub_passed"]) if not ok]
+                print(f"{test_name} failing templates: {', '.join(failing)}", file=out)
+        elif record["status"] == "invalid":
+            print(f"{test_name} test result: {record['error']} (UNKNOWN)", file=out)
+        else:
+            print(f"Error running {test_name} test: {record['error']}", file=out)
+    
+    # Add summary of results
+    print("\n" + "=" * 40, file=out)
+    print("SUMMARY OF RESULTS", file=out)
+    print("=" * 40, file=out)
+    
+    completed = [r for r in records if r["status"] in ("ok", "invalid")]
+    total_count = len(completed)
+    pass_count = sum(1 for r in completed if r["passed"])
+    error_count = sum(1 for r in completed if r["status"] == "invalid")
+    
+    skipped_count = sum(1 for r in records if r["status"] == "skipped")
+    
+    if total_count > 0:
+        pass_rate = (pass_count / total_count) * 100
+        print(f"Tests run: {total_count}", file=out)
+        print(f"Tests passed: {pass_count} ({pass_rate:.1f}%)", file=out)
+        print(f"Tests failed: {total_count - pass_count - error_count} ({(100 - pass_rate - (error_count/total_count*100)):.1f}%)", file=out)
+        if error_count > 0:
+            print(f"Tests with errors: {error_count} ({(error_count/total_count*100):.1f}%)", file=out)
+    else:
+        print("No tests were successfully completed.", file=out)
+    if skipped_count > 0:
+        print(f"Tests skipped: {skipped_count}", file=out)
+    
+    return out.getvalue()
+
+def records_to_arrays(records):
+    """
+    Convert result records into NumPy arrays that MATLAB can convert with double()
+    
+    Args:
+        records (list): Records returned by run_tests_on_data()
+    
+    Returns:
+        dict: "tests" (list of names), "p_value" (the p-value of
+        single-valued tests, NaN on error and for tests with several),
+        "sub_tests" (number of p-values per test), "passed" (the test's
+        verdict, bool), "elapsed" (seconds), "peak_bytes" (peak traced memory
+        per test, NaN when not profiled), "p_values" (tests x max sub-tests,
+        padded with NaN) and "sub_passed" (the verdict of each of those
+        p-values, padded with False)
+    """
+    width = max([len(r["p_values"]) for r in records] + [1])
+    p_values = np.full((len(records), width), np.nan)
+    sub_passed = np.zeros((len(records), width), dtype=bool)
+    for i, record in enumerate(records):
+        p_values[i, :len(record["p_values"])] = record["p_values"]
+        sub_passed[i, :len(record["p_values"])] = np.asarray(record["p_values"]) > ALPHA
+    
+    return {
+        "tests": [r["test"] for r in records],
+        "p_value": np.array([r["p_value"] for r in records], dtype=np.float64),
+        "sub_tests": np.array([len(r["p_values"]) for r in records], dtype=np.int64),
+        "passed": np.array([r["passed"] for r in records], dtype=bool),
+        "elapsed": np.array([r["elapsed"] for r in records], dtype=np.float64),
+        "peak_bytes": np.array([np.nan if (r.get("profile") or {}).get("peak_traced_bytes") is None
+                                else r["profile"]["peak_traced_bytes"] for r in records], dtype=np.float64),
+        "p_values": p_values,
+        "sub_passed": sub_passed,
+    }
+
+def _json_safe(value):
+    """Replace NaN with None (null) and NumPy scalars with Python ones so json.dumps emits strict JSON"""
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return _json_safe(value.tolist())
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+def results_to_json(results):
+    """Serialise structured results (records, segments, ...) as strict JSON text"""
+    return json.dumps(_json_safe(results))
+
+# SP 800-22 aggregate evaluation: smallest sample for the uniformity test and its significance level
+AGGREGATE_MIN_SEQUENCES = 55
+UNIFORMITY_ALPHA = 0.0001
+
+def aggregate_p_values(p_values, tests=None, alpha=ALPHA):
+    """
+    SP 800-22 evaluation of p-values over many sequences
+    
+    For every test and sub-test this computes the proportion of sequences
+    passing, its confidence interval (1 - alpha) +/- 3 * sqrt(alpha * (1 - alpha) / m),
+    and the chi-square uniformity P-value of the p-values over 10 equal bins.
+    Uniformity needs at least AGGREGATE_MIN_SEQUENCES valid p-values and is NaN
+    otherwise. NaN and out-of-range p-values (such as the -1 of an invalid
+    universal test) are left out.
+    
+    Args:
+        p_values (numpy.ndarray): sequences x tests x sub-tests array, padded with NaN
+        tests (list): Name of each test (default: "test 1", "test 2", ...)
+        alpha (float): Significance level of the individual tests
+    
+    Returns:
+        list: One dict per test with per-sub-test lists "sequences",
+        "proportion", "proportion_low", "proportion_high", "uniformity_p_value"
+        and "histogram" (10 bin counts), plus "proportion_ok" and
+        "uniformity_ok" (None when uniformity could not be assessed)
+    """
+    from scipy.special import gammaincc
+    
+    p_values = np.asarray(p_values, dtype=np.float64)
+    if p_values.ndim == 2:
+        p_values = p_values[:, :, None]
+    sequence_count, test_count, width = p_values.shape
+    if tests is None:
+        tests = [f"test {i + 1}" for i in range(test_count)]
+    
+    valid = np.isfinite(p_values) & (p_values >= 0) & (p_values <= 1)
+    counts = np.count_nonzero(valid, axis=0)
+    passes = np.count_nonzero(valid & (p_values > alpha), axis=0)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        proportion = passes / counts
+        margin = 3.0 * np.sqrt(alpha * (1.0 - alpha) / counts)
+        
+        # Histogram of every (test, sub-test) column in one bincount
+        bins = np.minimum((np.where(valid, p_values, 0.0) * 10).astype(np.int64), 9)
+        columns = np.arange(test_count * width).reshape(test_count, width)
+        histogram = np.bincount((columns * 10 + bins)[valid], minlength=test_count * width * 10)
+        histogram = histogram.reshape(test_count, width, 10)
+        
+        expected = counts[:, :, None] / 10.0
+        chi_squared = np.sum((histogram - expected) ** 2 / expected, axis=2)
+        uniformity = gammaincc(4.5, chi_squared / 2.0)
+    uniformity = np.where(counts >= AGGREGATE_MIN_SEQUENCES, uniformity, np.nan)
+    
+    summary = []
+    for t, test_name in enumerate(tests):
+        used = counts[t] > 0
+        assessed = uniformity[t][used]
+        summary.append({
+            "test": test_name,
+            "sequences": counts[t][used].tolist(),
+            "proportion": proportion[t][used].tolist(),
+            "proportion_low": (1.0 - alpha - margin[t][used]).tolist(),
+            "proportion_high": (1.0 - alpha + margin[t][used]).tolist(),
+            "uniformity_p_value": assessed.tolist(),
+            "histogram": histogram[t][used].tolist(),
+            "proportion_ok": bool(np.all(proportion[t][used] >= 1.0 - alpha - margin[t][used])),
+            "uniformity_ok": None if np.isnan(assessed).any() or not assessed.size
+                             else bool(np.all(assessed >= UNIFORMITY_ALPHA)),
+        })
+    return summary
+
+def aggregate_segments(segments, alpha=ALPHA):
+    """
+    Aggregate evaluation of the segments returned by run_segments()
+    
+    Every segment must have run the same tests, as run_segments() does.
+    
+    Args:
+        segments (list): Segment dicts with their "records"
+        alpha (float): Significance level of the individual tests
+    
+    Returns:
+        list: See aggregate_p_values()
+    """
+    if not segments:
+        return []
+    
+    arrays = [records_to_arrays(segment["records"])["p_values"] for segment in segments]
+    width = max(array.shape[1] for array in arrays)
+    p_values = np.full((len(arrays), arrays[0].shape[0], width), np.nan)
+    for i, array in enumerate(arrays):
+        p_values[i, :, :array.shape[1]] = array
+    return aggregate_p_values(p_values, record_labels(segments[0]["records"]), alpha)
+
+def format_aggregate(summary):
+    """
+    Render an aggregate evaluation as a table like the SP 800-22 final analysis report
+    
+    Args:
+        summary (list): Result of aggregate_p_values() or aggregate_segments()
+    
+    Returns:
+        str: One line per test and sub-test with the p-value histogram, the
+        uniformity P-value and the proportion passing
+    """
+    out = StringIO()
+    print("\n" + "=" * 40, file=out)
+    print("AGGREGATE OVER ALL SEQUENCES", file=out)
+    print("=" * 40, file=out)
+    print(" ".join(f"{f'C{i}':>4}" for i in range(1, 11)) + "     P-VALUE    PROPORTION    TEST", file=out)
+    
+    for entry in summary:
+        for k, histogram in enumerate(entry["histogram"]):
+            name = entry["test"] if len(entry["histogram"]) == 1 else f"{entry['test']}[{k + 1}]"
+            uniformity = entry["uniformity_p_value"][k]
+            uniformity_text = "          -" if np.isnan(uniformity) else f"{uniformity:11.6f}"
+            uniformity_text += " *" if uniformity < UNIFORMITY_ALPHA else "  "
+            passed = round(entry["proportion"][k] * entry["sequences"][k])
+            flag = " *" if entry["proportion"][k] < entry["proportion_low"][k] else "  "
+            print(" ".join(f"{c:4d}" for c in histogram)
+                  + f" {uniformity_text} {passed:5d}/{entry['sequences'][k]:<5d}{flag} {name}", file=out)
+    
+    failed = [entry["test"] for entry in summary if not entry["proportion_ok"] or entry["uniformity_ok"] is False]
+    print("-" * 40, file=out)
+    if summary:
+        low = min(min(entry["proportion_low"], default=1.0) for entry in summary)
+        print(f"Minimum pass proportion (smallest sample): {low:.4f}", file=out)
+    print(f"Uniformity is assessed from {AGGREGATE_MIN_SEQUENCES} sequences, "
+          f"failing below P-value {UNIFORMITY_ALPHA}", file=out)
+    print(f"Tests outside the SP 800-22 limits (*): {', '.join(failed) if failed else 'none'}", file=out)
+    return out.getvalue()
+
+# Result cache: finished records in an SQLite file, keyed by segment content and test settings
+RESULT_CACHE_PATH = os.environ.get("NIST_RESULT_CACHE") or os.path.join(
+    os.path.expanduser("~"), ".cache", "nist_tests", "results.sqlite")
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Bumped whenever the stored record layout changes
+RESULT_CACHE_VERSION = 3
+
+class ResultCache:
+    """
+    On-disk cache of result records with least-recently-used eviction
+    
+    Each row holds one record as JSON with its size and last use time. When
+    the stored records grow past max_bytes the least recently used ones are
+    dropped until the cache is back under 90% of the limit. SQLite errors are
+    reported on stderr and treated as cache misses, so a broken cache file
+    never stops a test run.
+    """
+    
+    def __init__(self, path=RESULT_CACHE_PATH, max_bytes=RESULT_CACHE_MAX_BYTES):
+        import sqlite3
+        self._errors = sqlite3.Error
+        self.path = path
+        self.max_bytes = max_bytes
+        
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, record TEXT NOT NULL, "
+                         "size INTEGER NOT NULL, last_used REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self._db.commit()
+    
+    def get(self, key):
+        """Return the record stored under key (marked as cached), or None"""
+        try:
+            row = self._db.execute("SELECT record FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        except self._errors as e:
+            print(f"Warning: result cache lookup failed: {e}", file=sys.stderr)
+            return None
+        
+        record = json.loads(row[0])
+        if record["p_value"] is None:
+            record["p_value"] = float('nan')
+        record["cached"] = True
+        record["profile"] = None
+        return record
+    
+    def put(self, key, record):
+        """Store a record under key, evicting old records if the cache is full"""
+        text = json.dumps(_json_safe(record))
+        try:
+            self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                             (key, text, len(text), time.time()))
+            self._evict()
+            self._db.commit()
+        except self._errors as e:
+            print(f"Warning: result cache update failed: {e}", file=sys.stderr)
+    
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
         
-    except ImportError as ie:
-        print(f"Import error for {file_path}: {ie}")
-        print(f"This might indicate missing dependencies or Python version incompatibility")
+        excess = total - int(self.max_bytes * 0.9)
+        stale = []
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY last_used"):
+            if excess <= 0:
+                break
+            stale.append((key,))
+            excess -= size
+        self._db.executemany("DELETE FROM results WHERE key = ?", stale)
+    
+    def clear(self):
+        """Remove every stored record"""
+        self._db.execute("DELETE FROM results")
+        self._db.commit()
+        self._db.execute("VACUUM")
+    
+    def close(self):
+        self._db.close()
+
+# Cache used by the run functions: enabled flag, path, size limit and the open ResultCache. Off
+# by default: when on, every segment is hashed before testing and results are written to disk.
+_RESULT_CACHE = {"enabled": False, "path": RESULT_CACHE_PATH, "max_bytes": RESULT_CACHE_MAX_BYTES, "cache": None}
+
+def configure_result_cache(enabled=True, path=None, max_bytes=None):
+    """
+    Turn the result cache on or off, or move it to another file
+    
+    The cache is off until this is called (or a run function is given
+    cache=True). It pays off when the same capture is tested again with the
+    same settings; every run then hashes each segment and writes its results
+    to the SQLite file.
+    
+    Args:
+        enabled (bool): Look up and store results (False bypasses the cache)
+        path (str): SQLite file (default: RESULT_CACHE_PATH)
+        max_bytes (int): Size limit of the stored records (default: RESULT_CACHE_MAX_BYTES)
+    """
+    if _RESULT_CACHE["cache"] is not None:
+        _RESULT_CACHE["cache"].close()
+    _RESULT_CACHE.update(enabled=enabled, path=path or RESULT_CACHE_PATH,
+                         max_bytes=max_bytes or RESULT_CACHE_MAX_BYTES, cache=None)
+
+@contextmanager
+def result_cache_enabled(enabled):
+    """Turn the configured result cache on or off for a block (None keeps the configured setting)"""
+    if enabled is None:
+        yield
+        return
+    previous = _RESULT_CACHE["enabled"]
+    _RESULT_CACHE["enabled"] = enabled
+    try:
+        yield
+    finally:
+        _RESULT_CACHE["enabled"] = previous
+
+def get_result_cache():
+    """Return the open ResultCache, or None when caching is disabled or unavailable"""
+    if not _RESULT_CACHE["enabled"]:
         return None
-    except SyntaxError as se:
-        print(f"Syntax error in {file_path}: {se}")
-        print(f"This might indicate Python 2 vs Python 3 compatibility issues")
+    if _RESULT_CACHE["cache"] is None:
+        try:
+            _RESULT_CACHE["cache"] = ResultCache(_RESULT_CACHE["path"], _RESULT_CACHE["max_bytes"])
+        except Exception as e:
+            print(f"Warning: result cache disabled, cannot open {_RESULT_CACHE['path']}: {e}", file=sys.stderr)
+            _RESULT_CACHE["enabled"] = False
+            return None
+    return _RESULT_CACHE["cache"]
+
+def clear_result_cache():
+    """Remove every record from the configured result cache file"""
+    cache = ResultCache(_RESULT_CACHE["path"], _RESULT_CACHE["max_bytes"])
+    cache.clear()
+    cache.close()
+
+def _engine_version(test_name, engine, script_dir=None):
+    """Version tag of the code that produces a test's p-values on the resolved engine"""
+    parts = [engine]
+    if engine in ("fast", "crosscheck"):
+        parts.append(f"fast-{nist_fast_tests.ENGINE_VERSION}")
+    if engine in ("reference", "crosscheck"):
+        module_path = os.path.join(script_dir or os.path.dirname(os.path.abspath(__file__)),
+                                   TEST_FILE_MAP[test_name])
+        parts.append(str(os.stat(module_path).st_mtime_ns) if os.path.exists(module_path) else "missing")
+    return "/".join(parts)
+
+def result_cache_key(segment, test_name, params=None, engine="auto", script_dir=None):
+    """
+    Cache key of one test run: a hash of the segment's content, offset and
+    length, the test, its full parameters and the engine version
+    
+    Returns:
+        str: Hex key, or None for runs that cannot be cached (unknown test or engine)
+    """
+    if test_name not in TEST_FILE_MAP:
         return None
-    except Exception as e:
-        print(f"Error importing {file_path}: {e}")
-        print(f"Exception type: {type(e).__name__}")
+    try:
+        resolved = resolve_engine(test_name, engine)
+    except Exception:
         return None
+    
+    description = {
+        "version": RESULT_CACHE_VERSION,
+        "content": segment.digest,
+        "offset": int(segment.offset),
+        "length": len(segment),
+        "test": test_name,
+        "params": dict(DEFAULT_TEST_PARAMS.get(test_name, {}), **(params or {})),
+        "engine": _engine_version(test_name, resolved, script_dir),
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()
+
+def _cache_lookup(cache, segment, runs, script_dir, engine):
+    """Return (key, cached record or None) for each (test_name, params) run"""
+    if cache is None:
+        return [(None, None)] * len(runs)
+    
+    lookups = []
+    for test_name, test_params in runs:
+        key = result_cache_key(segment, test_name, test_params, engine, script_dir)
+        lookups.append((key, cache.get(key) if key else None))
+    return lookups
+
+def _cache_store(cache, key, record):
+    """Store a freshly computed record unless it failed to run"""
+    if cache is not None and key and record["status"] in ("ok", "invalid"):
+        cache.put(key, record)
+
+# Shared bit buffer mapped into each worker process by _attach_shared_bits():
+# (SharedMemory, ndarray, input offset of the buffer's first bit)
+_WORKER_BITS = None
+
+def _attach_shared_bits(shm_name, size, base_offset=0):
+    """Process pool initializer: map the parent's shared bit buffer into this worker"""
+    global _WORKER_BITS
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _WORKER_BITS = (shm, np.ndarray((size,), dtype=np.uint8, buffer=shm.buf), base_offset)
 
-def load_data(filename, bit_length, offset=0):
+def _run_work_item(item):
+    """Run one work item, a segment of the shared bit buffer and some of its tests, sharing one Segment"""
+    start, length, runs, script_dir, engine = item
+    shm, bits, base_offset = _WORKER_BITS
+    segment = Segment(bits[start - base_offset:start - base_offset + length], start)
+    return [run_single_test(test_name, segment, script_dir, params, engine) for test_name, params in runs]
+
+def run_tests_parallel(bits, spans, selected_tests, script_dir=None, workers=0, params=None, engine="auto",
+                       base_offset=0):
     """
-    Load binary data from a file with optional offset
+    Run selected NIST randomness tests on several segments across a process pool.
+    
+    A work item is a segment with its tests, so one Segment (and its shared
+    SegmentFeatures: the random walk, the pattern count index) serves all of
+    them. With fewer segments than workers each segment's tests are split
+    over several items, balanced by estimate_test_cost(), so a single
+    segment still uses the pool. The bits are copied once into a
+    multiprocessing.shared_memory block that each worker maps, so segments
+    are never pickled. Records come back in the same order as running
+    run_tests_on_data() on each segment in turn.
+    
+    Note that on Windows the pool starts fresh interpreters from sys.executable,
+    which does not work from MATLAB's in-process Python; use the command line
+    or an out-of-process pyenv there.
     
     Args:
-        filename (str): Path to the input file
-        bit_length (int): Number of bits to process 
-        offset (int): Bit offset from the start of the file
+        bits (numpy.ndarray): uint8 0/1 array holding every segment
+        spans (list): (start, length) of each segment in the input; segments
+            keep these offsets for the result cache and profile dump names
+        selected_tests (list): List of test names to run
+        script_dir (str): Directory holding the test modules (default: this script's directory)
+        workers (int): Number of worker processes (0 for one per CPU)
+        params (dict): Parameter overrides keyed by test name
+        engine (str or dict): Engine selection, see resolve_engine()
+        base_offset (int): Input offset of bits[0]
     
     Returns:
-        str: Binary string containing the data
+        list: The records of each segment, as run_tests_on_data() returns them
     """
-    try:
-        with open(filename, 'r') as f:
-            binary_data = f.read().replace('\n', '').replace('\r', '').replace(' ', '')
-        
-        # Convert to integers (0 and 1)
-        bits = [int(bit) for bit in binary_data if bit in ['0', '1']]
-        
-        # Convert back to string 
-        binary_string = ''.join(str(bit) for bit in bits)
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+    
+    workers = workers or os.cpu_count() or 1
+    runs = expand_test_runs(selected_tests, params)
+    
+    # Cached results are filled in here; only the misses become work items
+    cache = get_result_cache()
+    lookups = []
+    for start, length in spans:
+        segment = Segment(bits[start - base_offset:start - base_offset + length], start)
+        lookups.extend(_cache_lookup(cache, segment, runs, script_dir, engine))
+    missing = [i for i, (key, record) in enumerate(lookups) if record is None]
+    
+    # Group the missing runs of each segment into items, the costliest runs spread first
+    groups_per_segment = max(1, workers // max(len(spans), 1))
+    items = []
+    item_indices = []
+    for segment_index, (start, length) in enumerate(spans):
+        indices = [i for i in missing if i // len(runs) == segment_index]
+        indices.sort(key=lambda i: -estimate_test_cost(runs[i % len(runs)][0], length, engine))
+        for group in range(min(groups_per_segment, len(indices))):
+            group_indices = indices[group::groups_per_segment]
+            items.append((int(start), int(length), [runs[i % len(runs)] for i in group_indices],
+                          script_dir, engine))
+            item_indices.append(group_indices)
+    
+    computed = []
+    if items:
+        shm = shared_memory.SharedMemory(create=True, size=max(bits.size, 1))
+        try:
+            shared_bits = np.ndarray((bits.size,), dtype=np.uint8, buffer=shm.buf)
+            shared_bits[:] = bits
+            del shared_bits
+            
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach_shared_bits,
+                                     initargs=(shm.name, bits.size, base_offset)) as executor:
+                # map() yields results in submission order, which keeps the output deterministic
+                chunk_size = max(1, len(items) // (workers * 4))
+                computed = list(executor.map(_run_work_item, items, chunksize=chunk_size))
+        finally:
+            shm.close()
+            shm.unlink()
+    
+    records = [record for key, record in lookups]
+    for indices, item_records in zip(item_indices, computed):
+        for i, record in zip(indices, item_records):
+            records[i] = record
+            _cache_store(cache, lookups[i][0], record)
+    
+    test_count = len(runs)
+    return [records[i * test_count:(i + 1) * test_count] for i in range(len(spans))]
+
+# Segments loaded and batch-evaluated together by run_segments(); bounds the memory held at once
+BATCH_GROUP_SIZE = 256
+
+def precompute_batch_tests(segments, selected_tests, params=None, engine="auto"):
+    """
+    Evaluate tests with a batched fast implementation on many segments at once
+    
+    For every selected test in nist_fast_tests.BATCH_TESTS that runs on the
+    fast engine, all equal-length segments are evaluated in one call and the
+    p-values are stored in each Segment's precomputed dict, where
+    run_single_test() picks them up. Anything that cannot be batched is left
+    to the normal per-segment run, which also reports any error.
+    
+    Args:
+        segments (list): Segment objects
+        selected_tests (list): List of test names to run
+        params (dict): Parameter overrides keyed by test name
+        engine (str or dict): Engine selection, see resolve_engine()
+    """
+    params = params or {}
+    if len(segments) < 2 or len({len(segment) for segment in segments}) != 1:
+        return
+    
+    for test_name in selected_tests:
+        batch_func = nist_fast_tests.BATCH_TESTS.get(test_name)
+        try:
+            if batch_func is None or resolve_engine(test_name, engine) != "fast":
+                continue
+            test_params = dict(DEFAULT_TEST_PARAMS.get(test_name, {}), **(params.get(test_name) or {}))
+            
+            start = time.perf_counter()
+            results = batch_func([segment.features for segment in segments], **test_params)
+            elapsed = (time.perf_counter() - start) / len(segments)
+        except Exception:
+            continue
         
-        # Handle offset and trim to requested length
-        total_length = len(binary_string)
+        for segment, p_values in zip(segments, results):
+            segment.precomputed[test_name] = (p_values, elapsed)
+
+def _run_spans(source, spans, selected_tests, script_dir, workers, params, engine, fail_fast=False, deadline=None):
+    """
+    Run the selected tests on (start, length) spans of a BitSource, serially or on a pool
+    
+    fail_fast and deadline need the tests of a segment to run in turn, and
+    profiling needs each test to run on its own, so they always use the
+    serial path.
+    """
+    profiling = _PROFILE["enabled"]
+    if workers != 1 and spans and not fail_fast and deadline is None and not profiling:
+        # Decode the smallest range covering every segment once
+        low = min(start for start, _ in spans)
+        high = max(start + length for start, length in spans)
+        bits = source.segment(low, high - low)
+        return run_tests_parallel(bits, spans, selected_tests, script_dir, workers, params, engine, low)
+    
+    segment_records = []
+    for group_start in range(0, len(spans), BATCH_GROUP_SIZE):
+        with profile_phase("load"):
+            segments = [Segment(source.segment(start, length), start)
+                        for start, length in spans[group_start:group_start + BATCH_GROUP_SIZE]]
+        if deadline is None and not profiling:
+            precompute_batch_tests(segments, selected_tests, params, engine)
+        segment_records.extend(run_tests_on_data(segment, selected_tests, script_dir, params, engine,
+                                                 fail_fast, deadline)
+                               for segment in segments)
+    return segment_records
+
+def run_tests_structured(input_file, bit_length, selected_tests, offset=0, fmt="auto", bit_order="msb",
+                         reload=False, workers=1, params=None, engine="auto", fail_fast=False, time_budget=None,
+                         extract=None, cache=None):
+    """
+    Run selected NIST randomness tests and return structured results.
+    
+    Args:
+        input_file (str): Path to the input file
+        bit_length (int): Number of bits to process
+        selected_tests (list): List of test names to run
+        offset (int): Bit offset from the start of the file
+        fmt (str): Input format ("auto", "ascii", "bin", "npy" or "mat")
+        bit_order (str): Bit order for raw binary files ("msb" or "lsb")
+        reload (bool): Re-import the test modules instead of using the cached registry
+        workers (int): Worker processes to spread the tests over (1 runs them
+            in this process, 0 uses one per CPU)
+        params (dict): Parameter overrides keyed by test name
+        engine (str or dict): Engine selection, see resolve_engine()
+        fail_fast (bool): Stop after the first failing test, see run_tests_on_data()
+        time_budget (float): Seconds after which no further test is started;
+            the remaining tests come back as "skipped"
+        extract (str): Bit extraction pipeline, see open_bit_source()
+        cache (bool): Use the result cache for this call (None keeps the
+            setting of configure_result_cache(), off by default)
+    
+    Returns:
+        dict: "input_file", "format", "offset", "length", "requested", the
+        loader's "log" text, one record per test in "records" and, when
+        profiling is on, the run's "profile" (see get_profile())
+    """
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    reset_profile()
+    
+    if reload:
+        clear_test_registry()
+    
+    with redirect_stdout(StringIO()) as log, profile_phase("load"):
+        source = open_bit_source(input_file, fmt, bit_order, extract)
+        start, length = _clip_segment(len(source), bit_length, offset)
+    
+    with result_cache_enabled(cache):
+        [records] = _run_spans(source, [(start, length)], selected_tests, script_dir, workers, params, engine,
+                               fail_fast, deadline)
+    
+    return {
+        "input_file": input_file,
+        "format": source.format_name,
+        "offset": start,
+        "length": length,
+        "requested": bit_length,
+        "log": log.getvalue(),
+        "records": records,
+        "profile": get_profile(),
+    }
+
+def run_tests_streaming(input_file, bit_length, selected_tests, offset=0, fmt="auto", bit_order="msb",
+                        params=None, chunk_bits=STREAM_CHUNK_BITS, extract=None):
+    """
+    Run the streamable tests on the input without loading it whole
+    
+    The input is read chunk_bits at a time and every chunk updates the
+    per-test accumulators of nist_streaming, so memory use is bounded by the
+    chunk size whatever the input size. Tests that need the whole sequence
+    get an error record. As in run_tests_structured(), an offset past the
+    end of the data falls back to offset 0.
+    
+    Args:
+        input_file (str): Path to the input file
+        bit_length (int): Number of bits to process (None for the rest of the file)
+        selected_tests (list): List of test names to run
+        offset (int): Bit offset from the start of the file
+        fmt (str): Input format ("auto", "ascii", "bin", "npy" or "mat")
+        bit_order (str): Bit order for raw binary files ("msb" or "lsb")
+        params (dict): Parameter overrides keyed by test name
+        chunk_bits (int): Bits read per step
+        extract (str): Bit extraction pipeline, see open_bit_source()
+    
+    Returns:
+        dict: Same layout as run_tests_structured(); records use the "stream" engine
+    """
+    runs = [(test_name, dict(DEFAULT_TEST_PARAMS.get(test_name, {}), **(test_params or {})))
+            for test_name, test_params in expand_test_runs(selected_tests, params)]
+    
+    def stream_from(start):
+        stream = nist_streaming.StreamingRun(runs)
+        length = 0
+        for chunk in source.iter_chunks(start, bit_length, chunk_bits):
+            stream.update(chunk)
+            length += chunk.size
+        return stream, length
+    
+    with redirect_stdout(StringIO()) as log:
+        source = open_bit_source(input_file, fmt, bit_order, extract)
+        stream, length = stream_from(offset)
         
-        if offset >= total_length:
-            print(f"Warning: Requested offset ({offset}) exceeds data length ({total_length})")
+        # The data length is only known once it has been read, so the
+        # _clip_segment() fallback to offset 0 is applied after the fact
+        if length == 0 and offset > 0 and bit_length != 0:
+            print(f"Warning: Requested offset ({offset}) exceeds data length")
             offset = 0
-        
-        # Extract the segment with offset
-        end_index = min(offset + bit_length, total_length)
-        segment = binary_string[offset:end_index]
-        
-        print(f"Data segment: offset={offset}, length={len(segment)}, requested={bit_length}")
-        
-        return segment
-    except Exception as e:
-        print(f"Error loading data: {e}")
-        return ""
+            stream, length = stream_from(offset)
+        print(f"Data segment: offset={offset}, length={length}, requested={bit_length} (streamed)")
+    
+    records = []
+    for (test_name, test_params), (p_values, error, elapsed) in zip(runs, stream.results()):
+        record = new_record(test_name, test_params)
+        record["engine"] = "stream"
+        if test_name not in TEST_FILE_MAP:
+            record["status"] = "unknown"
+            record["error"] = f"Unknown test: {test_name}"
+        elif p_values is None:
+            record["error"] = error
+        else:
+            set_record_p_values(record, p_values)
+        record["elapsed"] = elapsed
+        records.append(record)
+    
+    return {
+        "input_file": input_file,
+        "format": source.format_name,
+        "offset": offset,
+        "length": length,
+        "requested": bit_length,
+        "log": log.getvalue(),
+        "records": records,
+    }
 
-def run_selected_tests(input_file, bit_length, selected_tests, offset=0):
+def run_selected_tests(input_file, bit_length, selected_tests, offset=0, fmt="auto", bit_order="msb",
+                       reload=False, workers=1, params=None, engine="auto", stream=False, fail_fast=False,
+                       time_budget=None, extract=None, cache=None):
     """
     Run selected NIST randomness tests on the input data.
     
+    Text front end of run_tests_structured(): the records are rendered with
+    format_records() after a block of diagnostic information.
+    
     Args:
         input_file (str): Path to the input file
         bit_length (int): Number of bits to process
         selected_tests (list): List of test names to run
         offset (int): Bit offset from the start of the file
+        fmt (str): Input format ("auto", "ascii", "bin", "npy" or "mat")
+        bit_order (str): Bit order for raw binary files ("msb" or "lsb")
+        reload (bool): Re-import the test modules instead of using the cached registry
+        workers (int): Worker processes to spread the tests over (1 runs them
+            in this process, 0 uses one per CPU)
+        params (dict): Parameter overrides keyed by test name
+        engine (str or dict): Engine selection, see resolve_engine()
+        stream (bool): Read the input in chunks with run_tests_streaming()
+            instead of loading it (only the streamable tests give results)
+        fail_fast (bool): Stop after the first failing test (cheapest tests run first)
+        time_budget (float): Seconds after which the remaining tests are skipped
+        extract (str): Bit extraction pipeline, see open_bit_source()
+        cache (bool): Use the result cache for this call (None keeps the
+            setting of configure_result_cache(), off by default)
     
     Returns:
         str: Results of the tests
     """
     # Capture stdout to get test results
-    original_stdout = sys.stdout
-    sys.stdout = string_buffer = StringIO()
+    with redirect_stdout(StringIO()) as string_buffer:
+        try:
+            # Directory where this script is located (should also contain the test modules)
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            
+            # Print diagnostic information
+            print(f"Python version: {sys.version}")
+            print(f"Script directory: {script_dir}")
+            print(f"Testing file: {input_file}")
+            print(f"Bit length: {bit_length}")
+            print(f"Offset: {offset}")
+            print(f"Input format: {fmt} (bit order: {bit_order})")
+            if extract:
+                print(f"Bit extraction: {extract}")
+            print(f"Selected tests: {selected_tests}")
+            print(f"Engine: {'stream' if stream else engine}")
+            print(f"Files in directory: {[f for f in os.listdir('.') if f.endswith('.py')]}")
+            print("-" * 80)
+            
+            if stream:
+                results = run_tests_streaming(input_file, bit_length, selected_tests, offset, fmt, bit_order,
+                                              params, extract=extract)
+            else:
+                results = run_tests_structured(input_file, bit_length, selected_tests, offset, fmt, bit_order,
+                                               reload, workers, params, engine, fail_fast, time_budget, extract,
+                                               cache)
+            print(results["log"], end='')
+            
+            # Check if we have enough data
+            if results["length"] < bit_length:
+                print(f"Warning: Input file contains only {results['length']} bits, but {bit_length} were requested.")
+            
+            print(f"Loaded {results['length']} bits from {input_file} (offset: {offset})")
+            with profile_phase("format"):
+                report = format_records(results["records"])
+            print(report, end='')
+            if results.get("profile") is not None:
+                print(format_profile(get_profile(), results["records"]), end='')
+        
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            traceback.print_exc(file=string_buffer)
     
-    try:
-        # Directory where this script is located (should also contain the test modules)
-        script_dir = os.path.dirname(os.path.abspath(__file__))
+    # Return the captured output
+    return string_buffer.getvalue()
+
+def segment_offsets(total_bits, bits_per_test, num_segments):
+    """
+    Spread num_segments offsets evenly over the data, as the MATLAB GUI does
+    
+    The first segment starts at bit 0 and the last one ends at total_bits.
+    
+    Args:
+        total_bits (int): Number of bits available
+        bits_per_test (int): Length of each segment
+        num_segments (int): Number of segments
+    
+    Returns:
+        list: Bit offset of each segment
+    """
+    if num_segments <= 1 or total_bits <= bits_per_test:
+        return [0] * max(num_segments, 1)
+    
+    max_offset = total_bits - bits_per_test
+    offsets = [int((i * max_offset) // (num_segments - 1)) for i in range(num_segments)]
+    offsets[-1] = max_offset
+    return offsets
+
+def run_segments(input_file, bits_per_test, offsets=None, num_segments=None, tests=None,
+                 total_bits=None, fmt="auto", bit_order="msb", reload=False, workers=1, params=None,
+                 engine="auto", fail_fast=False, time_budget=None, extract=None, cache=None):
+    """
+    Run the selected tests on several segments of one input file.
+    
+    The file is opened and decoded once; each segment is then taken from the
+    in-memory bits, so N segments cost a single file read instead of N.
+    
+    Args:
+        input_file (str): Path to the input file
+        bits_per_test (int): Number of bits in each segment
+        offsets (list): Bit offset of each segment
+        num_segments (int): Number of evenly spread segments (used when offsets is None)
+        tests (list): List of test names to run (default: all tests)
+        total_bits (int): Bits to spread the segments over (default: the whole file)
+        fmt (str): Input format ("auto", "ascii", "bin", "npy" or "mat")
+        bit_order (str): Bit order for raw binary files ("msb" or "lsb")
+        reload (bool): Re-import the test modules instead of using the cached registry
+        workers (int): Worker processes to spread the (segment, test) pairs over
+            (1 runs them in this process, 0 uses one per CPU)
+        params (dict): Parameter overrides keyed by test name
+        engine (str or dict): Engine selection, see resolve_engine()
+        fail_fast (bool): Stop testing a segment after its first failing test
+        time_budget (float): Seconds for the whole call; tests not started by
+            then come back as "skipped"
+        extract (str): Bit extraction pipeline, see open_bit_source()
+        cache (bool): Use the result cache for this call (None keeps the
+            setting of configure_result_cache(), off by default)
+    
+    Returns:
+        list: One dict per segment with the requested "offset", the "start"
+        and "length" actually tested, the loader's "log" text and the
+        segment's "records"; with profiling on, get_profile() gives the
+        phase totals of the whole call
+    """
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    selected_tests = list(ALL_TESTS) if tests is None else list(tests)
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    reset_profile()
+    
+    if reload:
+        clear_test_registry()
+    
+    with profile_phase("load"):
+        source = open_bit_source(input_file, fmt, bit_order, extract)
+        total_length = len(source)
+    
+    if offsets is None:
+        available = total_length if total_bits is None else min(total_bits, total_length)
+        offsets = segment_offsets(available, bits_per_test, num_segments or 1)
+    
+    spans = []
+    logs = []
+    for offset in offsets:
+        with redirect_stdout(StringIO()) as log:
+            spans.append(_clip_segment(len(source), bits_per_test, int(offset)))
+        logs.append(log.getvalue())
+    
+    with result_cache_enabled(cache):
+        segment_records = _run_spans(source, spans, selected_tests, script_dir, workers, params, engine,
+                                     fail_fast, deadline)
+    
+    return [{
+        "offset": int(offset),
+        "start": start,
+        "length": length,
+        "log": log,
+        "records": records,
+    } for offset, (start, length), log, records in zip(offsets, spans, logs, segment_records)]
+
+# Seconds between checks of a followed file for new data
+FOLLOW_POLL_INTERVAL = 1.0
+
+class FollowReader:
+    """
+    Incremental reader of the bits appended to a growing ASCII or raw binary file
+    
+    Only the bytes written since the previous read() are decoded, and the
+    bits not yet taken as a whole window are kept in between, so old data is
+    never read twice. If the file shrinks (truncated or replaced) reading
+    starts again from its beginning.
+    """
+    
+    def __init__(self, filename, fmt="auto", bit_order="msb", offset=0):
+        if fmt == "auto":
+            fmt = detect_input_format(filename)
+        if fmt not in ("ascii", "bin"):
+            raise ValueError(f"Follow mode needs an ascii or bin file, not {fmt}")
+        if bit_order not in BIT_ORDERS:
+            raise ValueError(f"Unknown bit order: {bit_order} (expected one of {list(BIT_ORDERS)})")
         
-        # Print diagnostic information
-        print(f"Python version: {sys.version}")
-        print(f"Script directory: {script_dir}")
-        print(f"Testing file: {input_file}")
-        print(f"Bit length: {bit_length}")
-        print(f"Offset: {offset}")
-        print(f"Selected tests: {selected_tests}")
-        print(f"Files in directory: {[f for f in os.listdir('.') if f.endswith('.py')]}")
-        print("-" * 80)
-        
-        # Load the data with offset
-        binary_data = load_data(input_file, bit_length, offset)
-        
-        # Check if we have enough data
-        if len(binary_data) < bit_length:
-            print(f"Warning: Input file contains only {len(binary_data)} bits, but {bit_length} were requested.")
-            bit_length = len(binary_data)
-        
-        print(f"Loaded {len(binary_data)} bits from {input_file} (offset: {offset})")
-        
-        # Test module file mapping - verified with the GUI list
-        test_file_map = {
-            "frequency": "FrequencyTest.py",
-            "block_frequency": "FrequencyTest.py",
-            "runs": "RunTest.py",
-            "longest_run": "RunTest.py",
-            "rank": "Matrix.py",
-            "fft": "Spectral.py",
-            "non_overlapping_template": "TemplateMatching.py",
-            "overlapping_template": "TemplateMatching.py",
-            "universal": "Universal.py",
-            "linear_complexity": "Complexity.py",
-            "serial": "Serial.py",
-            "approximate_entropy": "ApproximateEntropy.py",
-            "cumulative_sums": "CumulativeSum.py",
-            "random_excursions": "RandomExcursions.py",
-            "random_excursions_variant": "RandomExcursions.py"
-        }
-        
-        # Function name mapping - verified with the GUI list
-        test_function_map = {
-            "frequency": "FrequencyTest.monobit_test",
-            "block_frequency": "FrequencyTest.block_frequency",
-            "runs": "RunTest.run_test",
-            "longest_run": "RunTest.longest_one_block_test",
-            "rank": "Matrix.binary_matrix_rank_text",
-            "fft": "SpectralTest.spectral_test",
-            "non_overlapping_template": "TemplateMatching.non_overlapping_test",
-            "overlapping_template": "TemplateMatching.overlapping_patterns",
-            "universal": "Universal.statistical_test",
-            "linear_complexity": "ComplexityTest.linear_complexity_test",
-            "serial": "Serial.serial_test",
-            "approximate_entropy": "ApproximateEntropy.approximate_entropy_test",
-            "cumulative_sums": "CumulativeSums.cumulative_sums_test",
-            "random_excursions": "RandomExcursions.random_excursions_test",
-            "random_excursions_variant": "RandomExcursions.variant_test"
-        }
-        
-        # Store test results with their p-values
-        test_results = {}
-        
-        # Run each selected test
-        for test_name in selected_tests:
-            if test_name in test_file_map:
-                try:
-                    print(f"\nRunning {test_name} test...")
-                    module_path = os.path.join(script_dir, test_file_map[test_name])
-                    
-                    # Check if the file exists
-                    if not os.path.isfile(module_path):
-                        print(f"Error: Test module file {module_path} not found.")
-                        continue
-                    
-                    # Import the module directly
-                    module = import_module_from_file(module_path)
-                    if module is None:
-                        print(f"Error: Failed to import module from {module_path}.")
-                        continue
-                    
-                    # Get the test function using the correct format
-                    function_name = test_function_map[test_name]
-                    
-                    # Check if the function is a class method
-                    if '.' in function_name:
-                        # Handle class method format like "FrequencyTest.monobit_test"
-                        class_name, method_name = function_name.split('.')
-                        if hasattr(module, class_name) and hasattr(getattr(module, class_name), method_name):
-                            test_class = getattr(module, class_name)
-                            test_func = getattr(test_class, method_name)
-                        else:
-                            print(f"Error: Class {class_name} or method {method_name} not found in module {test_name}.")
-                            print(f"Available classes: {[c for c in dir(module) if not c.startswith('_') and c[0].isupper()]}")
-                            if hasattr(module, class_name):
-                                print(f"Available methods in {class_name}: {[m for m in dir(getattr(module, class_name)) if not m.startswith('_')]}")
-                            continue
-                    else:
-                        # Direct function call
-                        if not hasattr(module, function_name):
-                            print(f"Error: Function {function_name} not found in module {test_name}.")
-                            # List available functions in the module
-                            print(f"Available functions: {[f for f in dir(module) if not f.startswith('_')]}")
-                            continue
-                        
-                        test_func = getattr(module, function_name)
-                    
-                    # Call the appropriate test function with default parameters
-                    if test_name == "block_frequency":
-                        p_value = test_func(binary_data, 128, True)  # Block size parameter
-                    elif test_name == "non_overlapping_template":
-                        p_value = test_func(binary_data, True)  # Using default template pattern
-                    elif test_name == "overlapping_template":
-                        p_value = test_func(binary_data, True)  # Using default pattern size
-                    elif test_name == "serial" or test_name == "approximate_entropy":
-                        p_value = test_func(binary_data, True)  # Using default pattern length
-                    elif test_name == "random_excursions_variant":
-                        p_value = test_func(binary_data, True)  # Using default parameters
-                    else:
-                        p_value = test_func(binary_data, True)  # verbose=True for all tests
-                    
-                    # Store the result and handle various return types
-                    test_results[test_name] = p_value
-                    
-                    # Check if p_value is a valid numerical value
-                    try:
-                        # Handle tuple returns (some tests might return multiple p-values)
-                        if isinstance(p_value, tuple):
-                            # Use the first p-value if it's a tuple
-                            p_value_numeric = float(p_value[0])
-                        else:
-                            # Try to convert to float (works for int, float, numpy types)
-                            p_value_numeric = float(p_value)
-                            
-                        # Format the result output
-                        result_status = "PASS" if p_value_numeric > 0.01 else "FAIL"
-                        print(f"{test_name} test result: {p_value_numeric:.6f} ({result_status})")
-                    except (TypeError, ValueError):
-                        # If p_value can't be converted to a number, report it as-is
-                        print(f"{test_name} test result: {p_value} (UNKNOWN)")
-                        test_results[test_name] = "ERROR"
-                    
-                except Exception as e:
-                    print(f"Error running {test_name} test: {e}")
-                    import traceback
-                    traceback.print_exc()
-            else:
-                print(f"Unknown test: {test_name}")
+        self.filename = filename
+        self.format_name = fmt
+        self.bit_order = bit_order
+        self.offset = offset
+        self.position = 0
+        self.consumed = 0  # bits handed out as windows, counted from the start offset
+        self._skip = offset
+        self._pending = np.zeros(0, dtype=np.uint8)
+    
+    def read(self):
+        """
+        Decode the bytes appended since the last call
         
-        # Add summary of results
-        print("\n" + "=" * 40)
-        print("SUMMARY OF RESULTS")
-        print("=" * 40)
+        Returns:
+            int: Number of new bits
+        """
+        size = os.path.getsize(self.filename)
+        if size < self.position:
+            print(f"Warning: {self.filename} shrank to {size} bytes, following it from the start", file=sys.stderr)
+            self.position, self.consumed, self._skip = 0, 0, self.offset
+            self._pending = np.zeros(0, dtype=np.uint8)
+        if size == self.position:
+            return 0
         
-        # Count passes more safely
-        pass_count = 0
-        error_count = 0
-        for test_name, result in test_results.items():
-            try:
-                # Handle tuple returns
-                if isinstance(result, tuple):
-                    result_val = float(result[0])
-                elif result == "ERROR":
-                    error_count += 1
-                    continue
-                else:
-                    result_val = float(result)
-                    
-                if result_val > 0.01:
-                    pass_count += 1
-            except (TypeError, ValueError):
-                # If a result can't be converted to float, don't count it
-                error_count += 1
-                
-        total_count = len(test_results)
-        
-        if total_count > 0:
-            pass_rate = (pass_count / total_count) * 100
-            print(f"Tests run: {total_count}")
-            print(f"Tests passed: {pass_count} ({pass_rate:.1f}%)")
-            print(f"Tests failed: {total_count - pass_count - error_count} ({(100 - pass_rate - (error_count/total_count*100)):.1f}%)")
-            if error_count > 0:
-                print(f"Tests with errors: {error_count} ({(error_count/total_count*100):.1f}%)")
+        with open(self.filename, 'rb') as f:
+            f.seek(self.position)
+            raw = np.frombuffer(f.read(size - self.position), dtype=np.uint8)
+        self.position += raw.size
+        
+        if self.format_name == "ascii":
+            bits = np.subtract(raw[(raw == _ASCII_ZERO) | (raw == _ASCII_ONE)], _ASCII_ZERO, dtype=np.uint8)
         else:
-            print("No tests were successfully completed.")
+            bits = np.unpackbits(raw, bitorder=BIT_ORDERS[self.bit_order])
         
-        # Return the captured output
-        return string_buffer.getvalue()
+        if self._skip:
+            skipped = min(self._skip, bits.size)
+            bits = bits[skipped:]
+            self._skip -= skipped
+        self._pending = np.concatenate([self._pending, bits])
+        return bits.size
     
-    except Exception as e:
-        print(f"Error: {str(e)}")
-        import traceback
-        traceback.print_exc(file=string_buffer)
-        return string_buffer.getvalue()
+    def windows(self, bits_per_test):
+        """
+        Yield the complete windows of bits_per_test bits read so far
+        
+        Yields:
+            tuple: (bit offset in the file, uint8 0/1 array)
+        """
+        count = self._pending.size // bits_per_test
+        for i in range(count):
+            start = self.offset + self.consumed
+            self.consumed += bits_per_test
+            yield start, self._pending[i * bits_per_test:(i + 1) * bits_per_test]
+        self._pending = self._pending[count * bits_per_test:].copy()
+
+def follow_windows(input_file, bits_per_test, tests=None, offset=0, fmt="auto", bit_order="msb", params=None,
+                   engine="auto", poll_interval=FOLLOW_POLL_INTERVAL, max_windows=None, idle_timeout=None):
+    """
+    Watch a growing capture file and test every new window of bits_per_test bits
     
-    finally:
-        # Restore stdout
-        sys.stdout = original_stdout
+    Each window is tested on its own with run_tests_on_data(). The streamable
+    tests (see nist_streaming) also keep accumulators fed with every window,
+    so "cumulative" gives their p-values over everything seen since the start
+    offset without re-reading old data.
+    
+    Args:
+        input_file (str): Path to the capture file (ascii or bin)
+        bits_per_test (int): Number of bits in each window
+        tests (list): Test names to run (default: all tests)
+        offset (int): Bit offset of the first window
+        fmt (str): Input format ("auto", "ascii" or "bin")
+        bit_order (str): Bit order for raw binary files ("msb" or "lsb")
+        params (dict): Parameter overrides keyed by test name
+        engine (str or dict): Engine selection, see resolve_engine()
+        poll_interval (float): Seconds to wait when no new window is complete
+        max_windows (int): Stop after this many windows (default: never)
+        idle_timeout (float): Stop after this many seconds without new data (default: never)
+    
+    Yields:
+        dict: "window" index, "offset", "length", wall-clock "time", the
+        window's "records" and "cumulative" {"length", "records"} of the
+        streamable tests
+    """
+    if bits_per_test <= 0:
+        raise ValueError("bits_per_test must be positive")
+    selected_tests = list(ALL_TESTS) if tests is None else list(tests)
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    reader = FollowReader(input_file, fmt, bit_order, offset)
+    
+    runs = [(test_name, dict(DEFAULT_TEST_PARAMS.get(test_name, {}), **(test_params or {})))
+            for test_name, test_params in expand_test_runs(selected_tests, params)
+            if test_name in nist_streaming.STREAMING_TESTS]
+    stream = nist_streaming.StreamingRun(runs)
+    
+    window_index = 0
+    last_data = time.monotonic()
+    while max_windows is None or window_index < max_windows:
+        if reader.read():
+            last_data = time.monotonic()
+        
+        tested = False
+        for start, bits in reader.windows(bits_per_test):
+            with redirect_stdout(StringIO()):
+                records = run_tests_on_data(Segment(bits, start), selected_tests, script_dir, params, engine)
+            stream.update(bits)
+            
+            cumulative = []
+            for (test_name, test_params), (p_values, error, elapsed) in zip(runs, stream.results()):
+                record = new_record(test_name, test_params)
+                record["engine"] = "stream"
+                if p_values is None:
+                    record["error"] = error
+                else:
+                    set_record_p_values(record, p_values)
+                record["elapsed"] = elapsed
+                cumulative.append(record)
+            
+            yield {
+                "window": window_index,
+                "offset": start,
+                "length": bits.size,
+                "time": time.time(),
+                "records": records,
+                "cumulative": {"length": reader.consumed, "records": cumulative},
+            }
+            window_index += 1
+            tested = True
+            if max_windows is not None and window_index >= max_windows:
+                return
+        
+        if not tested:
+            if idle_timeout is not None and time.monotonic() - last_data > idle_timeout:
+                return
+            time.sleep(poll_interval)
 
 # This allows running directly from command line for testing
 def scan_test_files():
@@ -332,7 +2392,7 @@ def scan_test_files():
             if module is None:
                 print(f"  Error: Could not import {file}")
                 continue
-                
+            
             # Look for classes
             classes = [c for c in dir(module) if not c.startswith('_') and c[0].isupper()]
             print(f"  Classes found: {classes}")
@@ -347,18 +2407,300 @@ def scan_test_files():
             functions = [f for f in dir(module) if not f.startswith('_') and callable(getattr(module, f)) and not f[0].isupper()]
             if functions:
                 print(f"  Direct functions: {functions}")
-                
+        
         except Exception as e:
             print(f"  Error analyzing file: {e}")
 
+# Per-user directory (mode 0700) holding the default server socket
+DEFAULT_SERVE_DIR = os.path.join(tempfile.gettempdir(), f"nist_tests_{getattr(os, 'getuid', lambda: 0)()}")
+
+# Unix socket used by --serve and nist_tests_client.py when no path is given
+DEFAULT_SERVE_SOCKET = os.path.join(DEFAULT_SERVE_DIR, "server.sock")
+
+# Input files kept open (and decoded) by a serving process
+SERVE_SOURCE_LIMIT = 4
+
+# Modules a serving process keeps loaded; nist_tests_client.py restarts a server whose copy is out of date
+SERVE_CODE_FILES = ("nist_tests_wrapper2.py", "nist_fast_tests.py", "nist_streaming.py", "nist_extraction.py",
+                    "converter.py")
+
+def code_version(directory=None):
+    """Fingerprint (size and modification time) of the SERVE_CODE_FILES in directory, default this script's"""
+    directory = directory or os.path.dirname(os.path.abspath(__file__))
+    parts = []
+    for name in SERVE_CODE_FILES:
+        try:
+            stat = os.stat(os.path.join(directory, name))
+            parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+        except OSError:
+            parts.append(f"{name}:missing")
+    return ";".join(parts)
+
+# Fingerprint of the code this process loaded, reported by the ping op
+LOADED_CODE_VERSION = code_version()
+
+def _request_tests(request):
+    """Test list of a daemon request: a list, a comma-separated string or "all" (the default)"""
+    tests = request.get("tests", "all")
+    if isinstance(tests, str):
+        return list(ALL_TESTS) if tests == "all" else tests.split(',')
+    return list(tests)
+
+def handle_request(request):
+    """
+    Answer one --serve request
+    
+    Requests are JSON objects with an "op":
+        "ping": report the server's process id and the LOADED_CODE_VERSION of its code
+        "run": run_tests_structured() (or run_tests_streaming() with "stream"),
+            or the run_selected_tests() report as "text" when "text" is true
+        "segments": run_segments() with "offsets" or "num_segments"
+        "reset": drop the open input files, the test module registry and the result cache handle
+        "shutdown": stop serving after replying
+    The run options use the command line names: input_file, bit_length,
+    tests, offset, format, bit_order, extract, workers, params, engine,
+    stream, fail_fast, time_budget, cache (true/false, default: the
+    server's setting) and profile (profiling applies to that request only,
+    with the server's --profile-dir). profile_dir is rejected: a client
+    must not choose where the server writes files.
+    
+    Args:
+        request (dict): Decoded request
+    
+    Returns:
+        dict: {"id", "ok": True, "result"} or {"id", "ok": False, "error"}
+    """
+    response = {"id": request.get("id"), "ok": True}
+    profiling = (_PROFILE["enabled"], _PROFILE["memory"], _PROFILE["cprofile_dir"])
+    try:
+        op = request.get("op", "run")
+        options = dict(fmt=request.get("format", "auto"), bit_order=request.get("bit_order", "msb"),
+                       extract=request.get("extract"))
+        schedule = dict(fail_fast=request.get("fail_fast", False), time_budget=request.get("time_budget"),
+                        cache=request.get("cache"))
+        engine = parse_engine_option(request["engine"]) if isinstance(request.get("engine"), str) else \
+            request.get("engine", "auto")
+        if "profile_dir" in request:
+            raise ValueError("profile_dir is not accepted over the server socket; start the server with "
+                             "--profile-dir instead")
+        if request.get("profile"):
+            configure_profiling(cprofile_dir=profiling[2])
+        
+        if op == "ping":
+            response["result"] = {"pid": os.getpid(), "version": LOADED_CODE_VERSION}
+        elif op == "run" and request.get("text"):
+            response["result"] = run_selected_tests(request["input_file"], request["bit_length"],
+                                                    _request_tests(request), request.get("offset", 0),
+                                                    reload=request.get("reload", False),
+                                                    workers=request.get("workers", 1),
+                                                    params=request.get("params"), engine=engine,
+                                                    stream=request.get("stream", False), **options, **schedule)
+        elif op == "run" and request.get("stream"):
+            response["result"] = run_tests_streaming(request["input_file"], request["bit_length"],
+                                                     _request_tests(request), request.get("offset", 0),
+                                                     params=request.get("params"), **options)
+        elif op == "run":
+            response["result"] = run_tests_structured(request["input_file"], request["bit_length"],
+                                                      _request_tests(request), request.get("offset", 0),
+                                                      reload=request.get("reload", False),
+                                                      workers=request.get("workers", 1),
+                                                      params=request.get("params"), engine=engine, **options,
+                                                      **schedule)
+        elif op == "segments":
+            response["result"] = run_segments(request["input_file"], request["bit_length"],
+                                              request.get("offsets"), request.get("num_segments"),
+                                              _request_tests(request), reload=request.get("reload", False),
+                                              workers=request.get("workers", 1), params=request.get("params"),
+                                              engine=engine, **options, **schedule)
+        elif op == "reset":
+            _SOURCE_CACHE["sources"].clear()
+            clear_test_registry()
+            configure_result_cache(_RESULT_CACHE["enabled"], _RESULT_CACHE["path"], _RESULT_CACHE["max_bytes"])
+            response["result"] = "reset"
+        elif op == "shutdown":
+            response["result"] = "shutdown"
+        else:
+            raise ValueError(f"Unknown op: {op}")
+    except Exception as e:
+        response = {"id": request.get("id"), "ok": False, "error": f"{type(e).__name__}: {e}"}
+    finally:
+        if request.get("profile"):
+            configure_profiling(*profiling)
+    return response
+
+def _serve_lines(lines, reply):
+    """Answer newline-delimited JSON requests until the input ends or a shutdown request; True on shutdown"""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            reply({"id": None, "ok": False, "error": f"Invalid JSON request: {e}"})
+            continue
+        
+        # Anything the tests print must not end up in the reply stream
+        with redirect_stdout(StringIO()):
+            response = handle_request(request)
+        reply(response)
+        if request.get("op") == "shutdown":
+            return True
+    return False
+
+def _private_socket_dir(directory):
+    """Create directory with mode 0700, or check that an existing one is ours and closed to other users"""
+    import stat
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode):
+        raise RuntimeError(f"{directory} exists and is not a directory")
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        raise RuntimeError(f"{directory} is owned by another user")
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        raise RuntimeError(f"{directory} is accessible to other users (mode {stat.S_IMODE(info.st_mode):o})")
+
+def _remove_stale_socket(path):
+    """Remove a socket file left by a server that is gone; refuse to take over a live server or another file"""
+    import socket
+    import stat
+    if not stat.S_ISSOCK(os.stat(path).st_mode):
+        raise RuntimeError(f"{path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(path)  # stale socket from an earlier server
+            return
+    raise RuntimeError(f"A server is already listening on {path}")
+
+def serve(address=None, idle_timeout=None):
+    """
+    Run as a long-lived worker answering JSON requests (see handle_request())
+    
+    The process keeps numpy/scipy, the test module registry and up to
+    SERVE_SOURCE_LIMIT decoded input files loaded between requests, so a run
+    costs only the tests themselves.
+    
+    Args:
+        address (str): "-" to read requests from stdin and write one JSON
+            reply line per request to stdout, otherwise the path of the Unix
+            socket to listen on (default: DEFAULT_SERVE_SOCKET); a socket
+            file left by a server that has exited is replaced, but a running
+            server's is not (RuntimeError)
+        idle_timeout (float): Exit after this many seconds without a
+            connection (socket servers only; default: never)
+    """
+    _SOURCE_CACHE["limit"] = SERVE_SOURCE_LIMIT
+    
+    if address == "-":
+        out = sys.stdout
+        
+        def reply(response):
+            out.write(results_to_json(response) + "\n")
+            out.flush()
+        
+        _serve_lines(sys.stdin, reply)
+        return
+    
+    import socket
+    path = address or DEFAULT_SERVE_SOCKET
+    if os.path.dirname(os.path.abspath(path)) == DEFAULT_SERVE_DIR:
+        _private_socket_dir(DEFAULT_SERVE_DIR)
+    if os.path.exists(path):
+        _remove_stale_socket(path)
+    
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen()
+    server.settimeout(idle_timeout)
+    bound_inode = os.stat(path).st_ino
+    print(f"Serving NIST tests on {path} (pid {os.getpid()})", file=sys.stderr)
+    try:
+        stopped = False
+        while not stopped:
+            try:
+                connection, _ = server.accept()
+            except socket.timeout:
+                print(f"No requests for {idle_timeout} s, stopping", file=sys.stderr)
+                break
+            with connection, connection.makefile('r', encoding='utf-8') as lines:
+                def reply(response):
+                    connection.sendall((results_to_json(response) + "\n").encode('utf-8'))
+                
+                try:
+                    stopped = _serve_lines(lines, reply)
+                except OSError as e:
+                    print(f"Client connection failed: {e}", file=sys.stderr)
+    finally:
+        server.close()
+        # A replacement server may already have bound a new socket at this path
+        if os.path.exists(path) and os.stat(path).st_ino == bound_inode:
+            os.unlink(path)
+
 if __name__ == "__main__":
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='NIST Randomness Test Suite Wrapper')
-    parser.add_argument('input_file', help='Path to the input binary file')
-    parser.add_argument('bit_length', type=int, help='Number of bits to process')
+    parser.add_argument('input_file', nargs='?', help='Path to the input binary file')
+    parser.add_argument('bit_length', type=int, nargs='?', help='Number of bits to process')
     parser.add_argument('tests', nargs='?', default='all', help='Comma-separated list of tests to run')
     parser.add_argument('--offset', type=int, default=0, help='Bit offset from start of file')
+    parser.add_argument('--format', dest='input_format', choices=INPUT_FORMATS, default='auto',
+                        help='Input file format (default: detect from file contents)')
+    parser.add_argument('--bit-order', choices=list(BIT_ORDERS), default='msb',
+                        help='Bit order within each byte of a raw binary file')
+    parser.add_argument('--extract', default=None, metavar='PIPELINE',
+                        help='Extract bits from the samples of an npy/mat array or the bytes of a bin file, '
+                             'e.g. "lsb:2", "word:16:little", "threshold:0", "median,vonneumann"')
+    parser.add_argument('--num-segments', type=int, default=None,
+                        help='Test this many evenly spread segments of bit_length bits from one load')
+    parser.add_argument('--offsets', default=None,
+                        help='Comma-separated bit offsets of the segments to test from one load')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes to run tests in parallel (0 for one per CPU)')
+    parser.add_argument('--engine', type=parse_engine_option, default='auto',
+                        help=f'Test engine, one of {ENGINES}, or comma-separated test=engine pairs '
+                             '(default: auto, the fast engine where available)')
+    parser.add_argument('--serial-m', default=None,
+                        help='Comma-separated pattern lengths m for the serial test (one run per value)')
+    parser.add_argument('--apen-m', default=None,
+                        help='Comma-separated pattern lengths m for the approximate entropy test (one run per value)')
+    parser.add_argument('--aggregate', action='store_true',
+                        help='With several segments, add the SP 800-22 proportion and uniformity evaluation')
+    parser.add_argument('--fail-fast', action='store_true',
+                        help='Stop testing a sequence after its first failing test (cheapest tests run first)')
+    parser.add_argument('--time-budget', type=float, default=None, metavar='SECONDS',
+                        help='Start no test after this many seconds and report the rest as skipped')
+    parser.add_argument('--profile', action='store_true',
+                        help='Time the load/import/compute/format phases and record peak memory per test')
+    parser.add_argument('--profile-dir', default=None, metavar='DIR',
+                        help='With --profile (implied), also write a cProfile dump of every test to DIR')
+    parser.add_argument('--follow', action='store_true',
+                        help='Keep watching the input file and print one JSON line per new window of bit_length bits')
+    parser.add_argument('--poll-interval', type=float, default=FOLLOW_POLL_INTERVAL,
+                        help='Seconds between checks for new data with --follow')
+    parser.add_argument('--max-windows', type=int, default=None,
+                        help='Stop --follow after this many windows')
+    parser.add_argument('--idle-timeout', type=float, default=None,
+                        help='Stop --follow after this many seconds without new data, '
+                             'or --serve after this many seconds without requests')
+    parser.add_argument('--stream', action='store_true',
+                        help='Read the input in chunks with bounded memory (frequency, block_frequency, runs, '
+                             'serial, approximate_entropy and cumulative_sums only)')
+    parser.add_argument('--json', action='store_true',
+                        help='Print structured per-test records as JSON instead of the text report')
+    parser.add_argument('--reload', action='store_true', help='Re-import the test modules before running')
+    parser.add_argument('--cache', action='store_true',
+                        help=f'Look up and store results in the SQLite result cache ({RESULT_CACHE_PATH}); '
+                             'off by default, since every run then hashes each segment and writes the file')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not use the result cache (the default; overrides --cache and --cache-file)')
+    parser.add_argument('--clear-cache', action='store_true', help='Empty the result cache before running')
+    parser.add_argument('--cache-file', default=None,
+                        help=f'SQLite result cache file, implies --cache (default: {RESULT_CACHE_PATH})')
     parser.add_argument('--scan', action='store_true', help='Scan for test files and exit')
+    parser.add_argument('--serve', nargs='?', const='', default=None, metavar='SOCKET',
+                        help='Stay running and answer JSON requests on a Unix socket '
+                             f'(default: {DEFAULT_SERVE_SOCKET}), or on stdin/stdout with "-"')
     
     args = parser.parse_args()
     
@@ -367,16 +2709,96 @@ if __name__ == "__main__":
         scan_test_files()
         sys.exit(0)
     
+    configure_result_cache((args.cache or args.cache_file is not None) and not args.no_cache, args.cache_file)
+    if args.clear_cache:
+        clear_result_cache()
+    
+    if args.profile or args.profile_dir:
+        configure_profiling(cprofile_dir=args.profile_dir)
+    
+    if args.serve is not None:
+        try:
+            serve(args.serve or None, args.idle_timeout)
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(0)
+    
+    if args.input_file is None or args.bit_length is None:
+        parser.error("input_file and bit_length are required")
+    
     # Parse tests
     if args.tests == 'all':
-        selected_tests = ["frequency", "block_frequency", "runs", "longest_run",
-                         "rank", "fft", "non_overlapping_template",
-                         "overlapping_template", "universal", "linear_complexity",
-                         "serial", "approximate_entropy", "cumulative_sums",
-                         "random_excursions", "random_excursions_variant"]
+        selected_tests = list(ALL_TESTS)
     else:
         selected_tests = args.tests.split(',')
     
+    # Pattern length sweeps for the serial and approximate entropy tests
+    params = {}
+    if args.serial_m:
+        params["serial"] = {"pattern_length": [int(m) for m in args.serial_m.split(',')]}
+    if args.apen_m:
+        params["approximate_entropy"] = {"pattern_length": [int(m) for m in args.apen_m.split(',')]}
+    
+    # Test each new window of a growing file as it is written
+    if args.follow:
+        if args.extract:
+            parser.error("--follow reads ascii or bin bits directly; it cannot be combined with --extract")
+        try:
+            for window in follow_windows(args.input_file, args.bit_length, selected_tests, args.offset,
+                                         args.input_format, args.bit_order, params, args.engine,
+                                         args.poll_interval, args.max_windows, args.idle_timeout):
+                print(results_to_json(window), flush=True)
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+    
+    # Run tests on several segments from a single load
+    if args.num_segments is not None or args.offsets is not None:
+        if args.stream:
+            parser.error("--stream runs a single segment; it cannot be combined with --num-segments/--offsets")
+        offsets = [int(o) for o in args.offsets.split(',')] if args.offsets else None
+        segments = run_segments(args.input_file, args.bit_length, offsets, args.num_segments,
+                                selected_tests, None, args.input_format, args.bit_order, args.reload,
+                                args.workers, params, args.engine, args.fail_fast, args.time_budget,
+                                args.extract)
+        profile = get_profile()
+        if args.json and (args.aggregate or profile is not None):
+            output = {"segments": segments}
+            if args.aggregate:
+                output["aggregate"] = aggregate_segments(segments)
+            if profile is not None:
+                output["profile"] = profile
+            print(results_to_json(output))
+        elif args.json:
+            print(results_to_json(segments))
+        else:
+            for i, segment in enumerate(segments):
+                print(f"--- Segment {i + 1} of {len(segments)} (offset: {segment['offset']}) ---")
+                with profile_phase("format"):
+                    report = format_records(segment["records"])
+                print(segment["log"] + report)
+            if args.aggregate:
+                print(format_aggregate(aggregate_segments(segments)))
+            if profile is not None:
+                print(format_profile(get_profile(), [r for segment in segments for r in segment["records"]]))
+        sys.exit(0)
+    
+    if args.json and args.stream:
+        print(results_to_json(run_tests_streaming(args.input_file, args.bit_length, selected_tests, args.offset,
+                                                  args.input_format, args.bit_order, params,
+                                                  extract=args.extract)))
+        sys.exit(0)
+    
+    if args.json:
+        print(results_to_json(run_tests_structured(args.input_file, args.bit_length, selected_tests, args.offset,
+                                                   args.input_format, args.bit_order, args.reload,
+                                                   args.workers, params, args.engine, args.fail_fast,
+                                                   args.time_budget, args.extract)))
+        sys.exit(0)
+    
     # Run tests
-    results = run_selected_tests(args.input_file, args.bit_length, selected_tests, args.offset)
+    results = run_selected_tests(args.input_file, args.bit_length, selected_tests, args.offset,
+                                 args.input_format, args.bit_order, args.reload, args.workers,
+                                 params, args.engine, args.stream, args.fail_fast, args.time_budget, args.extract)
     print(results)